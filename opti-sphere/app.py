@@ -1,12 +1,15 @@
+import logging
 import sys
 
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication
 
 
+from config import LOG_LEVEL
 from ui.MainWindow import MainWindow
 
 if __name__ == '__main__':
+    logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = QApplication()
     app.setWindowIcon(QIcon("resources/icons/app-icon.png"))  # set window icon
     app.setStyleSheet(open("resources/stylesheet.css").read())  # set window UI stylesheet
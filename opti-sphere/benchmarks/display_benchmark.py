@@ -0,0 +1,59 @@
+########################################
+#     Camera Display Micro-Benchmark   #
+########################################
+# Run from the opti-sphere directory: python3 -m benchmarks.display_benchmark
+
+import sys
+import time
+
+import cv2
+import numpy as np
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import QApplication
+
+from ui.widgets.ImageViewer import ImageViewer
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080), "4K": (3840, 2160)}
+VIEWER_SIZE = (960, 540)
+DURATION = 2  # seconds spent measuring each case
+
+
+def copy_upload(viewer, frame):  # previous display path: BGR --> RGB copy, bytes copy, full resolution pixmap
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    image = QImage(rgb.tobytes(), rgb.shape[1], rgb.shape[0], rgb.shape[2] * rgb.shape[1], QImage.Format.Format_RGB888)
+    viewer.gv.image.setPixmap(QPixmap.fromImage(image))
+
+
+def measure(upload, viewer, frame):  # return the number of frames per second uploaded and painted
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        upload(viewer, frame)
+        viewer.gv.viewport().repaint()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    app = QApplication(sys.argv)
+    viewer = ImageViewer()
+    viewer.resize(*VIEWER_SIZE)
+    viewer.show()
+    viewer.gv.set_image(np.zeros((1080, 1920, 3), dtype=np.uint8))  # fit the view on the image size
+    viewer.gv.resizeEvent(None)
+    app.processEvents()
+
+    print(f"Viewport: {viewer.gv.viewport().width()} × {viewer.gv.viewport().height()}")
+    print(f"{'Resolution':<12}{'copy path':>14}{'zero-copy':>14}{'zoomed in':>14}")
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+        legacy = measure(copy_upload, viewer, frame)
+        viewer.gv.zoom = 1
+        fitted = measure(lambda v, f: v.gv.set_image(f), viewer, frame)
+        viewer.gv.zoom = 2  # full resolution upload, no downscaling
+        zoomed = measure(lambda v, f: v.gv.set_image(f), viewer, frame)
+        viewer.gv.zoom = 1
+        print(f"{name:<12}{legacy:>10.1f} fps{fitted:>10.1f} fps{zoomed:>10.1f} fps")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+########################################
+#     Serial Control Loop Benchmark    #
+########################################
+# Measure the latency and throughput of the serial link against the simulated RPi (Linux, macOS).
+# Run from the opti-sphere directory: python3 -m benchmarks.serial_benchmark [--commands N] [--settle S] [--speed V]
+
+import argparse
+import time
+
+import numpy as np
+from PySide6.QtCore import QCoreApplication
+
+from config import SIMULATOR_MOTOR_SPEED, SIMULATOR_SETTLE_TIME
+from core.models.SerialCom import SerialCom
+from core.models.Sphere import Sphere
+from core.threads.SimulatorThread import SimulatorThread
+
+
+class Window:  # stand-in for MainWindow: what SerialCom needs
+    def __init__(self):
+        self.threads = []
+        self.sphere = Sphere()
+
+
+def corrections(count):  # small rotations like the ones sent while tracking
+    return [(round(0.5 * (i % 10), 1), round(0.3 * (i % 7), 1), 0) for i in range(count)]
+
+
+def sequential(ser, count):  # send each rotation after the previous one completed, return the round trips (s)
+    round_trips = []
+    for rot in corrections(count):
+        request = ser.send_instruction(ser.ROT, *rot)
+        request.wait(5)
+        round_trips.append(request.round_trip)
+    return round_trips
+
+
+def pipelined(ser, count):  # send all the rotations at once, return their round trips (s)
+    requests = [ser.send_instruction(ser.ROT, *rot) for rot in corrections(count)]
+    for request in requests:
+        request.wait(5)
+    return [request.round_trip for request in requests]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the serial link against the simulated RPi")
+    parser.add_argument("--commands", type=int, default=20, help="rotations sent for each case")
+    parser.add_argument("--settle", type=float, default=SIMULATOR_SETTLE_TIME,
+                        help="settle time (s) of the simulated motors")
+    parser.add_argument("--speed", type=float, default=SIMULATOR_MOTOR_SPEED,
+                        help="speed (degrees/s) of the simulated motors")
+    args = parser.parse_args()
+
+    app = QCoreApplication([])  # noqa: F841 (Qt threads need an application)
+    print(f"{'Protocol':<10}{'Mode':<12}{'p50 RTT':>10}{'p95 RTT':>10}{'Throughput':>16}")
+    for protocol in (1, 2):
+        wnd = Window()
+        simulator = SimulatorThread(wnd.threads, args.speed, args.settle, 0, protocol)
+        simulator.start()
+        ser = SerialCom(wnd, simulator.port)
+        ser.th.ready.wait(5)  # protocol negotiated
+        for name, case in (("sequential", sequential), ("pipelined", pipelined)):
+            start = time.perf_counter()
+            round_trips = np.array(case(ser, args.commands)) * 1000
+            elapsed = time.perf_counter() - start
+            print(f"{ser.th.protocol:<10}{name:<12}{np.percentile(round_trips, 50):>7.1f} ms"
+                  f"{np.percentile(round_trips, 95):>7.1f} ms{args.commands / elapsed:>10.1f} cmd/s")
+        ser.close()
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+########################################
+#      Offline Tracking Benchmark      #
+########################################
+# Replay a recorded video through the tracking pipeline, without camera, sphere or RPi.
+# Run from the opti-sphere directory:
+#   python3 -m benchmarks.tracking_benchmark VIDEO --roi X Y W H [--tracker NAME ...] [--realtime] [--csv FILE]
+
+import argparse
+import csv
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from core.models.SerialCom import SerialCom
+from core.models.Sphere import Sphere
+from core.models.TrackerRegistry import TrackerRegistry
+from core.models.TrackingController import TrackingController
+from core.threads.TrackingThread import TrackingThread
+
+
+class StubSerial:  # stand-in for SerialCom recording the instructions instead of sending them to the RPi
+    ROT = SerialCom.ROT
+
+    def __init__(self):
+        self.instructions = []
+        self.frame_index = 0  # frame being processed when an instruction is sent
+
+    def send_instruction(self, mode, arg1, arg2, arg3):
+        self.instructions.append((self.frame_index, mode, (arg1, arg2, arg3)))
+
+
+def get_video_info(path):  # return the frame rate, estimated frame count and first frame of a video
+    capture = cv2.VideoCapture(path)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30
+    nb_frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    ret, frame = capture.read()
+    capture.release()
+    return fps, nb_frames, frame if ret else None
+
+
+def run(name, path, fps, roi, realtime):  # replay the video through a tracker and return the per-frame results
+    color = TrackerRegistry.is_color(name)
+    tracker = TrackerRegistry.create(name)
+    ser = StubSerial()
+    capture = cv2.VideoCapture(path)  # frames decoded as they are replayed, the video is never held in memory
+    _, frame = capture.read()
+    controller = TrackingController(Sphere(), ser, (frame.shape[1], frame.shape[0]))
+    tracker.init(TrackingThread.convert_frame(frame, color), roi)
+
+    rows = []  # (frame index, latency (s), ok, box, rotation sent)
+    clock = 0  # video time when the tracker is free again (realtime replay)
+    index, position = 1, 1  # next frame to track, next frame of the capture
+    while True:
+        while position < index and capture.grab():  # frames skipped in realtime replay are not decoded
+            position += 1
+        ret, frame = capture.read()
+        if not ret:
+            break
+        position += 1
+        ser.frame_index = index
+        start = time.perf_counter()
+        ok, box = tracker.update(TrackingThread.convert_frame(frame, color))
+        latency = time.perf_counter() - start
+        new_rot = controller.update(box) if ok else None
+        rows.append((index, latency, ok, tuple(int(v) for v in box), new_rot))
+        if realtime:  # like the tracking thread: frames captured during the update are skipped
+            clock = max(clock, index / fps) + latency
+            index = max(index + 1, int(np.ceil(clock * fps)))
+        else:
+            index += 1
+    capture.release()
+    return rows, ser.instructions, controller
+
+
+def get_recentre_times(rows, controller, fps):  # return the delays (s) between rotations and target back at center
+    delays, sent = [], None
+    for index, _, ok, box, new_rot in rows:
+        if new_rot:
+            sent = index
+        elif sent is not None and ok and is_centered(controller, box):
+            delays.append((index - sent) / fps)
+            sent = None
+    return delays, sent is not None
+
+
+def report(name, rows, instructions, controller, fps):  # print the statistics of a replay
+    if not rows:
+        print(f"{name}\n  no frame to track after the first one")
+        return
+    latencies = np.array([row[1] for row in rows]) * 1000
+    lost = sum(1 for row in rows if not row[2])
+    delays, pending = get_recentre_times(rows, controller, fps)
+    print(f"{name}")
+    print(f"  frames tracked      {len(rows)} ({lost} lost)")
+    print(f"  update latency      mean {latencies.mean():.2f} ms, p50 {np.percentile(latencies, 50):.2f} ms, "
+          f"p95 {np.percentile(latencies, 95):.2f} ms, max {latencies.max():.2f} ms")
+    print(f"  tracker rate        {1000 / latencies.mean():.1f} fps (video {fps:.1f} fps)")
+    print(f"  rotation commands   {len(instructions)}")
+    if delays:
+        print(f"  time to recentre    mean {np.mean(delays):.2f} s, max {np.max(delays):.2f} s "
+              f"({len(delays)} recentred{', 1 pending' if pending else ''})")
+    else:
+        print("  time to recentre    -")
+
+
+def is_centered(controller, box):  # return True if the box is close enough to the center to allow a new rotation
+    x, y = box[0] + box[2] / 2, box[1] + box[3] / 2
+    return (abs(x - controller.dimension[0] / 2) <= controller.tracking_offset and
+            abs(controller.dimension[1] / 2 - y) <= controller.tracking_offset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded video through the tracking pipeline")
+    parser.add_argument("video")
+    parser.add_argument("--roi", nargs=4, type=int, required=True, metavar=("X", "Y", "W", "H"),
+                        help="region of interest in the first frame")
+    parser.add_argument("--tracker", action="append", choices=TrackerRegistry.names(),
+                        help="tracker backend (repeat to compare several, all by default)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="skip the frames a live tracker would miss while updating")
+    parser.add_argument("--csv", help="file to write the per-frame results to")
+    args = parser.parse_args()
+
+    fps, nb_frames, frame = get_video_info(args.video)
+    if frame is None:
+        print(f"Could not read the video {args.video}")
+        sys.exit(1)
+    print(f"Video: {args.video}, ~{nb_frames} frames, {frame.shape[1]} × {frame.shape[0]}, {fps:.1f} fps")
+
+    results = []
+    for name in args.tracker or TrackerRegistry.names():
+        rows, instructions, controller = run(name, args.video, fps, tuple(args.roi), args.realtime)
+        report(name, rows, instructions, controller, fps)
+        results += [(name, *row) for row in rows]
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(["TRACKER", "FRAME", "LATENCY_MS", "OK", "X", "Y", "W", "H", "ROTATION"])
+            for name, index, latency, ok, box, new_rot in results:
+                writer.writerow([name, index, f"{latency * 1000:.3f}", int(ok), *box, new_rot or ""])
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,60 @@
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 720
 
+# Logging configuration
+LOG_LEVEL = "INFO"  # "DEBUG" also logs every packet exchanged with RPi
+
 # Serial configuration
 BAUD_RATE = 115200
+SERIAL_READ_TIMEOUT = 0.5  # longest blocking read (s) before checking the replies timeout
+SERIAL_TIMEOUT = 10  # time (s) without reply before a packet is considered lost
+SERIAL_HANDSHAKE_TIMEOUT = 2  # time (s) to wait for RPi to accept request identifiers at connection
+
+
+# Video recording configuration
+VIDEO_CODECS = {  # codec name: (FourCC, container)
+    "MJPG": ("MJPG", "avi"),
+    "XVID": ("XVID", "avi"),
+    "MP4V": ("mp4v", "mp4"),
+}
+VIDEO_CODEC = "MJPG"
+VIDEO_QUEUE_SIZE = 32  # frames waiting to be encoded
+
+# Frames storage configuration
+CACHE_DIRECTORY = "cache"
+FRAMES_DIRECTORY = "cache/frames"  # memory-mapped frames of the opened captures (emptied at startup)
+INDEX_DIRECTORY = "cache/index"  # frame index of the videos already opened
+FRAME_CACHE_SIZE = 32  # decoded frames kept in memory per capture
+VIDEO_READ_AHEAD = 16  # frames decoded in advance during video playback
+FRAME_LOADER_WORKERS = 4  # threads decoding the frames of a scan in parallel when it is opened
+THUMBNAIL_WIDTH = 320  # width (pixels) of the previews of the recovered captures
+PREVIEW_MAX_WIDTH = 640  # width (pixels) of the largest preview shown while dragging a slider
+PREVIEW_MIN_WIDTH = 160  # previews halved down to this width
+PREVIEW_CACHE_SIZE = 256  # memory (MB) for the previews of each capture
+PREVIEW_RADIUS = 32  # frames before and after the displayed one whose previews are built in the background
+SCAN_FORMAT = "TIFF (Deflate)"  # lossless format of the scan frames (see FrameWriter.formats)
+SCAN_PNG_COMPRESSION = 3  # zlib level (0-9) of the frames saved as PNG
+SCAN_WRITER_WORKERS = 2  # threads encoding and saving the frames of a scan in parallel
+SCAN_WRITE_QUEUE_SIZE = 16  # frames waiting to be saved before the scan waits for the disk
+
+# Tracking configuration
+TRACKING_SEARCH_MARGIN = 1.0  # search window extends this many target sizes around the target
+TRACKING_PYRAMID_LEVEL = 1  # search window halved this many times before tracking
+TRACKING_MIN_SIZE = 24  # smallest target side (pixels) kept after downscaling
+TRACKING_MATCH_THRESHOLD = 0.6  # minimum template similarity to find a lost target back in the full frame
+TRACKING_LOST_THRESHOLD = 0.2  # template similarity under which a tracked target is considered lost
+TRACKING_REFRESH_THRESHOLD = 0.8  # template similarity above which the template is replaced by the tracked target
+TRACKING_FOREGROUND_THRESHOLD = 30  # grey level difference from the background of the target's pixels
+TRACK_LOD_TOLERANCE = 1  # distance (pixels) allowed between a drawn track path and the tracked points
+TRACK_LOD_PREVIEW = 10000  # points of a track path drawn while its first level of detail is computed
+
+# Scanning configuration
+SCAN_SETTLE_TIME = 1  # time (s) left for the sphere to stop moving before each capture
+SCAN_MOTOR_SPEED = 30  # expected rotation speed (°/s) of the sphere, refined during a continuous scan
+SCAN_SEGMENT_ANGLE = 90  # angle (°) of each instruction sent during a continuous scan
 
+# Device simulator configuration
+SIMULATOR_MOTOR_SPEED = 90  # rotation speed (degrees per second) of the simulated motors
+SIMULATOR_SETTLE_TIME = SCAN_SETTLE_TIME  # time (s) for the simulated sphere to stop moving after a rotation
+SIMULATOR_ERROR_RATE = 0.0  # probability of a simulated motor error for each instruction
+SIMULATOR_PROTOCOL = 2  # serial protocol spoken by the simulator (1: no request identifiers)
@@ -0,0 +1,38 @@
+import threading
+import time
+
+
+class CaptureScheduler:  # pace a capture loop on a monotonic clock and measure its timing
+    def __init__(self, interval):
+        self.interval = interval  # seconds between two captures
+        self.stopped = threading.Event()
+        self.deadline = None  # time of the next capture
+        self.jitters = []  # delay between each deadline and the actual wake-up, in seconds
+        self.missed = 0  # deadlines skipped because the loop was late by more than one interval
+
+    def wait(self):  # sleep until the next deadline, return False once the scheduler is stopped
+        now = time.monotonic()
+        if self.deadline is None:  # first capture is immediate
+            self.deadline = now
+        if self.stopped.wait(max(0.0, self.deadline - now)):
+            return False
+        now = time.monotonic()
+        lateness = now - self.deadline
+        if 0 < self.interval <= lateness:  # keep the original phase, skip the deadlines missed
+            missed = int(lateness // self.interval)
+            self.missed += missed
+            self.deadline += missed * self.interval
+            lateness -= missed * self.interval
+        self.jitters.append(lateness)
+        self.deadline += self.interval
+        return True
+
+    def stop(self):  # wake up the loop and end it
+        self.stopped.set()
+
+    def get_report(self):  # return a summary of the capture timing
+        if not self.jitters:
+            return "no capture"
+        mean = 1000 * sum(self.jitters) / len(self.jitters)
+        return (f"{len(self.jitters)} captures, jitter mean {mean:.2f} ms / max {1000 * max(self.jitters):.2f} ms, "
+                f"{self.missed} missed deadlines")
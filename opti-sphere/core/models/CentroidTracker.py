@@ -0,0 +1,42 @@
+import cv2
+import numpy as np
+
+from config import TRACKING_SEARCH_MARGIN, TRACKING_FOREGROUND_THRESHOLD
+
+
+class CentroidTracker:  # tracker following the centroid of the pixels differing from the background around the target
+    def __init__(self, margin=TRACKING_SEARCH_MARGIN, threshold=TRACKING_FOREGROUND_THRESHOLD):
+        self.margin = margin
+        self.threshold = threshold
+        self.polarity = 1  # 1 if the target is brighter than the background, -1 if darker
+        self.min_area = 1  # fewest foreground pixels for the target to be considered found
+        self.box = None
+
+    def init(self, frame, box):  # learn whether the target is brighter or darker than the background
+        self.box = tuple(int(v) for v in box)
+        x, y, w, h = self.box
+        background = np.median(self.get_region(frame)[0])
+        self.polarity = 1 if frame[y:y + h, x:x + w].mean() >= background else -1
+        self.min_area = max(w * h // 20, 1)
+
+    def update(self, frame):  # return (ok, box) like OpenCV trackers
+        region, x0, y0 = self.get_region(frame)
+        background = int(np.median(region))  # the target covers a small part of the region
+        if self.polarity > 0:
+            difference = cv2.subtract(region, background)
+        else:
+            difference = cv2.subtract(np.full_like(region, background), region)
+        _, mask = cv2.threshold(difference, self.threshold, 255, cv2.THRESH_BINARY)
+        moments = cv2.moments(mask, binaryImage=True)
+        if moments['m00'] < self.min_area:
+            return False, self.box
+        _, _, w, h = self.box
+        cx, cy = x0 + moments['m10'] / moments['m00'], y0 + moments['m01'] / moments['m00']
+        self.box = (int(cx - w / 2), int(cy - h / 2), w, h)
+        return True, self.box
+
+    def get_region(self, frame):  # return the search region around the last box and its origin in the frame
+        x, y, w, h = self.box
+        x0, y0 = max(x - int(w * self.margin), 0), max(y - int(h * self.margin), 0)
+        x1, y1 = min(x + w + int(w * self.margin), frame.shape[1]), min(y + h + int(h * self.margin), frame.shape[0])
+        return frame[y0:y1, x0:x1], x0, y0
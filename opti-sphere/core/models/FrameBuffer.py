@@ -0,0 +1,54 @@
+import threading
+
+import numpy as np
+
+
+class FrameBuffer:  # fixed-capacity ring of preallocated frame slots, each stamped with a sequence number and a time
+    def __init__(self, shape, dtype=np.uint8, capacity=64):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+
+        self.slots = np.empty((capacity, *self.shape), dtype=self.dtype)  # frames memory, allocated once
+        self.seqs = np.full(capacity, -1, dtype=np.int64)  # sequence number stored in each slot
+        self.timestamps = np.zeros(capacity, dtype=np.float64)  # capture time of each slot (monotonic clock)
+
+        self.seq = -1  # sequence number of the last committed frame
+        self.condition = threading.Condition()
+
+    def fits(self, frame):  # return True if the frame can be stored in the slots
+        return frame is not None and frame.shape == self.shape and frame.dtype == self.dtype
+
+    def next_slot(self):  # return the slot the next frame must be written into (oldest frame of the ring)
+        return self.slots[(self.seq + 1) % self.capacity]
+
+    def commit(self, timestamp, frame=None):  # publish the frame written in next_slot() and return its sequence number
+        index = (self.seq + 1) % self.capacity
+        slot = self.slots[index]  # new view at each indexing: compare the memory, not the objects
+        if frame is not None and not np.may_share_memory(frame, slot):  # frame was not decoded in place
+            np.copyto(slot, frame)
+        with self.condition:
+            self.seq += 1
+            self.seqs[index] = self.seq
+            self.timestamps[index] = timestamp
+            self.condition.notify_all()
+        return self.seq
+
+    def latest(self):  # return (seq, timestamp, frame) of the newest frame without copying it, or None if empty
+        with self.condition:
+            if self.seq < 0:
+                return None
+            index = self.seq % self.capacity
+            return self.seq, self.timestamps[index], self.slots[index]
+
+    def next_after(self, seq, timeout=0):  # return the oldest frame still in the ring with a sequence above seq
+        with self.condition:
+            if self.seq <= seq and not self.condition.wait_for(lambda: self.seq > seq, timeout):
+                return None
+            next_seq = max(seq + 1, self.seq - self.capacity + 2)  # skip frames already overwritten (kept one free)
+            index = next_seq % self.capacity
+            return next_seq, self.timestamps[index], self.slots[index]
+
+    def is_valid(self, seq):  # return True if the frame of this sequence number has not been overwritten yet
+        with self.condition:
+            return 0 <= seq and self.seq - seq < self.capacity - 1
@@ -0,0 +1,31 @@
+import threading
+from collections import OrderedDict
+
+
+class FrameCache:  # thread-safe LRU cache of decoded frames indexed by frame number
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, index):
+        with self.lock:
+            return index in self.frames
+
+    def get(self, index):  # return the cached frame (marked as most recently used) or None
+        with self.lock:
+            frame = self.frames.get(index)
+            if frame is not None:
+                self.frames.move_to_end(index)
+            return frame
+
+    def put(self, index, frame):  # cache a frame, evicting the least recently used one if full
+        with self.lock:
+            self.frames[index] = frame
+            self.frames.move_to_end(index)
+            while len(self.frames) > self.capacity:
+                self.frames.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.frames.clear()
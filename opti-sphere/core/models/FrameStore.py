@@ -0,0 +1,96 @@
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+from config import FRAMES_DIRECTORY, FRAME_CACHE_SIZE
+from core.models.FrameCache import FrameCache
+
+logger = logging.getLogger(__name__)
+
+
+class FrameStore:  # fixed-shape frames stored in a memory-mapped file, indexed like a list
+    def __init__(self, shape, dtype=np.uint8, nb_frames=0):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.frame_size = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        os.makedirs(FRAMES_DIRECTORY, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(suffix=".frames", dir=FRAMES_DIRECTORY)
+        os.close(fd)
+        self.memmap = None
+        self.cache = FrameCache(FRAME_CACHE_SIZE)  # last frames read, the others stay in the file
+        self.reserved = 0  # frames allocated in the file
+        self.nb_frames = 0  # frames stored
+        if nb_frames:
+            self.reserve(nb_frames)
+            self.nb_frames = nb_frames
+
+    @classmethod
+    def from_frame(cls, frame, nb_frames=0):  # create a store for frames shaped like this one
+        return cls(frame.shape, frame.dtype, nb_frames)
+
+    def reserve(self, nb_frames):  # grow the file so it can hold nb_frames frames
+        if nb_frames <= self.reserved:
+            return
+        self.close_map()  # a mapped file cannot be resized on Windows
+        with open(self.path, 'r+b') as file:
+            file.truncate(nb_frames * self.frame_size)
+        self.memmap = np.memmap(self.path, dtype=self.dtype, mode='r+', shape=(nb_frames, *self.shape))
+        self.reserved = nb_frames
+
+    def fits(self, frame):  # return True if the frame can be stored with the others
+        return frame is not None and frame.shape == self.shape and frame.dtype == self.dtype
+
+    def append(self, frame):  # store a frame after the last one
+        if self.nb_frames == self.reserved:
+            self.reserve(max(16, 2 * self.reserved))  # amortize the remapping of the file
+        self.memmap[self.nb_frames] = frame
+        self.nb_frames += 1
+
+    def clear(self):  # forget the frames stored, the file keeps its size to store the next ones
+        self.nb_frames = 0
+        self.cache.clear()
+
+    def __len__(self):
+        return self.nb_frames
+
+    def __getitem__(self, index):  # return the frame at index (read from the file once, then from the cache)
+        if index < 0:
+            index += self.nb_frames
+        if not 0 <= index < self.nb_frames:
+            raise IndexError("Frame index out of range")
+        frame = self.cache.get(index)
+        if frame is None:
+            frame = self.read_frame(index)
+            self.cache.put(index, frame)
+        return frame
+
+    def read_frame(self, index):  # return a copy of the frame read from the file, without caching it
+        return np.array(self.memmap[index])  # copy: no view on the file outlives the store
+
+    def __setitem__(self, index, frame):  # replace the frame at index (negative index from the end, like a list)
+        if index < 0:
+            index += self.nb_frames
+        if not 0 <= index < self.nb_frames:
+            raise IndexError("Frame index out of range")
+        self.memmap[index] = frame
+        self.cache.put(index, np.array(self.memmap[index]))  # cached frame replaced too
+
+    def __iter__(self):
+        for index in range(self.nb_frames):
+            yield self[index]
+
+    def close_map(self):  # write the frames to the file and unmap it (no view on it is left: reads are copies)
+        if self.memmap is not None:
+            self.memmap.flush()
+            self.memmap = None
+
+    def release(self):  # unmap and delete the file
+        self.cache.clear()
+        self.close_map()  # a mapped file cannot be deleted on Windows
+        try:
+            os.remove(self.path)
+        except OSError as e:
+            logger.warning("%s", e)
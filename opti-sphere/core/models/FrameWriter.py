@@ -0,0 +1,60 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from config import SCAN_FORMAT, SCAN_PNG_COMPRESSION, SCAN_WRITER_WORKERS, SCAN_WRITE_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class FrameWriter:  # pool of threads encoding frames and saving them to a scan container in the background
+    formats = {  # format name: (image extension, OpenCV encoding parameters), all lossless
+        "Raw": (None, None),  # pixels stored as they are: fastest to save and to read
+        "TIFF": ("tiff", [cv2.IMWRITE_TIFF_COMPRESSION, 1]),
+        "TIFF (LZW)": ("tiff", [cv2.IMWRITE_TIFF_COMPRESSION, 5]),
+        "TIFF (Deflate)": ("tiff", [cv2.IMWRITE_TIFF_COMPRESSION, 8]),
+        "PNG": ("png", [cv2.IMWRITE_PNG_COMPRESSION]),  # level added from the configuration
+        "WebP (Lossless)": ("webp", [cv2.IMWRITE_WEBP_QUALITY, 101]),  # quality above 100 is lossless
+    }
+
+    def __init__(self, container, image_format=SCAN_FORMAT, level=SCAN_PNG_COMPRESSION):
+        self.container = container
+        self.extension, self.params = self.formats.get(image_format, self.formats[SCAN_FORMAT])
+        if self.params == [cv2.IMWRITE_PNG_COMPRESSION]:
+            self.params = [cv2.IMWRITE_PNG_COMPRESSION, level]
+        self.pool = ThreadPoolExecutor(SCAN_WRITER_WORKERS)  # OpenCV releases the GIL while encoding
+        self.slots = threading.Semaphore(SCAN_WRITE_QUEUE_SIZE)  # bounded so memory stays flat whatever the scan
+        self.nb_frames = 0  # frames saved
+        self.errors = 0  # frames that could not be saved
+        self.waited = 0  # time (s) spent waiting for a free slot in the queue
+
+    def add_frame(self, frame, number, *metadata):  # queue a frame to save, wait only if the queue is full
+        start = time.perf_counter()
+        self.slots.acquire()
+        self.waited += time.perf_counter() - start
+        self.pool.submit(self.write, frame, number, metadata)
+
+    def write(self, frame, number, metadata):  # encode the frame and append it to the container
+        try:
+            if self.extension is None:
+                data = frame.tobytes()
+            else:
+                ret, data = cv2.imencode("." + self.extension, frame, self.params)
+                if not ret:
+                    raise ValueError(f"Could not encode frame {number}")
+                data = data.tobytes()
+            self.container.append(number, data, *metadata)
+            self.nb_frames += 1
+        except (OSError, ValueError, cv2.error) as e:
+            logger.error("%s", e)
+            self.errors += 1
+        finally:
+            self.slots.release()
+
+    def stop(self):  # save the frames left in the queue
+        self.pool.shutdown(wait=True)
+        if self.errors:
+            logger.error("%d frames could not be saved in %s", self.errors, self.container.path)
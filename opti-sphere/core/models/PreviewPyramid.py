@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from config import PREVIEW_MAX_WIDTH, PREVIEW_MIN_WIDTH, PREVIEW_CACHE_SIZE
+
+
+class PreviewPyramid:  # thread-safe LRU cache of downscaled copies of frames, several resolutions per frame
+    def __init__(self, capacity=PREVIEW_CACHE_SIZE * 2 ** 20):
+        self.capacity = capacity  # bytes
+        self.previews = OrderedDict()  # index -> previews of the frame, from the largest to the smallest
+        self.size = 0  # bytes used
+        self.lock = threading.Lock()
+
+    def __contains__(self, index):
+        with self.lock:
+            return index in self.previews
+
+    def is_full(self):  # return True if a new frame would evict another one
+        with self.lock:
+            return self.size >= self.capacity
+
+    @staticmethod
+    def build(frame):  # return the previews of the frame, halved from under PREVIEW_MAX_WIDTH to PREVIEW_MIN_WIDTH
+        level = frame
+        while level.shape[1] > PREVIEW_MAX_WIDTH:
+            level = cv2.resize(level, (level.shape[1] // 2, level.shape[0] // 2), interpolation=cv2.INTER_AREA)
+        levels = [np.array(level) if level is frame else level]  # never keep a view on the capture's frames
+        while levels[-1].shape[1] // 2 >= PREVIEW_MIN_WIDTH:
+            level = levels[-1]
+            levels.append(cv2.resize(level, (level.shape[1] // 2, level.shape[0] // 2), interpolation=cv2.INTER_AREA))
+        return levels
+
+    def put(self, index, frame):  # build and cache the previews of a frame, evicting the least recently used ones
+        levels = self.build(frame)
+        with self.lock:
+            if index in self.previews:
+                self.size -= sum(level.nbytes for level in self.previews.pop(index))
+            self.previews[index] = levels
+            self.size += sum(level.nbytes for level in levels)
+            while self.size > self.capacity and len(self.previews) > 1:
+                _, evicted = self.previews.popitem(last=False)
+                self.size -= sum(level.nbytes for level in evicted)
+
+    def get(self, index, width=0):  # return the smallest preview at least width pixels wide (or the largest one)
+        with self.lock:
+            levels = self.previews.get(index)
+            if levels is None:
+                return None
+            self.previews.move_to_end(index)
+        return next((level for level in reversed(levels) if level.shape[1] >= width), levels[0])
+
+    def clear(self):
+        with self.lock:
+            self.previews.clear()
+            self.size = 0
@@ -0,0 +1,264 @@
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+
+import cv2
+import numpy as np
+
+from config import FRAME_CACHE_SIZE
+from core.models.FrameCache import FrameCache
+
+logger = logging.getLogger(__name__)
+
+
+class ScanContainer:  # single file storing the frames of a scan with their metadata, indexed like a list
+    # file: header + chunks, chunk: tag + size + CRC32 of the data + data
+    #   INFO: scan information (JSON), written first
+    #   FRAM: frame number, axis, grid angle, angle, capture time + encoded frame, appended in any order
+    #   TIME: duration of the scan steps (CSV)
+    #   INDX: number of frames, position and metadata of every frame, then tag and position of the other chunks,
+    #         written when the scan is closed (its position is in the header)
+    # a file without index (scan interrupted) is indexed again by reading the chunks, up to the first damaged one
+    MAGIC = b"OSCAN\r\n\x1a"
+    VERSION = 2  # 1: index of the frames only, the other chunks found by reading the chunks before it
+    HEADER = struct.Struct("<8sHHQI4x")  # magic, version, flags, index position, index size
+    CHUNK = struct.Struct("<4sII")  # tag, size, CRC32
+    FRAME = struct.Struct("<IcdddQ")  # frame number, axis, grid angle, angle, capture time, (position in index)
+    OTHER = struct.Struct("<4sQ")  # tag, position of another chunk (in index)
+    COUNT = struct.Struct("<I")  # number of frames (in index)
+    EXTENSION = ".osc"
+
+    def __init__(self, path, info=None):  # open the container at path, or create it with the scan info
+        self.path = path
+        self.lock = threading.Lock()  # one seek + read/write at a time
+        self.index = {}  # frame number -> (position of the chunk, grid angle, angle, capture time, axis)
+        self.chunks = {}  # tag -> data of the other chunks
+        self.chunk_positions = {}  # tag -> position of the other chunks written, listed in the index
+        self.cache = FrameCache(FRAME_CACHE_SIZE)
+        self.nb_frames = 0  # frames that can be read, numbered without gap from the first one
+        self.writable = info is not None
+        if self.writable:
+            self.info = dict(info)
+            self.file = open(path, 'w+b')
+            self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0, 0, 0))
+            self.write_chunk(b"INFO", json.dumps(self.info).encode('utf-8'))
+        else:
+            self.info = {}
+            self.file = open(path, 'rb')
+            self.read_index()
+        self.nb_frames = self.count_frames()
+
+    @classmethod
+    def is_container(cls, path):  # return True if the file is a scan container
+        try:
+            with open(path, 'rb') as file:
+                return file.read(len(cls.MAGIC)) == cls.MAGIC
+        except OSError:
+            return False
+
+    @classmethod
+    def read_info(cls, path):  # return the scan information without indexing the frames, None if not readable
+        try:
+            with open(path, 'rb') as file:
+                header = file.read(cls.HEADER.size)
+                if len(header) < cls.HEADER.size or header[:len(cls.MAGIC)] != cls.MAGIC:
+                    return None
+                tag, size, crc = cls.CHUNK.unpack(file.read(cls.CHUNK.size))
+                data = file.read(size)
+        except (OSError, struct.error) as e:
+            logger.warning("%s", e)
+            return None
+        if tag != b"INFO" or zlib.crc32(data) != crc:
+            return None
+        return json.loads(data.decode('utf-8'))
+
+    @classmethod
+    def read_first_frame(cls, path):  # return the first frame reading only the chunks before it, None if not saved
+        info = cls.read_info(path)
+        if info is None:
+            return None
+        with open(path, 'rb') as file:  # frames are appended about in order: the first one is among the first chunks
+            file.seek(0, os.SEEK_END)
+            end = file.tell()
+            position = cls.HEADER.size
+            while position + cls.CHUNK.size <= end:
+                file.seek(position)
+                tag, size, crc = cls.CHUNK.unpack(file.read(cls.CHUNK.size))
+                if position + cls.CHUNK.size + size > end:  # cut by a crash
+                    return None
+                if tag == b"FRAM" and cls.FRAME.unpack(file.read(cls.FRAME.size))[0] == 0:
+                    file.seek(position + cls.CHUNK.size)
+                    data = file.read(size)
+                    if zlib.crc32(data) != crc:
+                        return None
+                    return cls.decode(data[cls.FRAME.size:], info)
+                position += cls.CHUNK.size + size
+        return None
+
+    @property
+    def shape(self):
+        return tuple(self.info.get('shape', ()))
+
+    @property
+    def dtype(self):
+        return np.dtype(self.info.get('dtype', 'uint8'))
+
+    def write_chunk(self, tag, data):  # append a chunk at the end of the file, return its position
+        with self.lock:
+            self.file.seek(0, os.SEEK_END)
+            position = self.file.tell()
+            self.file.write(self.CHUNK.pack(tag, len(data), zlib.crc32(data)) + data)
+            self.file.flush()
+            os.fsync(self.file.fileno())  # a frame reported as saved survives a crash
+        return position
+
+    def read_chunk(self, position):  # return (tag, data) of the chunk at position, None if damaged
+        with self.lock:
+            self.file.seek(position)
+            header = self.file.read(self.CHUNK.size)
+            if len(header) < self.CHUNK.size:
+                return None
+            tag, size, crc = self.CHUNK.unpack(header)
+            data = self.file.read(size)
+        if len(data) < size or zlib.crc32(data) != crc:
+            return None
+        return tag, data
+
+    def append(self, number, data, grid_angle=0.0, angle=0.0, timestamp=0.0):  # save an encoded frame
+        axis = b"B" if self.info.get('axis') == "Pitch" else b"A"
+        metadata = self.FRAME.pack(number, axis, grid_angle, angle, timestamp, 0)
+        position = self.write_chunk(b"FRAM", metadata + data)
+        with self.lock:
+            self.index[number] = (position, grid_angle, angle, timestamp, axis.decode())
+            self.nb_frames = self.count_frames()
+
+    def add_chunk(self, tag, data):  # save additional data of the scan (read back with get_chunk)
+        self.chunk_positions[tag] = self.write_chunk(tag, data)
+        self.chunks[tag] = data
+
+    def get_chunk(self, tag):
+        return self.chunks.get(tag)
+
+    def close(self):  # write the index and its position in the header, then close the file
+        if self.writable and not self.file.closed:
+            data = self.COUNT.pack(len(self.index)) + b"".join(
+                self.FRAME.pack(number, axis.encode(), grid_angle, angle, timestamp, position)
+                for number, (position, grid_angle, angle, timestamp, axis) in sorted(self.index.items())
+            ) + b"".join(self.OTHER.pack(tag, position) for tag, position in self.chunk_positions.items())
+            position = self.write_chunk(b"INDX", data)
+            with self.lock:
+                self.file.seek(0)
+                self.file.write(self.HEADER.pack(self.MAGIC, self.VERSION, 0, position, len(data)))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+        self.file.close()
+
+    def read_index(self):  # load the index, or rebuild it from the chunks if the scan was interrupted
+        header = self.file.read(self.HEADER.size)
+        if len(header) < self.HEADER.size or header[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"{self.path} is not a scan file")
+        _, version, _, index_position, _ = self.HEADER.unpack(header)
+        if version > self.VERSION:
+            raise ValueError(f"{self.path} was saved by a newer version")
+        chunk = self.read_chunk(self.HEADER.size)
+        if chunk is None or chunk[0] != b"INFO":
+            raise ValueError(f"{self.path} is damaged")
+        self.info = json.loads(chunk[1].decode('utf-8'))
+        chunk = self.read_chunk(index_position) if index_position else None
+        if chunk is not None and chunk[0] == b"INDX":
+            data, start, end = chunk[1], 0, len(chunk[1])  # version 1: frames only
+            if version >= 2:
+                start = self.COUNT.size
+                end = start + self.COUNT.unpack_from(data)[0] * self.FRAME.size
+            for offset in range(start, end, self.FRAME.size):
+                number, axis, grid_angle, angle, timestamp, position = self.FRAME.unpack_from(data, offset)
+                self.index[number] = (position, grid_angle, angle, timestamp, axis.decode())
+            if version < 2:  # other chunks not in the index: read the chunk headers before it
+                position = self.HEADER.size
+                while position < index_position:
+                    tag, size = self.read_chunk_header(position)
+                    self.read_other_chunk(tag, position)
+                    position += self.CHUNK.size + size
+            for offset in range(end, len(data), self.OTHER.size):
+                tag, position = self.OTHER.unpack_from(data, offset)
+                self.read_other_chunk(tag, position)
+        else:
+            self.rebuild_index()
+
+    def rebuild_index(self):  # read the chunk headers one after the other, stop at the first damaged chunk
+        self.file.seek(0, os.SEEK_END)
+        end = self.file.tell()
+        position = self.HEADER.size
+        while position + self.CHUNK.size <= end:
+            tag, size = self.read_chunk_header(position)
+            following = position + self.CHUNK.size + size
+            if following > end or (following == end and self.read_chunk(position) is None):  # cut by the crash
+                break
+            if tag == b"FRAM":
+                with self.lock:
+                    self.file.seek(position + self.CHUNK.size)
+                    number, axis, grid_angle, angle, timestamp, _ = self.FRAME.unpack(self.file.read(self.FRAME.size))
+                self.index[number] = (position, grid_angle, angle, timestamp, axis.decode())
+            else:
+                self.read_other_chunk(tag, position)
+            position = following
+        logger.info("Scan file %s indexed again: %d frames recovered", self.path, len(self.index))
+
+    def read_chunk_header(self, position):  # return (tag, size) of the chunk at position
+        with self.lock:
+            self.file.seek(position)
+            tag, size, _ = self.CHUNK.unpack(self.file.read(self.CHUNK.size))
+        return tag, size
+
+    def read_other_chunk(self, tag, position):  # keep the additional data of the scan
+        if tag in (b"FRAM", b"INFO", b"INDX"):
+            return
+        chunk = self.read_chunk(position)
+        if chunk is not None:
+            self.chunks[tag] = chunk[1]
+
+    def count_frames(self):  # frames numbered without gap from the first one (frames can be saved out of order)
+        count = self.nb_frames
+        while count in self.index:
+            count += 1
+        return count
+
+    def get_metadata(self, number):  # return (grid angle, angle, capture time, axis) of the frame
+        return self.index[number][1:]
+
+    def __len__(self):
+        return self.nb_frames
+
+    def __getitem__(self, number):  # return the frame (decoded from the file and cached)
+        if number < 0:
+            number += self.nb_frames
+        if not 0 <= number < self.nb_frames:
+            raise IndexError("Frame index out of range")
+        frame = self.cache.get(number)
+        if frame is None:
+            frame = self.read_frame(number)
+            self.cache.put(number, frame)
+        return frame
+
+    def read_frame(self, number):  # return the frame decoded from the file, without caching it
+        chunk = self.read_chunk(self.index[number][0])
+        if chunk is None:
+            raise IOError(f"Frame {number} of {self.path} is damaged")
+        return self.decode(chunk[1][self.FRAME.size:], self.info)
+
+    def __iter__(self):
+        for number in range(self.nb_frames):
+            yield self[number]
+
+    @staticmethod
+    def decode(data, info):  # return the frame stored in data with the format of the scan
+        if info.get('format') == "Raw":
+            return np.frombuffer(data, dtype=np.dtype(info.get('dtype', 'uint8'))).reshape(info['shape']).copy()
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+    def release(self):  # close the file (kept on disk)
+        self.cache.clear()
+        self.close()
@@ -0,0 +1,115 @@
+import math
+
+import cv2
+
+from config import (TRACKING_SEARCH_MARGIN, TRACKING_PYRAMID_LEVEL, TRACKING_MIN_SIZE, TRACKING_MATCH_THRESHOLD,
+                    TRACKING_LOST_THRESHOLD, TRACKING_REFRESH_THRESHOLD)
+
+
+class SearchWindowTracker:  # tracker working on a downscaled window around the target, boxes in frame coordinates
+    def __init__(self, create_tracker, margin=TRACKING_SEARCH_MARGIN, level=TRACKING_PYRAMID_LEVEL):
+        self.create_tracker = create_tracker  # function returning a new tracker (cv2.TrackerCSRT_create for example)
+        self.margin = margin
+        self.max_level = level
+        self.level = level  # pyramid level used for the current target
+        self.tracker = None
+        self.window = None  # search window (x, y, w, h) in frame coordinates
+        self.template = None  # downscaled target last tracked with confidence, searched for in the full frame when lost
+        self.box = None  # last box found in frame coordinates
+        self.full_frame_searches = 0
+
+    def init(self, frame, box):  # initialize the tracker on a window around the box
+        self.box = tuple(int(v) for v in box)
+        x, y, w, h = self.box
+        # do not downscale small targets below TRACKING_MIN_SIZE
+        self.level = max(0, min(self.max_level, int(math.log2(max(min(w, h), 1) / TRACKING_MIN_SIZE))))
+        self.template = self.downscale(frame[y:y + h, x:x + w])
+        self.start_window(frame, self.get_window(frame, self.box))
+
+    def update(self, frame):  # return (ok, box) like OpenCV trackers
+        window = self.downscale(self.crop(frame))
+        ok, box = self.tracker.update(window)
+        similarity = self.similarity(window, box) if ok else -1
+        if similarity >= TRACKING_LOST_THRESHOLD:
+            if similarity >= TRACKING_REFRESH_THRESHOLD:  # follow the changes of the target's appearance
+                self.refresh_template(window, box)
+            self.box = self.to_frame(box)
+            if self.is_near_edge(frame):  # move the window with the target
+                self.start_window(frame, self.get_window(frame, self.box))
+            return True, self.box
+        box = self.search(frame)
+        if box is None:
+            return False, self.box
+        self.box = box
+        self.start_window(frame, self.get_window(frame, box))
+        return True, self.box
+
+    def start_window(self, frame, window):  # (re)initialize the tracker on a new search window
+        self.window = window
+        self.tracker = self.create_tracker()
+        self.tracker.init(self.downscale(self.crop(frame)), self.to_window(self.box))
+
+    def get_window(self, frame, box):  # return the search window centered on the box, inside the frame
+        x, y, w, h = box
+        win_w = min(int(w * (1 + 2 * self.margin)), frame.shape[1])
+        win_h = min(int(h * (1 + 2 * self.margin)), frame.shape[0])
+        win_x = min(max(int(x + w / 2 - win_w / 2), 0), frame.shape[1] - win_w)
+        win_y = min(max(int(y + h / 2 - win_h / 2), 0), frame.shape[0] - win_h)
+        return win_x, win_y, win_w, win_h
+
+    def is_near_edge(self, frame):  # return True if the box is closer than half the margin to a side of the window
+        x, y, w, h = self.box  # sides on the frame borders are ignored: the window cannot move past them
+        win_x, win_y, win_w, win_h = self.window
+        gap_x, gap_y = self.margin * w / 2, self.margin * h / 2
+        return ((win_x > 0 and x - win_x < gap_x) or
+                (win_x + win_w < frame.shape[1] and win_x + win_w - (x + w) < gap_x) or
+                (win_y > 0 and y - win_y < gap_y) or
+                (win_y + win_h < frame.shape[0] and win_y + win_h - (y + h) < gap_y))
+
+    def refresh_template(self, window, box):  # replace the template by the target tracked in the downscaled window
+        x, y, w, h = (int(v) for v in box)
+        if x >= 0 and y >= 0 and x + w <= window.shape[1] and y + h <= window.shape[0] and w > 0 and h > 0:
+            self.template = window[y:y + h, x:x + w].copy()
+
+    def search(self, frame):  # look for the target in the whole frame and return its box, or None if not found
+        self.full_frame_searches += 1
+        image = self.downscale(frame)
+        if image.shape[0] < self.template.shape[0] or image.shape[1] < self.template.shape[1]:
+            return None
+        result = cv2.matchTemplate(image, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        if score < TRACKING_MATCH_THRESHOLD:
+            return None
+        return self.to_frame((*location, self.template.shape[1], self.template.shape[0]), (0, 0))
+
+    def similarity(self, window, box):  # return how much the box of the downscaled window looks like the template
+        x, y, w, h = (int(v) for v in box)
+        if w <= 0 or h <= 0:
+            return -1
+        pad_x, pad_y = w // 4 + 1, h // 4 + 1  # tolerate a small misalignment of the box
+        patch = window[max(y - pad_y, 0):y + h + pad_y, max(x - pad_x, 0):x + w + pad_x]
+        scale = self.template.shape[1] / w  # box size may differ from the initial target's
+        patch = cv2.resize(patch, (int(patch.shape[1] * scale), int(patch.shape[0] * scale)))
+        if patch.shape[0] < self.template.shape[0] or patch.shape[1] < self.template.shape[1]:
+            return -1
+        return cv2.matchTemplate(patch, self.template, cv2.TM_CCOEFF_NORMED).max()
+
+    def crop(self, frame):  # return the search window of the frame
+        x, y, w, h = self.window
+        return frame[y:y + h, x:x + w]
+
+    def downscale(self, image):  # return the image at the pyramid level of the target
+        for _ in range(self.level):
+            image = cv2.pyrDown(image)
+        return image
+
+    def to_window(self, box):  # convert a box from frame coordinates to downscaled window coordinates
+        scale = 2 ** self.level
+        return (int((box[0] - self.window[0]) / scale), int((box[1] - self.window[1]) / scale),
+                max(int(box[2] / scale), 1), max(int(box[3] / scale), 1))
+
+    def to_frame(self, box, origin=None):  # convert a box from downscaled window (or origin) coordinates to the frame
+        scale = 2 ** self.level
+        origin = origin or self.window[:2]
+        return (int(box[0] * scale + origin[0]), int(box[1] * scale + origin[1]),
+                int(box[2] * scale), int(box[3] * scale))
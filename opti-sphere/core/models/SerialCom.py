@@ -5,11 +5,15 @@ import serial
 from PySide6.QtCore import Signal, QObject
 from PySide6.QtWidgets import QMessageBox
 
-from config import BAUD_RATE
+from config import BAUD_RATE, SERIAL_READ_TIMEOUT
+from core.models.SerialRequest import SerialRequest
 from core.threads.SerialThread import SerialThread
 
 
 class SerialCom(serial.Serial):  # defines the properties and functions of a serial communication
+    # packet: SOP + category + content + EOP
+    # protocol 2 (accepted by RPi replying RESPONSE "protocol 2" to the command "protocol 2"):
+    #   SOP + category + DLE + request id + SEP + content + EOP, replies carry the id of their request
     SOP = b'\x01'  # Start Of Packet
     EOP = b'\x04'  # End Of Packet
     DLE = b'\x10'  # Data Link Escape
@@ -23,8 +27,6 @@ class SerialCom(serial.Serial):  # defines the properties and functions of a ser
     ROT = b'\x25'  # rotation mode for instruction
     SCAN = b'\x26'  # scan mode for instruction
 
-    is_done = False  # set the transmission as over
-
     def __init__(self, wnd, port=None):
         super().__init__(
             port=port,
@@ -32,12 +34,15 @@ class SerialCom(serial.Serial):  # defines the properties and functions of a ser
             parity=serial.PARITY_NONE,
             stopbits=serial.STOPBITS_ONE,
             bytesize=serial.EIGHTBITS,
-            timeout=1
+            timeout=SERIAL_READ_TIMEOUT
         )
 
         self.signal_holder = SignalHolder()
         self.wnd = wnd
-        self.th = None
+        self.th = SerialThread(self, self.wnd.threads)  # single worker writing and reading the port
+        self.th.response_signal.connect(self.handle_response)
+        if self.is_open:
+            self.th.start()
 
     def available_port(self):  # return all the available ports (USB ports) detected by the computer
         if sys.platform.startswith('win'):
@@ -61,22 +66,16 @@ class SerialCom(serial.Serial):  # defines the properties and functions of a ser
 
     def send_instruction(self, mode, arg1, arg2, arg3):  # send instruction to RPi according to the protocol format
         arg1, arg2, arg3 = (bytes(str(i), 'utf-8') for i in (arg1, arg2, arg3))
-        packet = self.SOP + self.INSTRUCTION + mode + self.SEP + arg1 + self.SEP + arg2 + self.SEP + arg3 + self.EOP
-
-        if self.th and self.th.isRunning():
-            self.th.stop()
-        self.th = SerialThread(self, packet, self.wnd.threads)
-        self.th.response_signal.connect(self.handle_response)
-        self.th.start()
+        return self.send(self.INSTRUCTION, mode + self.SEP + arg1 + self.SEP + arg2 + self.SEP + arg3)
 
     def send_command(self, command):  # send command to RPi
-        packet = self.SOP + self.COMMAND + bytes(command, 'utf-8') + self.EOP
+        return self.send(self.COMMAND, bytes(command, 'utf-8'))
 
-        if self.th and self.th.isRunning():
-            self.th.stop()
-        self.th = SerialThread(self, packet, self.wnd.threads)
-        self.th.response_signal.connect(self.handle_response)
-        self.th.start()
+    def send(self, category, payload):  # queue a request for the serial worker and return it (None if not sent)
+        if not self.isOpen():  # check if serial port is open
+            print("Serial Not opened")
+            return None
+        return self.th.send(SerialRequest(category, payload))
 
     def handle_response(self, category, content):  # act accordingly to the type of response from RPi
         if category == self.ALL_DONE:
@@ -87,10 +86,13 @@ class SerialCom(serial.Serial):  # defines the properties and functions of a ser
         elif category == self.ERROR:
             error = content.decode('utf-8')
             print("Error:", error)
-            self.th.stop()
             QMessageBox.critical(self.wnd, "Error", error, QMessageBox.StandardButton.Ok)
             self.wnd.sphere.undo_rot()
-            self.reset_input_buffer()
+
+    def close(self):  # stop the serial worker before closing the port
+        if getattr(self, 'th', None):
+            self.th.stop()
+        super().close()
 
 
 class SignalHolder(QObject):
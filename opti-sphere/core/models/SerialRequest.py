@@ -0,0 +1,29 @@
+import itertools
+import threading
+import time
+
+
+class SerialRequest:  # packet sent to RPi, identified to match its replies, completed by ALL_DONE or ERROR
+    ids = itertools.count(1)
+
+    def __init__(self, category, payload, internal=False):
+        self.id = next(self.ids) % 10000  # sent as text: never mistaken for a control byte
+        self.category = category
+        self.payload = payload  # bytes between the category and EOP
+        self.internal = internal  # replies handled by the serial worker only (not sent to the GUI)
+
+        self.sent = None  # time the packet was written
+        self.last_activity = None  # time of the last reply, for the timeout
+        self.status = None  # category that completed the request (ALL_DONE or ERROR)
+        self.success = False  # completed by ALL_DONE
+        self.round_trip = None  # time (s) between the packet written and its completion
+        self.done = threading.Event()  # set once completed, or canceled
+
+    def complete(self, status, success):  # set the request as completed by the reply category
+        self.status = status
+        self.success = success
+        self.round_trip = time.perf_counter() - self.sent if self.sent else None
+        self.done.set()
+
+    def wait(self, timeout=None):  # block until the request is completed, return True if completed successfully
+        return self.done.wait(timeout) and self.success
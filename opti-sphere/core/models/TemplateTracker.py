@@ -0,0 +1,29 @@
+import cv2
+
+from config import TRACKING_SEARCH_MARGIN, TRACKING_MATCH_THRESHOLD
+
+
+class TemplateTracker:  # tracker looking for the initial target by normalized template matching around its last box
+    def __init__(self, margin=TRACKING_SEARCH_MARGIN):
+        self.margin = margin
+        self.template = None
+        self.box = None
+
+    def init(self, frame, box):  # keep the target as template
+        self.box = tuple(int(v) for v in box)
+        x, y, w, h = self.box
+        self.template = frame[y:y + h, x:x + w].copy()
+
+    def update(self, frame):  # return (ok, box) like OpenCV trackers
+        x, y, w, h = self.box
+        x0, y0 = max(x - int(w * self.margin), 0), max(y - int(h * self.margin), 0)
+        x1, y1 = min(x + w + int(w * self.margin), frame.shape[1]), min(y + h + int(h * self.margin), frame.shape[0])
+        region = frame[y0:y1, x0:x1]
+        if region.shape[0] < self.template.shape[0] or region.shape[1] < self.template.shape[1]:
+            return False, self.box
+        result = cv2.matchTemplate(region, self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, location = cv2.minMaxLoc(result)
+        if score < TRACKING_MATCH_THRESHOLD:
+            return False, self.box
+        self.box = (x0 + location[0], y0 + location[1], self.template.shape[1], self.template.shape[0])
+        return True, self.box
@@ -0,0 +1,153 @@
+import csv
+import datetime
+
+import numpy as np
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class TrackBuffer:  # growable columnar storage of the points of a track: R, θ, φ (radians) and time (seconds)
+    COLUMNS = ["R", "THETA", "PHI", "TIME"]
+
+    def __init__(self, capacity=1024):
+        self.data = np.empty((4, capacity), dtype=np.float64)  # one row per column: each column is contiguous
+        self.nb_points = 0
+
+    def __len__(self):
+        return self.nb_points
+
+    @property
+    def r(self):
+        return self.data[0, :self.nb_points]
+
+    @property
+    def theta(self):
+        return self.data[1, :self.nb_points]
+
+    @property
+    def phi(self):
+        return self.data[2, :self.nb_points]
+
+    @property
+    def time(self):  # seconds since 1970-01-01 of the local date and time of each point
+        return self.data[3, :self.nb_points]
+
+    @staticmethod
+    def to_seconds(date):  # convert a (naive, local) datetime to the time stored in the buffer
+        return (date - EPOCH).total_seconds()
+
+    @staticmethod
+    def to_datetime(seconds):  # convert a time stored in the buffer back to a datetime
+        return EPOCH + datetime.timedelta(seconds=float(seconds))
+
+    def append(self, r, theta, phi, date):  # add a point, doubling the capacity when the buffer is full
+        if self.nb_points == self.data.shape[1]:
+            data = np.empty((4, max(1, 2 * self.data.shape[1])), dtype=np.float64)
+            data[:, :self.nb_points] = self.data[:, :self.nb_points]
+            self.data = data
+        self.data[:, self.nb_points] = (r, theta, phi, self.to_seconds(date))
+        self.nb_points += 1
+
+    def get_cartesian(self, start=0):  # return the (x, y, z) coordinates of the points from start, one row per point
+        r, theta, phi = self.r[start:], self.theta[start:], self.phi[start:]
+        return np.column_stack((r * np.sin(phi) * np.cos(theta), r * np.sin(phi) * np.sin(theta), r * np.cos(phi)))
+
+    def get_speeds(self, start=0):  # return the speed between each point from start (2nd at least) and the previous one
+        start = max(1, start)
+        r1, theta1, phi1 = self.r[start:], self.theta[start:], self.phi[start:]
+        r2, theta2, phi2 = self.r[start - 1:-1], self.theta[start - 1:-1], self.phi[start - 1:-1]
+        d = np.sqrt(np.maximum(0, r1 * r1 + r2 * r2 - 2 * r1 * r2 * (
+                np.sin(theta1) * np.sin(theta2) * np.cos(phi1 - phi2) + np.cos(theta1) * np.cos(theta2))))
+        with np.errstate(divide='ignore', invalid='ignore'):  # points found at the same time: infinite speed
+            return d / np.diff(self.time[start - 1:])
+
+    def get_colors(self, start=0):  # return the color of the segments ending from start, from yellow to red with speed
+        alpha = 1 / np.fmax(1, self.get_speeds(start) * 0.1)  # fmax: undefined speeds count as slow
+        return np.column_stack((np.ones_like(alpha), alpha, np.zeros_like(alpha)))
+
+    def get_distances(self):  # return the distance in centimetres between each point and the previous one
+        phi1, phi2 = self.phi[1:], self.phi[:-1]
+        cos = np.sin(phi1) * np.sin(phi2) + np.cos(phi1) * np.cos(phi2) * np.cos(self.theta[:-1] - self.theta[1:])
+        return self.r[1:] * np.arccos(np.clip(cos, -1, 1))
+
+    def get_distance(self):  # return the total distance in centimetres traveled along the track
+        return float(np.sum(self.get_distances()))
+
+    def get_simplified(self, tolerance, stop=None):  # return the indexes of the points (until stop) to keep to follow
+        # the path within tolerance. Douglas-Peucker along great circles: a segment is split at its farthest point from
+        # the arc joining its ends (angle in radians) until no point is farther than tolerance. All the segments are
+        # split at once.
+        nb_points = len(self) if stop is None else stop  # stop: points appended during the simplification ignored
+        if nb_points < 3:
+            return np.arange(nb_points)
+        theta, phi = self.theta[:nb_points], self.phi[:nb_points]
+        points = np.stack((np.sin(phi) * np.cos(theta), np.sin(phi) * np.sin(theta), np.cos(phi)))  # unit vectors
+        kept = np.array([0, nb_points - 1])
+        active = np.array([True])  # segments between kept points which may still need a split
+        while active.any():
+            starts, ends = kept[:-1][active], kept[1:][active]
+            lengths = ends - starts - 1
+            filled = lengths > 0
+            if not filled.any():
+                break
+            offsets = np.cumsum(lengths) - lengths
+            inner = np.arange(lengths.sum()) - np.repeat(offsets - starts - 1, lengths)  # points inside the segments
+            segment = np.repeat(np.arange(len(starts)), lengths)
+            distances = self.get_arc_distances(points[:, inner], segment, points[:, starts], points[:, ends])
+            farthest = np.maximum.reduceat(distances, offsets[filled])  # largest distance in each segment
+            split = np.zeros(len(starts), dtype=bool)
+            split[filled] = farthest > tolerance
+            if not split.any():
+                break
+            is_farthest = np.flatnonzero(distances == np.repeat(farthest, lengths[filled]))
+            is_farthest = is_farthest[np.unique(segment[is_farthest], return_index=True)[1]]  # first one per segment
+            new_points = inner[is_farthest][split[segment[is_farthest]]]
+            kept = np.union1d(kept, new_points)
+            active = np.isin(kept[:-1], np.concatenate((starts[split], new_points)))
+        return kept
+
+    @staticmethod
+    def get_arc_distances(points, segment, a, b):  # return the angles between unit vectors and great circle arcs a -> b
+        # vectors stored in columns (x, y, z rows): the column i of points is compared to the arc of segment[i]
+        normals = np.cross(a, b, axis=0)
+        norms = np.linalg.norm(normals, axis=0)
+        normals = normals / np.where(norms > 1e-12, norms, np.inf)  # ends (almost) equal: no arc, distance to the ends
+        after_a, before_b = np.cross(normals, a, axis=0), np.cross(b, normals, axis=0)
+
+        def dot(vectors):  # dot product of each point with the vector of its segment
+            return points[0] * vectors[0][segment] + points[1] * vectors[1][segment] + points[2] * vectors[2][segment]
+
+        distances = np.abs(np.arcsin(np.clip(dot(normals), -1, 1)))  # to the great circle
+        outside = np.flatnonzero((dot(after_a) < 0) | (dot(before_b) < 0) | (norms[segment] <= 1e-12))
+        if len(outside):  # projection on the circle not between a and b: distance to the nearest end (from the chord)
+            ends = segment[outside]
+            chords = np.minimum(np.linalg.norm(points[:, outside] - a[:, ends], axis=0),
+                                np.linalg.norm(points[:, outside] - b[:, ends], axis=0))
+            distances[outside] = 2 * np.arcsin(np.minimum(1, chords / 2))
+        return distances
+
+    def get_time_strings(self, start=0, stop=None):  # return the times of the points as formatted strings
+        times = np.round(self.time[start:stop] * 1e6).astype(np.int64).astype('datetime64[us]')
+        return np.char.replace(np.datetime_as_string(times, unit='us'), 'T', ' ')
+
+    def save_csv(self, path):  # write the points in a CSV file, one row per point
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(self.COLUMNS)
+            writer.writerows(zip(self.r.tolist(), self.theta.tolist(), self.phi.tolist(),
+                                 self.get_time_strings().tolist()))
+
+    @classmethod
+    def load_csv(cls, path):  # return the track stored in a CSV file written by save_csv
+        with open(path, 'r') as file:
+            reader = csv.reader(file)
+            next(reader)
+            rows = [row for row in reader if row]
+        track = cls(max(1, len(rows)))
+        if rows:
+            columns = list(zip(*rows))
+            times = np.array(columns[3], dtype='datetime64[us]')
+            track.data[:3, :len(rows)] = np.array(columns[:3], dtype=np.float64)
+            track.data[3, :len(rows)] = (times - np.datetime64(0, 'us')) / np.timedelta64(1, 's')
+            track.nb_points = len(rows)
+        return track
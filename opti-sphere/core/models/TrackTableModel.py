@@ -0,0 +1,51 @@
+import numpy as np
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class TrackTableModel(QAbstractTableModel):  # table of the points of a track, cells formatted only when displayed
+    HEADERS = {
+        True: ["R (cm)", "θ (deg)", "φ (deg)", "Time"],
+        False: ["x (cm)", "y (cm)", "z (cm)", "Time"]
+    }
+    FORMATS = ["{:0.1f}", "{:0.3f}", "{:0.3f}"]
+
+    def __init__(self, track):
+        super().__init__()
+        self.track = track  # TrackBuffer
+        self.spherical_format = True
+        self.coords = self.get_coords()
+
+    def get_coords(self):  # return the coordinates of the points in the current format, one row per point
+        if self.spherical_format:
+            return np.column_stack((self.track.r, self.track.theta, self.track.phi))
+        return self.track.get_cartesian()
+
+    def set_format(self, spherical_format):  # switch coordinates format, keeping the rows and the selection
+        if spherical_format == self.spherical_format:
+            return
+        self.spherical_format = spherical_format
+        self.coords = self.get_coords()
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, 2)
+        if len(self.coords):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self.coords) - 1, 2))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.coords)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 4
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):  # format the cell at index when the view asks for it
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if column == 3:
+            return str(self.track.get_time_strings(row, row + 1)[0])
+        return self.FORMATS[column].format(self.coords[row, column])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[self.spherical_format][section]
+        return str(section + 1)
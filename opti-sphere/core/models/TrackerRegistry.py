@@ -0,0 +1,38 @@
+import cv2
+
+from core.models.CentroidTracker import CentroidTracker
+from core.models.SearchWindowTracker import SearchWindowTracker
+from core.models.TemplateTracker import TemplateTracker
+
+
+class TrackerRegistry:  # tracker backends selectable by name, all with init(frame, box) and update(frame) -> (ok, box)
+    backends = {  # name: function creating a new tracker, from the most accurate to the fastest
+        "Surface Mode (CSRT)": cv2.TrackerCSRT_create,
+        "Surface Mode (CSRT, Search Window)": lambda: SearchWindowTracker(cv2.TrackerCSRT_create),
+        "Surface Mode (KCF)": cv2.TrackerKCF_create,
+        "Surface Mode (MOSSE)": cv2.legacy.TrackerMOSSE_create,
+        "Surface Mode (Template Matching)": TemplateTracker,
+        "Surface Mode (Centroid)": CentroidTracker,
+    }
+    color_backends = {"Surface Mode (KCF)"}  # backends tracking colour frames instead of monochrome ones
+    latencies = {}  # mean update latency (ms) last measured for each backend
+
+    @classmethod
+    def names(cls):  # return the names of the backends
+        return list(cls.backends)
+
+    @classmethod
+    def create(cls, name):  # return a new tracker of the backend
+        return cls.backends[name]()
+
+    @classmethod
+    def is_color(cls, name):  # return True if the backend expects colour frames
+        return name in cls.color_backends
+
+    @classmethod
+    def publish_latency(cls, name, latency):  # keep the latency measured while tracking with the backend
+        cls.latencies[name] = latency
+
+    @classmethod
+    def get_latency(cls, name):  # return the latency last measured for the backend, or None if never used
+        return cls.latencies.get(name)
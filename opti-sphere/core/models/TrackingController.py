@@ -0,0 +1,30 @@
+class TrackingController:  # decide the sphere rotations bringing the tracked target back to the center of the frame
+    def __init__(self, sphere, ser, dimension, pix_deg_ratio=100):
+        self.sphere = sphere
+        self.ser = ser
+        self.dimension = dimension  # frame width and height
+        self.tracking_offset = int(dimension[1] * 2 / 6)  # distance from the center allowed before rotating
+        self.pix_deg_ratio = pix_deg_ratio
+        self.can_rotate = True
+
+    def update(self, box):  # rotate the sphere if the box is too far from the center, return the new rotation or None
+        x = int(box[0] + box[2] / 2)  # box's center x coordinate
+        y = int(box[1] + box[3] / 2)  # box's center y coordinate
+        distance = (x - self.dimension[0] / 2, self.dimension[1] / 2 - y)  # distance between box and middle of frame
+        if (self.can_rotate and
+                (abs(distance[0]) > (self.tracking_offset * self.dimension[0]/self.dimension[1]) or
+                 abs(distance[1]) > self.tracking_offset)):  # box too much off the frame
+            rot = self.sphere.get_rotation()
+            new_rot = (  # change sphere rotation to center target in frame
+                round(rot[0] + (distance[0] / self.pix_deg_ratio), 1),
+                round(rot[1] + (distance[1] / self.pix_deg_ratio), 1),
+                rot[2]
+            )
+            self.can_rotate = False
+            self.ser.send_instruction(self.ser.ROT, *new_rot)  # send new rotation to RPi
+            self.sphere.set_rotation(new_rot)  # update rotation of sphere model instance (Sphere.py)
+            return new_rot
+        elif not self.can_rotate and abs(distance[0]) <= self.tracking_offset and abs(
+                distance[1]) <= self.tracking_offset:  # wait for ROI to be back at the center before trying to rotate
+            self.can_rotate = True
+        return None
@@ -0,0 +1,129 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+
+import cv2
+from PySide6.QtCore import QObject, Signal
+
+from config import FRAME_CACHE_SIZE, INDEX_DIRECTORY
+from core.models.FrameCache import FrameCache
+from core.threads.ReadAheadThread import ReadAheadThread
+from core.threads.VideoIndexThread import VideoIndexThread
+
+logger = logging.getLogger(__name__)
+
+
+class VideoReader:  # frames of a video file decoded on demand and indexed like a list
+    def __init__(self, path):
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        self.fps = int(self.capture.get(cv2.CAP_PROP_FPS)) or 30
+        self.position = 0  # index of the next frame the capture decodes
+        self.cache = FrameCache(FRAME_CACHE_SIZE)  # last frames decoded (displayed or read ahead)
+        self.signal_holder = SignalHolder()
+
+        # exact frame count and keyframes come from the index, the container's count is only an estimate until then
+        self.index_path = self.get_index_path()
+        self.keyframes = []  # indexes of the frames decoded without the previous ones, where a seek can land exactly
+        self.nb_frames = self.load_index()
+        self.index_th = None
+        if self.nb_frames is None:
+            self.nb_frames = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            self.index_th = VideoIndexThread(self)  # started by the tab once its signal is connected
+
+        self.read_ahead = ReadAheadThread(self)
+        self.read_ahead.start()
+
+    def __len__(self):
+        return self.nb_frames
+
+    def __getitem__(self, index):  # return the frame at index, seeking only when not reading sequentially
+        if index < 0:
+            index += self.nb_frames
+        if not 0 <= index < self.nb_frames:
+            raise IndexError("Frame index out of range")
+        frame = self.cache.get(index)
+        if frame is None:
+            self.seek(self.capture, self.position, index)
+            ret, frame = self.capture.read()
+            if not ret:
+                if index == 0:
+                    raise IndexError(f"Could not decode frame {index} of {self.path}")
+                self.nb_frames = index  # estimated frame count was too high
+                self.signal_holder.length_signal.emit(index)
+                raise IndexError(f"Frame {index} is past the end of {self.path}")
+            self.position = index + 1
+            self.cache.put(index, frame)
+        self.read_ahead.prefetch(index + 1)
+        return frame
+
+    def __iter__(self):
+        index = 0
+        while index < self.nb_frames:
+            try:
+                frame = self[index]
+            except IndexError:  # end of the video before the estimated frame count
+                return
+            yield frame
+            index += 1
+
+    def seek(self, capture, position, index):  # move a capture at position so its next read is the frame at index
+        if self.keyframes:  # decode from the keyframe before index, or from position if it is already past it
+            keyframe = self.keyframes[bisect.bisect_right(self.keyframes, index) - 1]
+            if not keyframe <= position <= index:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+                position = keyframe
+            for _ in range(index - position):
+                capture.grab()
+            return
+        if position <= index <= position + 8:  # close enough, skip the frames without seeking
+            for _ in range(index - position):
+                capture.grab()
+            return
+        back = 0  # no index yet
+        while True:  # some containers land after the requested frame: step back until before it
+            target = max(0, index - back)
+            capture.set(cv2.CAP_PROP_POS_FRAMES, target)
+            actual = int(capture.get(cv2.CAP_PROP_POS_FRAMES))
+            if actual <= index or target == 0:
+                break
+            back = max(2 * back, 16)
+        for _ in range(index - actual):  # decode forward to the exact frame
+            capture.grab()
+
+    def get_index_path(self):  # return the location of the index of this video (depends on path, size and date)
+        stat = os.stat(self.path)
+        key = f"{os.path.abspath(self.path)}|{stat.st_size}|{stat.st_mtime}"
+        return os.path.join(INDEX_DIRECTORY, hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json")
+
+    def load_index(self):  # load the keyframes and return the number of frames saved in the index, or None if no index
+        try:
+            with open(self.index_path, 'r') as file:
+                index = json.load(file)
+            self.keyframes = index['keyframes']
+            return index['nb_frames']
+        except (OSError, ValueError, KeyError):  # no index, or index without keyframes: built again
+            return None
+
+    def save_index(self, nb_frames, keyframes):  # set and save the frame count and keyframes found by the index thread
+        self.nb_frames = nb_frames
+        self.keyframes = keyframes
+        try:
+            os.makedirs(INDEX_DIRECTORY, exist_ok=True)
+            with open(self.index_path, 'w') as file:
+                json.dump({'path': os.path.abspath(self.path), 'nb_frames': nb_frames, 'keyframes': keyframes}, file)
+        except OSError as e:
+            logger.warning("%s", e)
+
+    def release(self):  # stop the background threads and close the video file
+        if self.index_th and self.index_th.isRunning():
+            self.index_th.stop()
+        self.read_ahead.stop()
+        self.capture.release()
+        self.cache.clear()
+
+
+class SignalHolder(QObject):
+    length_signal = Signal(int)  # frame count corrected after reading past the end of the video
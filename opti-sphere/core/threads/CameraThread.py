@@ -1,26 +1,43 @@
+import time
+
 import cv2
 from PySide6.QtCore import QThread, Signal
 
+from core.models.FrameBuffer import FrameBuffer
+
 
 class CameraThread(QThread):  # thread processing the camera feed
-    cam_signal = Signal(object)
+    cam_signal = Signal()  # a new frame is ready to be taken with take_frame()
 
     def __init__(self, device_id, threads):
         super().__init__()
         self.device_id = device_id
         self.running = True
-        self.frame = None
+        self.buffer = None  # ring of the last frames captured
         self.fps = 30
         self.threads = threads
 
+        # coalescing delivery to the GUI: at most one signal waits in the event queue, stale frames are dropped
+        self.pending = False
+        self.last_delivered = -1  # sequence number of the last frame taken by the GUI
+        self.delivered_frames = 0
+        self.dropped_frames = 0
+
     def run(self):
         self.threads.append(self)
         cam = cv2.VideoCapture(self.device_id)
         self.fps = int(cam.get(5))
         while self.running:
-            ret, self.frame = cam.read()
+            slot = self.buffer.next_slot() if self.buffer else None
+            ret, frame = cam.read(slot)  # decode straight into the next slot of the ring when possible
             if ret:
-                self.cam_signal.emit(self.frame)
+                if not (self.buffer and self.buffer.fits(frame)):  # first frame or resolution changed
+                    self.buffer = FrameBuffer(frame.shape, frame.dtype)
+                    self.last_delivered = -1
+                self.buffer.commit(time.monotonic(), frame)
+                if not self.pending:
+                    self.pending = True
+                    self.cam_signal.emit()
         cam.release()
         self.threads.remove(self)
 
@@ -28,5 +45,26 @@ class CameraThread(QThread):  # thread processing the camera feed
         self.running = False
         self.wait()
 
+    def take_frame(self):  # return the newest frame not delivered yet to the GUI, or None if there is none
+        self.pending = False  # cleared before reading so a frame committed meanwhile triggers a new signal
+        latest = self.buffer.latest() if self.buffer else None
+        if latest is None or latest[0] <= self.last_delivered:
+            return None
+        seq = latest[0]
+        if self.last_delivered >= 0:
+            self.dropped_frames += seq - self.last_delivered - 1
+        self.delivered_frames += 1
+        self.last_delivered = seq
+        return latest[2]
+
+    def get_delivery_stats(self):  # return frames delivered to and dropped for the GUI, and its lag in frames
+        lag = self.buffer.seq - self.last_delivered if self.buffer and self.last_delivered >= 0 else 0
+        return self.delivered_frames, self.dropped_frames, lag
+
+    @property
+    def frame(self):  # return the latest frame captured (view on the ring, copy it to keep it)
+        latest = self.buffer.latest() if self.buffer else None
+        return latest[2] if latest else None
+
     def get_monochrome(self):  # return the frame captured filtered in monochrome
         return cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
@@ -0,0 +1,69 @@
+import logging
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cv2
+import numpy as np
+from PySide6.QtCore import QThread, Signal
+
+from config import FRAME_LOADER_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class FrameLoaderThread(QThread):  # thread decoding image files in parallel into the frames of a capture
+    progress_signal = Signal(str, int)
+    loaded_signal = Signal(int)  # number of frames loaded in order from the first one
+    failed_signal = Signal(int)  # index of a frame which could not be read (left black)
+
+    def __init__(self, files, frames, threads, start_index=1):
+        super().__init__()
+        self.files = files
+        self.frames = frames  # FrameStore already sized for all the files
+        self.threads = threads
+        self.start_index = start_index  # frames before it are already loaded
+        self.running = True
+
+    def run(self):
+        self.threads.append(self)
+        nb_files = len(self.files)
+        done = [False] * nb_files
+        done[:self.start_index] = [True] * self.start_index
+        loaded = self.start_index
+        errors = 0
+        # OpenCV releases the GIL while decoding, so the workers decode in parallel
+        with ThreadPoolExecutor(FRAME_LOADER_WORKERS) as pool:
+            futures = [pool.submit(self.load, index) for index in range(self.start_index, nb_files)]
+            for count, future in enumerate(as_completed(futures), self.start_index + 1):
+                if not self.running:
+                    for f in futures:
+                        f.cancel()
+                    break
+                index, ret = future.result()
+                done[index] = True
+                if not ret:
+                    errors += 1
+                    self.failed_signal.emit(index)
+                while loaded < nb_files and done[loaded]:  # frames can finish out of order
+                    loaded += 1
+                self.loaded_signal.emit(loaded)
+                self.progress_signal.emit(f"Loading frame {count}/{nb_files}", int(count * 100 / nb_files))
+        if errors:
+            logger.warning("%d frames could not be read", errors)
+            self.progress_signal.emit(f"{errors} frames could not be read", 100)
+        self.threads.remove(self)
+
+    def load(self, index):  # decode the file at index into its frame and return (index, success)
+        if not self.running:
+            return index, False
+        frame = cv2.imread(self.files[index])
+        if frame is None or frame.shape != self.frames.shape:
+            logger.warning("Frame %d could not be read: %s", index, self.files[index])
+            self.frames[index] = np.zeros(self.frames.shape, self.frames.dtype)  # never show the file's old content
+            return index, False
+        self.frames[index] = frame
+        return index, True
+
+    def stop(self):
+        self.running = False
+        self.wait()
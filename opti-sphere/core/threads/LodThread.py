@@ -0,0 +1,21 @@
+from PySide6.QtCore import QThread, Signal
+
+
+class LodThread(QThread):  # thread simplifying a track path for a level of detail of the 3D render
+    lod_signal = Signal(object, int, int, object)  # track, level, number of points simplified, indexes kept
+
+    def __init__(self, track, level):
+        super().__init__()
+        self.track = track
+        self.level = level
+        self.running = True
+
+    def run(self):
+        nb_points = len(self.track)  # points appended meanwhile are left to the next simplification
+        kept = self.track.get_simplified(2.0 ** self.level, nb_points)
+        if self.running:
+            self.lod_signal.emit(self.track, self.level, nb_points, kept)
+
+    def stop(self):
+        self.running = False
+        self.wait()
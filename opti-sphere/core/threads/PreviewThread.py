@@ -0,0 +1,79 @@
+import logging
+import threading
+
+import cv2
+from PySide6.QtCore import QThread
+
+from config import PREVIEW_RADIUS
+from core.models.VideoReader import VideoReader
+
+logger = logging.getLogger(__name__)
+
+
+class PreviewThread(QThread):  # thread building the previews of the frames around the one displayed
+    def __init__(self, frames, previews, threads):
+        super().__init__()
+        self.frames = frames
+        self.previews = previews  # PreviewPyramid of the frames already seen around
+        self.threads = threads
+        self.running = True
+        self.request = None  # frame the previews are built around
+        self.condition = threading.Condition()
+
+    def run(self):
+        self.threads.append(self)
+        capture = cv2.VideoCapture(self.frames.path) if isinstance(self.frames, VideoReader) else None  # own capture
+        position = 0  # index of the next frame the capture decodes
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.request is not None or not self.running)
+                if not self.running:
+                    break
+                index, self.request = self.request, None
+            if capture is not None:  # frames around decoded in order: one seek at most
+                position = self.build_video(capture, position, index)
+            else:
+                self.build_frames(index)
+        if capture is not None:
+            capture.release()
+        self.threads.remove(self)
+
+    def build_video(self, capture, position, index):  # build the previews around index, return the capture position
+        start, end = max(0, index - PREVIEW_RADIUS), min(index + PREVIEW_RADIUS + 1, len(self.frames))
+        missing = [i for i in range(start, end) if i not in self.previews]
+        if not missing:
+            return position
+        self.frames.seek(capture, position, missing[0])
+        position = missing[0]
+        while position < missing[-1] + 1:
+            if self.request is not None or not self.running:  # the slider moved on
+                break
+            ret, frame = capture.read()
+            if not ret:
+                break
+            if position not in self.previews:
+                self.previews.put(position, frame)
+            position += 1
+        return position
+
+    def build_frames(self, index):  # build the previews around index, the closest frames first
+        for distance in range(PREVIEW_RADIUS + 1):
+            for i in (index + distance, index - distance) if distance else (index,):
+                if self.request is not None or not self.running:  # the slider moved on
+                    return
+                if 0 <= i < len(self.frames) and i not in self.previews:
+                    try:
+                        self.previews.put(i, self.frames.read_frame(i))  # not cached: GUI frames stay in the cache
+                    except IOError as e:  # damaged frame: shown black by the tab
+                        logger.warning("%s", e)
+
+    def prefetch(self, index):  # build the previews around index in the background
+        with self.condition:
+            self.request = index
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.wait()
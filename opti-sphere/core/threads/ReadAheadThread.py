@@ -0,0 +1,48 @@
+import threading
+
+import cv2
+from PySide6.QtCore import QThread
+
+from config import VIDEO_READ_AHEAD
+
+
+class ReadAheadThread(QThread):  # thread decoding the frames following the last one read into the reader's cache
+    def __init__(self, reader):
+        super().__init__()
+        self.reader = reader
+        self.running = True
+        self.request = None  # first frame to decode
+        self.condition = threading.Condition()
+
+    def run(self):
+        capture = cv2.VideoCapture(self.reader.path)  # own capture: OpenCV captures are not thread-safe
+        position = 0
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.request is not None or not self.running)
+                if not self.running:
+                    break
+                start, self.request = self.request, None
+            for index in range(start, min(start + VIDEO_READ_AHEAD, self.reader.nb_frames)):
+                if self.request is not None or not self.running:  # a newer position was requested
+                    break
+                if index in self.reader.cache:
+                    continue
+                self.reader.seek(capture, position, index)
+                ret, frame = capture.read()
+                if not ret:
+                    break
+                position = index + 1
+                self.reader.cache.put(index, frame)
+        capture.release()
+
+    def prefetch(self, index):  # decode the frames from index in the background
+        with self.condition:
+            self.request = index
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.wait()
@@ -1,17 +1,28 @@
+import csv
+import io
+import logging
+import math
 import os
+import threading
 import time
-from configparser import ConfigParser
 from datetime import datetime
 
-import cv2
 from PySide6.QtCore import QThread, Slot, Signal
 
+from config import SCAN_SETTLE_TIME, SERIAL_TIMEOUT, SCAN_MOTOR_SPEED, SCAN_SEGMENT_ANGLE, SCAN_FORMAT
+from core.models.FrameStore import FrameStore
+from core.models.FrameWriter import FrameWriter
+from core.models.ScanContainer import ScanContainer
+
+logger = logging.getLogger(__name__)
+
 
 class ScanningThread(QThread):  # thread processing the scanning process
     scan_signal = Signal(object, object)
     progress_signal = Signal(str, int)
+    error_signal = Signal(str)  # scan stopped before the end of the turn
 
-    def __init__(self, wnd, progress, method, axis, angle=0.0, is_auto=False):
+    def __init__(self, wnd, progress, method, axis, angle=0.0, is_auto=False, image_format=SCAN_FORMAT):
         super().__init__()
         self.running = True
         self.wnd = wnd
@@ -20,40 +31,32 @@ class ScanningThread(QThread):  # thread processing the scanning process
         self.method = method  # method of scanning
         self.axis = axis  # axis to scan
         self.delta_angle = angle  # angle to rotate for every capture
+        self.grid = self.get_grid(angle)  # angles of the scan frames, the same for every method
         self.is_auto = is_auto  # set the scanning mode to automatic or manual
+        self.image_format = image_format  # format of the frames saved in the recovery folder
 
-        self.frames = []  # stores the frames captured during the scanning
+        self.frames = None  # stores the frames captured during the scanning (FrameStore created with the first frame)
         self.current_angle = 0  # keep track of the angle of rotation between 0° to 360°
-        self.directory = "empty"  # name of directory saving the scanning data
+        self.directory = "scan_" + datetime.now().strftime("%Y%m%d_%H-%M-%S")  # name of the scan file
+        self.container = None  # file of the scan in the recovery folder (created with the first frame)
+        self.writer = None  # saves the frames in the container without blocking the scan
 
-        # process booleans
-        self.done = False
-        self.ready_for_frame = False
+        # process events
         self.is_canceled = False
+        self.interrupted = threading.Event()  # set when the scan is canceled
+        self.frame_requested = threading.Event()  # set when the user asks for a capture [manual mode only]
+
+        self.timings = []  # duration (s) of each step of every angle: move, settle, wait, capture, write
 
     def run(self):
         self.wnd.threads.append(self)  # add new thread to list of threads
-        self.generate_recovery_directory()  # create recovery folder
-        self.add_frame(self.wnd.main_tab.th.frame)  # add the first frame
-        self.progress_signal.emit("Scanning...", int(100 * len(self.frames) / (360 / self.delta_angle + 1)))
-        while self.running and self.current_angle < 360:
-            if self.current_angle == 0:  # set the scan flag
-                flag = 0
-            elif self.current_angle + self.delta_angle >= 360:
-                flag = 2
-            else:
-                flag = 1
-            self.current_angle += self.delta_angle  # update next angle
-            self.rotate(self.axis, flag)  # rotate to corresponding angle
-            time.sleep(1)
-            while self.running and not self.is_auto:  # wait for capture confirmation
-                if self.ready_for_frame:
-                    self.ready_for_frame = False
-                    break
-            self.add_frame(self.wnd.main_tab.th.frame)  # add current frame
-            self.progress_signal.emit(  # update progress bar
-                "Scanning...", int(100 * len(self.frames)/(360/self.delta_angle + 1))
-            )
+        os.makedirs("recovery", exist_ok=True)
+        self.capture()  # add the first frame
+        self.progress_signal.emit("Scanning...", int(100 * len(self.frames) / len(self.grid)))
+        if self.method == "Continuous":
+            self.scan_continuous()
+        else:
+            self.scan_frame_by_frame()
         if self.is_canceled:  # safety measure when canceling scan
             self.wnd.ser.send_command(f"release {self.axis}")
         else:
@@ -65,72 +68,239 @@ class ScanningThread(QThread):  # thread processing the scanning process
                 self.is_auto
             )
             self.scan_signal.emit(self.frames, info)  # send frames and info of scan to new ScanTab
+        self.writer.stop()  # the scan is shown while the last frames are saved
+        self.save_timings()
+        self.container.close()  # index written: the scan file opens without reading it all
+        logger.info("Scan frames saved: %d, scan waited %.2f s for the disk", self.writer.nb_frames, self.writer.waited)
         self.wnd.threads.remove(self)  # remove current thread to list of threads
 
-    def rotate(self, axis, flag):  # send the instruction to RPi for current rotation
+    def scan_frame_by_frame(self):  # stop the sphere at every angle and capture a frame
+        for angle in self.grid[1:]:
+            if not self.running:
+                break
+            delta = angle - self.current_angle  # last step shorter when delta angle does not divide 360°
+            flag = self.get_flag(self.current_angle, delta)
+            self.current_angle = angle  # update next angle
+            start = time.perf_counter()
+            if not self.rotate(self.axis, delta, flag):  # rotate to corresponding angle
+                break
+            moved = time.perf_counter()
+            if self.interrupted.wait(SCAN_SETTLE_TIME):  # let the sphere stop moving
+                break
+            settled = time.perf_counter()
+            if not self.is_auto:  # wait for capture confirmation (also set to cancel or switch to automatic)
+                self.frame_requested.wait()
+                self.frame_requested.clear()
+                if self.interrupted.is_set():
+                    break
+            self.capture((moved - start, settled - moved, time.perf_counter() - settled))  # add current frame
+            self.progress_signal.emit(  # update progress bar
+                "Scanning...", int(100 * len(self.frames) / len(self.grid))
+            )
+
+    def scan_continuous(self):  # rotate the sphere without stopping and keep the frames closest to each grid angle
+        buffer = self.wnd.main_tab.th.buffer
+        grid = self.grid
+        speed = None  # rotation speed (°/s) measured on the last segment, unknown during the first one
+        missing = 0
+        candidates = FrameStore(self.frames.shape, self.frames.dtype)  # frames of the segment kept on disk, not in RAM
+        while self.running and self.current_angle < 360:
+            segment_start = self.current_angle
+            segment = min(SCAN_SEGMENT_ANGLE, 360 - segment_start)
+            indexes = [i for i in range(len(self.frames), len(grid)) if grid[i] <= segment_start + segment]
+            candidates.clear()
+            timestamps = []  # capture time of each candidate
+            closest = {}  # half grid step -> (distance, candidate index) of the closest frame predicted in it
+            last_seq = buffer.seq
+            flag = self.get_flag(segment_start, segment)
+            self.current_angle += segment
+            latency = self.wnd.ser.th.latency or 0
+            sent = time.monotonic() + latency / 2  # start of the rotation: once the packet reached RPi
+            request = self.send_rotation(self.axis, segment, flag)
+            deadline = sent + SERIAL_TIMEOUT
+            copying = 0
+            while request is not None and not request.done.is_set():  # frames captured while the sphere turns
+                if self.interrupted.is_set() or time.monotonic() > deadline:
+                    break
+                item = buffer.next_after(last_seq, timeout=0.05)
+                if item is None or not indexes:
+                    continue
+                last_seq, timestamp, frame = item
+                start = time.perf_counter()
+                if speed is None:  # first segment: every frame kept, picked once the rotation time is known
+                    candidates.append(frame)
+                    timestamps.append(timestamp)
+                else:
+                    angle = segment_start + speed * (timestamp - sent)  # predicted angle, corrected at the end
+                    key = round(2 * angle / self.delta_angle)  # finer than the grid: the prediction may be off
+                    distance = abs(key * self.delta_angle / 2 - angle)
+                    if key not in closest:
+                        closest[key] = (distance, len(candidates))
+                        candidates.append(frame)
+                        timestamps.append(timestamp)
+                    elif distance < closest[key][0]:  # closer frame replaces the candidate in the file
+                        index = closest[key][1]
+                        closest[key] = (distance, index)
+                        candidates[index] = frame
+                        timestamps[index] = timestamp
+                copying += time.perf_counter() - start
+            if not self.wait_rotation(request):  # canceled, RPi error or timeout
+                break
+            duration = segment / (speed or SCAN_MOTOR_SPEED)  # rotation time, without the latency and RPi settle
+            if request is not None and request.round_trip and request.round_trip > latency + SCAN_SETTLE_TIME:
+                duration = request.round_trip - latency - SCAN_SETTLE_TIME
+            speed = segment / duration
+            start = time.perf_counter()
+            angles = [  # angle of each candidate interpolated from the measured timing of the segment
+                segment_start + segment * min(max((timestamp - sent) / duration, 0), 1) for timestamp in timestamps
+            ]
+            for index in indexes:  # resample: closest frame to each grid angle
+                if not angles:
+                    missing += 1
+                    timestamp, frame = self.grab_frame()
+                    self.add_frame(frame, grid[index], segment_start + segment, timestamp)
+                    continue
+                candidate = min(range(len(angles)), key=lambda i: abs(angles[i] - grid[index]))
+                if abs(angles[candidate] - grid[index]) > self.delta_angle / 2:  # camera slower than the grid
+                    missing += 1
+                self.add_frame(candidates[candidate], grid[index], angles[candidate], timestamps[candidate])
+            self.timings.append((duration, 0, 0, copying, time.perf_counter() - start))
+            self.progress_signal.emit(  # update progress bar
+                "Scanning...", int(100 * len(self.frames) / len(grid))
+            )
+        candidates.release()
+        if missing:
+            logger.warning("Continuous scan: %d angles without a close frame (rotation too fast for the camera)",
+                           missing)
+
+    @staticmethod
+    def get_grid(delta):  # return the angles of the frames of a scan: every delta from 0° and 360° to end the turn
+        nb_steps = max(1, math.ceil(round(360 / delta, 6)))  # rounded: float steps like 0.1° divide 360° exactly
+        return [min(i * delta, 360) for i in range(nb_steps + 1)]
+
+    def get_flag(self, angle, delta):  # return the scan flag of the rotation starting at angle
+        if angle == 0:
+            return 0
+        elif angle + delta >= 360:
+            return 2
+        return 1
+
+    def capture(self, durations=(0, 0, 0)):  # add the current frame and record the duration of each step
+        start = time.perf_counter()
+        timestamp, frame = self.grab_frame()
+        captured = time.perf_counter()
+        self.add_frame(frame, self.current_angle, self.current_angle, timestamp)
+        self.timings.append((*durations, captured - start, time.perf_counter() - captured))
+
+    def rotate(self, axis, delta, flag):  # send the instruction to RPi for current rotation, return True once reached
+        return self.wait_rotation(self.send_rotation(axis, delta, flag))
+
+    def send_rotation(self, axis, delta, flag):  # send the instruction to RPi to rotate the axis by delta
+        request = None
         if axis == "Roll":
-            self.wnd.ser.send_instruction(
-                self.wnd.ser.SCAN, "roll", (self.wnd.sphere.roll + self.delta_angle + 180) % 360 - 180, flag
+            request = self.wnd.ser.send_instruction(
+                self.wnd.ser.SCAN, "roll", (self.wnd.sphere.roll + delta + 180) % 360 - 180, flag
             )
             self.wnd.sphere.set_rotation((
-                (self.wnd.sphere.roll + self.delta_angle + 180) % 360 - 180,
+                (self.wnd.sphere.roll + delta + 180) % 360 - 180,
                 self.wnd.sphere.pitch,
                 self.wnd.sphere.yaw)
             )
         elif axis == "Pitch":
-            self.wnd.ser.send_instruction(
-                self.wnd.ser.SCAN, "pitch", (self.wnd.sphere.pitch + self.delta_angle + 180) % 360 - 180, flag
+            request = self.wnd.ser.send_instruction(
+                self.wnd.ser.SCAN, "pitch", (self.wnd.sphere.pitch + delta + 180) % 360 - 180, flag
             )
             self.wnd.sphere.set_rotation((
                 self.wnd.sphere.roll,
-                (self.wnd.sphere.pitch + self.delta_angle + 180) % 360 - 180,
+                (self.wnd.sphere.pitch + delta + 180) % 360 - 180,
                 self.wnd.sphere.yaw)
             )
-        self.__waiting_loop()
+        return request
+
+    def wait_rotation(self, request):  # wait for RPi to reach the angle, return False if it failed or was canceled
+        if request is None:  # serial port not opened: nothing to wait for
+            return True
+        deadline = time.monotonic() + SERIAL_TIMEOUT
+        while not request.done.wait(0.1):  # short waits to react to a cancel
+            if self.interrupted.is_set():
+                return False
+            if time.monotonic() > deadline:
+                break
+        if not request.success:  # RPi error or timeout: the scan cannot go on
+            logger.error("Scanning stopped: rotation failed")
+            self.is_canceled = True
+        return request.success
+
+    def grab_frame(self):  # return (capture time, frame) of the first camera frame captured after the sphere stopped
+        buffer = self.wnd.main_tab.th.buffer
+        item = buffer.next_after(buffer.seq, timeout=1) or buffer.latest()
+        return item[1:]
 
     @Slot()
-    def add_frame(self, frame):  # store and save the frame captured from the current angle of view
+    def add_frame(self, frame, grid_angle=0.0, angle=0.0, timestamp=None):  # store and save the frame captured
+        if self.frames is None:
+            self.frames = FrameStore.from_frame(frame)
+            self.create_container(frame)
+        elif not self.frames.fits(frame):  # new resolution: the frame cannot be stored with the others
+            if not self.is_canceled:
+                self.error_signal.emit("Camera resolution changed during the scan: the scan was canceled.")
+                self.cancel()
+            return
         self.frames.append(frame)
-        cv2.imwrite("recovery/" + self.directory + "/frames/" + self.__get_title(), frame)
+        timestamp = time.time() - (time.monotonic() - timestamp) if timestamp else time.time()  # monotonic to date
+        self.writer.add_frame(self.frames[-1], len(self.frames) - 1, grid_angle, angle, timestamp)
+
+    def create_container(self, frame):  # create the file saving the frames and information of the scan
+        info = {
+            'name': self.directory,
+            'nb_frames': len(self.grid),
+            'method': self.method,
+            'axis': self.axis,
+            'delta_angle': self.delta_angle,
+            'format': self.image_format,
+            'shape': frame.shape,
+            'dtype': frame.dtype.str,
+            'date': datetime.now().isoformat(),
+        }
+        self.container = ScanContainer(os.path.join("recovery", self.directory + ScanContainer.EXTENSION), info)
+        self.writer = FrameWriter(self.container, self.image_format)
 
-    def generate_recovery_directory(self):  # generate a directory containing the frames captured and a config file
-        self.directory = "scan_" + datetime.now().strftime("%Y%m%d_%H-%M-%S")
+    def save_timings(self):  # save the duration of each step in the scan file and print where time went
+        if not self.timings:
+            return
+        steps = ["MOVE", "SETTLE", "WAIT", "CAPTURE", "WRITE"]
+        file = io.StringIO()
+        writer = csv.writer(file)
+        writer.writerow(["STEP", *steps])
+        for index, durations in enumerate(self.timings):
+            writer.writerow([index, *(f"{duration:.4f}" for duration in durations)])
         try:
-            location = os.path.join("recovery", self.directory)
-            os.mkdir(os.path.join(location))
-            os.mkdir(os.path.join(location, "frames"))
-            config = ConfigParser()
-            config['SCAN'] = {
-                'name': self.directory,
-                'nb_frames': str(int(360 / self.delta_angle + 1)),
-                'method': self.method,
-                'axis': self.axis,
-                'delta_angle': str(self.delta_angle),
-            }
-            with open(f'{location}/CONFIG.INI', 'w') as configfile:
-                config.write(configfile)
-        except FileExistsError or FileNotFoundError as e:
-            print(e)
-
-    def __get_title(self):  # set a specific and indexed title for each frame
-        string = "unknown.tiff"
-        if self.axis == "Roll":
-            string = "A{:04d}".format(len(self.frames)) + "_" + datetime.now().strftime("%Y%m%d_%H-%M-%S") + ".tiff"
-        elif self.axis == "Pitch":
-            string = "B{:04d}".format(len(self.frames)) + "_" + datetime.now().strftime("%Y%m%d_%H-%M-%S") + ".tiff"
-        return string
+            self.container.add_chunk(b"TIME", file.getvalue().encode('utf-8'))
+        except OSError as e:
+            logger.warning("%s", e)
+        totals = [sum(durations[i] for durations in self.timings) for i in range(len(steps))]
+        total = sum(totals) or 1
+        logger.info("Scan timings (%d steps, %.1f s): %s", len(self.timings), sum(totals),
+                    ", ".join(f"{step.lower()} {duration:.2f} s ({100 * duration / total:.0f}%)"
+                              for step, duration in zip(steps, totals)))
 
     @Slot()
-    def set_done(self):  # inform the current scanning angle was reached
-        self.done = True
-        print("Done received")
+    def request_frame(self):  # capture the current frame [manual mode only]
+        self.frame_requested.set()
 
-    def __waiting_loop(self): # wait for current scanning angle to be reached
-        while self.running:
-            if self.wnd.ser.is_done:
-                self.wnd.ser.is_done = False
-                return
+    @Slot()
+    def switch_auto(self):  # finish the scan without waiting for capture confirmations
+        self.is_auto = True
+        self.frame_requested.set()
+
+    def cancel(self):  # stop the scan at the current step
+        self.is_canceled = True
+        self.running = False
+        self.interrupted.set()
+        self.frame_requested.set()
 
     def stop(self):
         self.running = False
+        self.interrupted.set()
+        self.frame_requested.set()
         self.wait()
@@ -1,51 +1,190 @@
-from PySide6.QtCore import QThread, Signal, QTimer
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
 
+import serial
+from PySide6.QtCore import QThread, Signal
 
-class SerialThread(QThread):  # thread processing the writing and reading of data during serial communication
+from config import SERIAL_TIMEOUT, SERIAL_HANDSHAKE_TIMEOUT
+from core.models.SerialRequest import SerialRequest
+
+logger = logging.getLogger(__name__)
+
+
+class SerialThread(QThread):  # thread owning the serial port: writes the queued packets and reads the replies of RPi
     response_signal = Signal(bytes, bytes)
+    completed_signal = Signal(int, bytes, float)  # request id, completion category and round trip (s)
 
-    def __init__(self, serial, packet, threads):
+    def __init__(self, serial, threads):
         super().__init__()
         self.ser = serial
-        self.packet = packet
-        self.reading = True
         self.threads = threads
+        self.running = True
+        self.canceling = False  # drop the pending requests at the next loop
 
-        self.timer = QTimer()  # Timer for serial timeout
-        self.timer.timeout.connect(lambda: [
-            self.response_signal.emit(self.ser.ERROR, b"Serial communication timeout"),
-            self.ser.signal_holder.print_signal.emit(self.ser.ERROR, b"Serial communication timeout")
-        ])
+        self.protocol = 1  # 2 if RPi identifies its replies with the request id (negotiated at start)
+        self.handshake = None  # protocol request waiting for its reply
+        self.ready = threading.Event()  # set once the protocol is negotiated
+        self.outgoing = queue.Queue()  # requests waiting to be written
+        self.pending = OrderedDict()  # requests written and waiting for their completion, oldest first
+        self.buffer = bytearray()  # bytes received and not parsed yet
+
+        self.round_trips = deque(maxlen=100)  # time (s) between the last requests sent and their completion
+        self.last_round_trip = None
+        self.latency = None  # round trip (s) of the handshake, replied right away by RPi: time spent on the line
 
     def run(self):
+        self.threads.append(self)  # add current thread to list of threads
         try:
-            self.threads.append(self)  # add current thread to list of threads
-            if not self.ser.isOpen():  # check if serial port is open
-                print("Serial Not opened")
+            # ask RPi for request identifiers, old firmware replies with an error or not at all
+            self.handshake = SerialRequest(self.ser.COMMAND, b"protocol 2", internal=True)
+            self.write(self.handshake)
+            while self.running:
+                if self.canceling:
+                    self.drop_requests()
+                if not self.handshake:  # requests framing depends on the protocol
+                    self.write_packets()
+                data = self.ser.read(max(self.ser.in_waiting, 1))  # block until data, timeout or send()
+                if data:
+                    self.buffer += data
+                    self.read_packets()
+                self.check_timeout()
+        except (serial.SerialException, OSError) as e:
+            logger.error("Serial communication lost: %s", e)
+        finally:
+            if self.running:  # loop left on an error, not by stop()
+                self.drop_requests()  # nothing waits for replies that will never come
+                self.response_signal.emit(self.ser.ERROR, b"Serial communication lost")
+            self.threads.remove(self)
+
+    def send(self, request):  # queue a request to be written to RPi
+        self.outgoing.put(request)
+        self.ser.cancel_read()  # wake the blocking read up to write it now
+        return request
+
+    def write_packets(self):  # write all the queued requests
+        while True:
+            try:
+                request = self.outgoing.get_nowait()
+            except queue.Empty:
+                return
+            self.write(request)
+
+    def write(self, request):  # write the packet of the request, with its id if RPi supports it
+        if self.protocol == 2:
+            packet = (self.ser.SOP + request.category + self.ser.DLE + str(request.id).encode() + self.ser.SEP +
+                      request.payload + self.ser.EOP)
+        else:
+            packet = self.ser.SOP + request.category + request.payload + self.ser.EOP
+        logger.debug("Packet sent: %s", packet)
+        self.ser.write(packet)  # send the packet to RPi
+        request.sent = request.last_activity = time.perf_counter()
+        self.pending[request.id] = request
+
+    def read_packets(self):  # parse the complete packets received (SOP, category, [DLE, id, SEP,] content, EOP)
+        while True:
+            start = self.buffer.find(self.ser.SOP)
+            if start < 0:
+                self.buffer.clear()
+                return
+            end = self.buffer.find(self.ser.EOP, start + 2)
+            if end < 0:  # rest of the packet not received yet
+                del self.buffer[:start]
                 return
-            print("Packet sent:", self.packet)
-            self.ser.write(self.packet)  # send the packet to RPi
-            self.ser.is_done = False
-            while self.reading:  # wait for response of RPi
-                if self.ser.in_waiting and self.ser.read(1) == self.ser.SOP:
-                    self.timer.stop()
-                    category = self.ser.read(1)
-                    content = self.ser.read_until(self.ser.EOP)[:-1]  # removing EOP byte
-                    print(f"Packet Received:\n\tCategory: {category}\n\tContent: {content}")
-                    self.response_signal.emit(category, content)
-                    self.ser.signal_holder.print_signal.emit(category, content)
-                    if category == self.ser.ALL_DONE:
-                        self.ser.is_done = True
-                        self.reading = False
-                        print("[Done]")
-                    else:
-                        self.timer.start(10000)
-        except Exception as e:
-            print("Error with the serial Exception", e)
-        self.threads.remove(self)
-        print(self.threads)
+            category = bytes(self.buffer[start + 1:start + 2])
+            content = bytes(self.buffer[start + 2:end])
+            del self.buffer[:end + 1]
+            self.handle_packet(category, content)
+
+    def handle_packet(self, category, content):  # complete the request replied to and send the reply to the GUI
+        logger.debug("Packet received: category %s, content %s", category, content)
+        request_id = None
+        if content.startswith(self.ser.DLE) and self.ser.SEP in content:  # reply identified with its request id
+            request_id, content = content[1:].split(self.ser.SEP, 1)
+            request_id = int(request_id) if request_id.isdigit() else None
+        if request_id is None:  # replies without id (old firmware) are in the order of the requests
+            request = next(iter(self.pending.values()), None)
+        else:
+            request = self.pending.get(request_id)
+            if request is None:  # late reply of a request timed out or canceled: must not complete another one
+                logger.warning("Reply dropped: request %s is not pending anymore", request_id)
+                return
+        if request:
+            request.last_activity = time.perf_counter()
+
+        if request and request is self.handshake:
+            if category == self.ser.RESPONSE and content == b"protocol 2":
+                self.protocol = 2
+            elif category in (self.ser.ALL_DONE, self.ser.ERROR):
+                self.complete(request, category)
+                self.latency = request.round_trip
+                self.end_handshake()
+            return
+
+        if category in (self.ser.ALL_DONE, self.ser.ERROR) and request:
+            self.complete(request, category)
+        if category == self.ser.ERROR and self.protocol == 1:  # other replies to the failed packet are dropped
+            self.buffer.clear()
+            self.ser.reset_input_buffer()
+        elif category == self.ser.ALL_DONE:
+            logger.debug("Request done")
+        self.response_signal.emit(category, content)
+        self.ser.signal_holder.print_signal.emit(category, content)
+        if request and request.done.is_set():
+            self.completed_signal.emit(request.id, category, request.round_trip or 0)
+
+    def complete(self, request, category):  # remove the request from the pending ones and measure its round trip
+        del self.pending[request.id]
+        request.complete(category, category == self.ser.ALL_DONE)
+        if not request.internal:
+            self.last_round_trip = request.round_trip
+            self.round_trips.append(request.round_trip)
+        if self.pending:  # oldest request starts waiting for its replies now
+            oldest = next(iter(self.pending.values()))
+            oldest.last_activity = max(oldest.last_activity, time.perf_counter())
+
+    def end_handshake(self):  # start writing the queued requests with the negotiated protocol
+        logger.info("Serial protocol %s", self.protocol)
+        self.handshake = None
+        self.ready.set()
+
+    def check_timeout(self):  # drop the oldest request if RPi did not reply for too long
+        if not self.pending:
+            return
+        request = next(iter(self.pending.values()))
+        timeout = SERIAL_HANDSHAKE_TIMEOUT if request is self.handshake else SERIAL_TIMEOUT
+        if time.perf_counter() - request.last_activity <= timeout:
+            return
+        self.complete(request, self.ser.ERROR)
+        if request is self.handshake:
+            self.end_handshake()
+            return
+        self.response_signal.emit(self.ser.ERROR, b"Serial communication timeout")
+        self.ser.signal_holder.print_signal.emit(self.ser.ERROR, b"Serial communication timeout")
+        self.completed_signal.emit(request.id, self.ser.ERROR, request.round_trip or 0)
+
+    def cancel(self):  # stop waiting for the replies of the requests sent and drop the queued ones
+        self.canceling = True
+        self.ser.cancel_read()
+
+    def drop_requests(self):  # drop the queued and pending requests (in the serial thread)
+        self.canceling = False
+        while not self.outgoing.empty():
+            self.outgoing.get_nowait().done.set()
+        for request in list(self.pending.values()):
+            if request is not self.handshake:
+                self.pending.pop(request.id, None)
+                request.done.set()
+
+    def get_round_trip(self):  # return the last and mean round trip (ms) of the requests, or None if none completed
+        if not self.round_trips:
+            return None
+        return 1000 * self.last_round_trip, 1000 * sum(self.round_trips) / len(self.round_trips)
 
     def stop(self):  # stop the thread
-        self.reading = False
-        self.timer.stop()
+        self.running = False
+        if self.isRunning():
+            self.ser.cancel_read()
         self.wait()
@@ -0,0 +1,127 @@
+import logging
+import os
+import random
+import select
+import time
+import tty
+from collections import deque
+
+from PySide6.QtCore import QThread
+
+from config import SIMULATOR_MOTOR_SPEED, SIMULATOR_SETTLE_TIME, SIMULATOR_ERROR_RATE, SIMULATOR_PROTOCOL
+from core.models.SerialCom import SerialCom
+
+logger = logging.getLogger(__name__)
+
+
+class SimulatorThread(QThread):  # thread simulating RPi and its motors on a pseudo-terminal, for tests without hardware
+    def __init__(self, threads, speed=SIMULATOR_MOTOR_SPEED, settle_time=SIMULATOR_SETTLE_TIME,
+                 error_rate=SIMULATOR_ERROR_RATE, protocol=SIMULATOR_PROTOCOL):
+        super().__init__()
+        self.threads = threads
+        self.running = True
+        self.speed = speed
+        self.settle_time = settle_time
+        self.error_rate = error_rate
+        self.protocol = protocol
+
+        self.master, slave = os.openpty()  # the application opens the slave side as a serial port
+        tty.setraw(slave)
+        self.port = os.ttyname(slave)
+        self.slave = slave
+
+        self.angles = {"roll": 0.0, "pitch": 0.0, "yaw": 0.0}
+        self.jobs = deque()  # (request id, category, content) waiting for the motors
+        self.job = None  # job being executed and the time it ends
+        self.buffer = b""
+        self.nb_requests = 0
+
+    def run(self):
+        self.threads.append(self)
+        while self.running:
+            timeout = min(max(self.job[1] - time.monotonic(), 0), 0.1) if self.job else 0.1
+            readable, _, _ = select.select([self.master], [], [], timeout)
+            if readable:
+                try:
+                    self.buffer += os.read(self.master, 4096)
+                except OSError:  # application side closed
+                    self.buffer = b""
+                self.read_packets()
+            if self.job and time.monotonic() >= self.job[1]:  # motors reached the position
+                self.finish_job(*self.job[0])
+                self.job = None
+            if not self.job and self.jobs:
+                self.start_job(self.jobs.popleft())
+        os.close(self.master)
+        os.close(self.slave)
+        self.threads.remove(self)
+
+    def read_packets(self):  # parse the complete packets received
+        while SerialCom.EOP in self.buffer:
+            packet, self.buffer = self.buffer.split(SerialCom.EOP, 1)
+            start = packet.find(SerialCom.SOP)
+            if start < 0 or len(packet) < start + 2:
+                continue
+            category, content = packet[start + 1:start + 2], packet[start + 2:]
+            request_id = None
+            if content.startswith(SerialCom.DLE) and SerialCom.SEP in content:
+                request_id, content = content[1:].split(SerialCom.SEP, 1)
+            self.nb_requests += 1
+            if category == SerialCom.COMMAND and content == b"protocol 2":  # handshake is answered right away
+                if self.protocol == 2:
+                    self.reply(request_id, SerialCom.RESPONSE, b"protocol 2")
+                    self.reply(request_id, SerialCom.ALL_DONE)
+                else:
+                    self.reply(request_id, SerialCom.ERROR, b"Unknown command: protocol 2")
+            else:
+                self.jobs.append((request_id, category, content))
+
+    def start_job(self, job):  # start moving the motors for an instruction, or execute a command
+        request_id, category, content = job
+        duration = 0
+        if category == SerialCom.INSTRUCTION:
+            fields = content.split(SerialCom.SEP)
+            try:
+                if fields[0] == SerialCom.ROT:
+                    target = {"roll": float(fields[1]), "pitch": float(fields[2]), "yaw": float(fields[3])}
+                elif fields[0] == SerialCom.SCAN:
+                    target = {fields[1].decode('utf-8'): float(fields[2])}
+                else:
+                    raise ValueError
+            except (ValueError, IndexError, KeyError):
+                self.reply(request_id, SerialCom.ERROR, b"Invalid instruction")
+                return
+            distance = max(abs((target[axis] - self.angles[axis] + 180) % 360 - 180) for axis in target)
+            duration = distance / self.speed + self.settle_time
+            self.angles.update(target)
+        self.job = (job, time.monotonic() + duration)
+
+    def finish_job(self, request_id, category, content):  # send the replies of a job
+        if random.random() < self.error_rate:
+            self.reply(request_id, SerialCom.ERROR, b"Motor error (simulated)")
+        elif category == SerialCom.INSTRUCTION:
+            self.reply(request_id, SerialCom.ALL_DONE)
+        elif category == SerialCom.COMMAND:
+            command = content.decode('utf-8', errors='replace')
+            if command == "calibrate" or command.startswith("release"):
+                self.reply(request_id, SerialCom.RESPONSE, f"{command}: ok".encode('utf-8'))
+                self.reply(request_id, SerialCom.ALL_DONE)
+            elif command == "angles":
+                angles = " ".join(f"{angle:.1f}" for angle in self.angles.values())
+                self.reply(request_id, SerialCom.RESPONSE, angles.encode('utf-8'))
+                self.reply(request_id, SerialCom.ALL_DONE)
+            else:
+                self.reply(request_id, SerialCom.ERROR, f"Unknown command: {command}".encode('utf-8'))
+        else:
+            self.reply(request_id, SerialCom.ERROR, b"Invalid category")
+
+    def reply(self, request_id, category, content=b""):  # write a reply packet, with the request id if any
+        header = SerialCom.DLE + request_id + SerialCom.SEP if request_id is not None and self.protocol == 2 else b""
+        try:
+            os.write(self.master, SerialCom.SOP + category + header + content + SerialCom.EOP)
+        except OSError as e:
+            logger.warning("Simulator: %s", e)
+
+    def stop(self):
+        self.running = False
+        self.wait()
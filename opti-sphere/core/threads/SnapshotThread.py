@@ -11,6 +11,6 @@ class SnapshotThread(QThread):
     def run(self):  # get the frame from camera feed and send it to new SnapshotTab
         frame = self.source.frame
         if frame is not None:
-            self.ss_signal.emit(frame)
+            self.ss_signal.emit(frame.copy())  # the camera ring reuses its slots
         else:
             raise Exception("Could not get the frame for Snapshot")
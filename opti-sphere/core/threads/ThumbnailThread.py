@@ -0,0 +1,74 @@
+import logging
+import os
+import threading
+from collections import deque
+from configparser import ConfigParser
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+from config import THUMBNAIL_WIDTH
+from core.models.ScanContainer import ScanContainer
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailThread(QThread):  # thread reading a small preview of the first frame of recovered captures
+    thumbnail_signal = Signal(str, object)  # location of the capture, preview
+
+    def __init__(self, locations, threads):
+        super().__init__()
+        self.locations = deque(locations)  # captures not read yet
+        self.threads = threads
+        self.running = True
+        self.current = None  # capture being read
+        self.condition = threading.Condition()  # notified when a capture has been read
+
+    def run(self):
+        self.threads.append(self)
+        while self.running:
+            with self.condition:
+                if not self.locations:
+                    break
+                location = self.current = self.locations.popleft()
+            try:
+                frame = self.read_first_frame(location)
+            except (OSError, ValueError, IndexError, cv2.error) as e:
+                logger.warning("%s", e)
+                frame = None
+            finally:
+                with self.condition:  # files closed: the capture can be deleted
+                    self.current = None
+                    self.condition.notify_all()
+            if frame is not None:
+                height = max(1, frame.shape[0] * THUMBNAIL_WIDTH // frame.shape[1])
+                self.thumbnail_signal.emit(location, cv2.resize(frame, (THUMBNAIL_WIDTH, height),
+                                                                interpolation=cv2.INTER_AREA))
+        self.threads.remove(self)
+
+    @staticmethod
+    def read_first_frame(location):  # return the first frame of the capture saved at location, None if it has none
+        if location.endswith(ScanContainer.EXTENSION):
+            return ScanContainer.read_first_frame(location)  # interrupted scans are not indexed again
+        config = ConfigParser()
+        config.read(os.path.join(location, "CONFIG.INI"))
+        if config.has_section("SCAN"):
+            folder = os.path.join(location, "frames")
+            files = sorted(f for f in os.listdir(folder) if not f.startswith("."))
+            return cv2.imread(os.path.join(folder, files[0]), cv2.IMREAD_REDUCED_COLOR_4) if files else None
+        if config.has_section("VIDEO"):
+            cap = cv2.VideoCapture(os.path.join(location, config['VIDEO']['file']))
+            ret, frame = cap.read()
+            cap.release()
+            return frame if ret else None
+        return None  # tracks have no frames
+
+    def discard(self, location):  # skip a capture, waiting for its files to be closed if it is being read
+        with self.condition:
+            if location in self.locations:
+                self.locations.remove(location)
+            self.condition.wait_for(lambda: self.current != location)
+
+    def stop(self):
+        self.running = False
+        self.wait()
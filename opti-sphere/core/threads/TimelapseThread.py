@@ -1,45 +1,51 @@
-from PySide6.QtCore import QThread, Signal, QTimer, Slot
+import logging
+
+from PySide6.QtCore import QThread, Signal
+
+from core.models.CaptureScheduler import CaptureScheduler
+from core.models.FrameStore import FrameStore
+
+logger = logging.getLogger(__name__)
 
 
 class TimelapseThread(QThread):
     tl_signal = Signal(object)
-    stop_signal = Signal()
+    error_signal = Signal(str)  # timelapse stopped before it was asked to
 
     def __init__(self, cam_thread, delta_time, threads):
         super().__init__()
         self.source = cam_thread
         self.threads = threads
-        self.frames = []
-        self.running = True
+        self.frames = None  # FrameStore created with the first frame
+        self.error = None  # reason the timelapse stopped before it was asked to
         self.delta_time = delta_time
-
-        self.timer = QTimer(self)  # timer interval between two frames' capture
-        self.timer.setInterval(1000 * self.delta_time)
-        self.timer.timeout.connect(self.get_frame)
-        self.timer.start()
-
-        self.stop_signal.connect(self.stop_timer)
+        self.scheduler = CaptureScheduler(self.delta_time)  # interval between two frames' capture
 
     def run(self):
         self.threads.append(self)
-        while self.running:
-            if not self.timer.isActive():
-                self.timer.start()
-        self.stop_signal.emit()
+        while self.scheduler.wait():
+            self.get_frame()
+        logger.info("Timelapse recorded: %s", self.scheduler.get_report())
+        if self.error:
+            self.error_signal.emit(f"{self.error}: the timelapse was stopped there.")
         if self.frames:
             self.tl_signal.emit(self.frames)
         else:
             raise Exception("No frames to create a video")
         self.threads.remove(self)
 
-    @Slot()
-    def get_frame(self):  # add current camera feed frame to timelapse frames
-        self.frames.append(self.source.frame)
-
-    @Slot()
-    def stop_timer(self):
-        self.timer.stop()
+    def get_frame(self):  # add the first camera feed frame captured after the deadline to timelapse frames
+        buffer = self.source.buffer
+        if buffer:
+            frame = (buffer.next_after(buffer.seq, timeout=1) or buffer.latest())[2]
+            if self.frames is None:
+                self.frames = FrameStore.from_frame(frame)
+            elif not self.frames.fits(frame):  # new resolution: the frames cannot be stored with the others
+                self.error = "Camera resolution changed during the timelapse"
+                self.scheduler.stop()
+                return
+            self.frames.append(frame)
 
     def stop(self):
-        self.running = False
+        self.scheduler.stop()
         self.wait()
@@ -0,0 +1,77 @@
+import time
+from collections import deque
+
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+
+class TrackingThread(QThread):  # thread running the tracker on the newest camera frame, apart from the display
+    box_signal = Signal(tuple, float)  # box found and capture time of its frame (monotonic clock)
+
+    def __init__(self, cam_thread, tracker, box, threads, color=False):
+        super().__init__()
+        self.source = cam_thread
+        self.tracker = tracker
+        self.box = box  # region of interest to initialize the tracker with
+        self.threads = threads
+        self.color = color  # track colour frames instead of monochrome ones
+        self.running = True
+
+        self.updates = deque(maxlen=30)  # end time of the last tracker updates
+        self.latencies = deque(maxlen=30)  # duration of the last tracker updates
+        self.lost_frames = 0  # frames where the target was not found
+
+    def run(self):
+        self.threads.append(self)
+        buffer = self.source.buffer
+        seq, _, frame = buffer.latest()
+        self.tracker.init(self.convert(frame), self.box)
+        while self.running:
+            if self.source.buffer is not buffer:  # resolution changed: follow the new ring
+                latest = self.source.buffer.latest() if self.source.buffer else None
+                if latest is None:
+                    self.msleep(10)
+                    continue
+                self.box = self.scale_box(self.box, frame.shape, latest[2].shape)
+                buffer, (seq, _, frame) = self.source.buffer, latest
+                self.tracker.init(self.convert(frame), self.box)
+                continue
+            if buffer.next_after(seq, timeout=0.1) is None:
+                continue  # no new frame
+            seq, timestamp, frame = buffer.latest()  # frames captured while the tracker was busy are skipped
+            image = self.convert(frame)
+            if not buffer.is_valid(seq):  # slot overwritten during the conversion
+                continue
+            start = time.perf_counter()
+            ok, box = self.tracker.update(image)
+            end = time.perf_counter()
+            self.latencies.append(end - start)
+            self.updates.append(end)
+            if ok:
+                self.box = tuple(box)
+                self.box_signal.emit(self.box, timestamp)
+            else:
+                self.lost_frames += 1
+        self.threads.remove(self)
+
+    @staticmethod
+    def scale_box(box, old_shape, new_shape):  # return the box moved from frames of old_shape to frames of new_shape
+        fx, fy = new_shape[1] / old_shape[1], new_shape[0] / old_shape[0]
+        return int(box[0] * fx), int(box[1] * fy), max(1, int(box[2] * fx)), max(1, int(box[3] * fy))
+
+    def convert(self, frame):  # return the frame as the tracker expects it, out of the camera ring
+        return self.convert_frame(frame, self.color)
+
+    @staticmethod
+    def convert_frame(frame, color):  # return a copy of a BGR frame in colour or monochrome
+        return frame.copy() if color else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def stop(self):
+        self.running = False
+        self.wait()
+
+    def get_stats(self):  # return tracker updates per second and mean update latency (ms) over the last updates
+        updates, latencies = list(self.updates), list(self.latencies)
+        fps = (len(updates) - 1) / (updates[-1] - updates[0]) if len(updates) > 1 and updates[-1] > updates[0] else 0
+        latency = 1000 * sum(latencies) / len(latencies) if latencies else 0
+        return fps, latency
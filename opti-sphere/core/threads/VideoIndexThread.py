@@ -0,0 +1,31 @@
+import cv2
+from PySide6.QtCore import QThread, Signal
+
+
+class VideoIndexThread(QThread):  # thread counting the frames of a video and finding its keyframes without decoding
+    index_signal = Signal(int)
+
+    def __init__(self, reader):
+        super().__init__()
+        self.reader = reader
+        self.running = True
+
+    def run(self):
+        capture = cv2.VideoCapture(self.reader.path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_FORMAT, -1])  # encoded packets
+        if not capture.isOpened():  # other backend: frames counted, keyframes unknown
+            capture = cv2.VideoCapture(self.reader.path)
+        nb_frames, keyframes = 0, []
+        while self.running and capture.grab():  # grab only: no conversion nor copy of the frames
+            if capture.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keyframes.append(nb_frames)
+            nb_frames += 1
+        capture.release()
+        if keyframes and keyframes[0] != 0:  # the first frame always starts the decoding
+            keyframes.insert(0, 0)
+        if self.running:
+            self.reader.save_index(nb_frames, keyframes)
+            self.index_signal.emit(nb_frames)
+
+    def stop(self):
+        self.running = False
+        self.wait()
@@ -1,45 +1,94 @@
-from PySide6.QtCore import QThread, Signal, QTimer, Slot
+import logging
+import os
+import shutil
+from configparser import ConfigParser
+from datetime import datetime
+
+from PySide6.QtCore import QThread, Signal
+
+from config import VIDEO_CODECS, VIDEO_CODEC
+from core.models.CaptureScheduler import CaptureScheduler
+from core.threads.VideoWriterThread import VideoWriterThread
+
+logger = logging.getLogger(__name__)
 
 
 class VideoThread(QThread):
-    vid_signal = Signal(object)
-    stop_signal = Signal()
+    vid_signal = Signal(str, object)
+    error_signal = Signal(str)  # recording stopped before it was asked to
 
-    def __init__(self, cam_thread, threads):
+    def __init__(self, cam_thread, threads, codec=VIDEO_CODEC):
         super().__init__()
         self.source = cam_thread
         self.threads = threads
-        self.frames = []
-        self.running = True
-
-        self.timer = QTimer()  # timer interval between to frames' capture
-        self.timer.setInterval(1000/self.source.fps)
-        self.timer.timeout.connect(self.get_frame)
-        self.timer.start()
+        self.codec = codec
+        self.buffer = self.source.buffer  # ring the frames are recorded from
+        self.last_seq = self.buffer.seq if self.buffer else -1  # last frame recorded from the ring
+        self.error = None  # reason the recording stopped before it was asked to
+        self.dropped = 0  # number of camera frames missed by the recording
+        self.scheduler = CaptureScheduler(1 / (self.source.fps or 30))  # pull the camera ring at the camera rate
 
-        self.stop_signal.connect(self.stop_timer)
+        # recording streamed to a video file in the recovery folder
+        self.directory = "video_" + datetime.now().strftime("%Y%m%d_%H-%M-%S")
+        fourcc, container = VIDEO_CODECS[self.codec]
+        self.filename = f"video.{container}"
+        self.generate_recovery_directory()
+        self.writer = VideoWriterThread(
+            os.path.join("recovery", self.directory, self.filename), fourcc, self.source.fps or 30, threads
+        )
+        self.writer.start()
 
     def run(self):
         self.threads.append(self)
-        while self.running:
-            if not self.timer.isActive():
-                self.timer.start()
-        self.stop_signal.emit()
-        if self.frames:
-            self.vid_signal.emit(self.frames)
+        while self.scheduler.wait():
+            self.get_frame()
+        self.get_frame()  # frames captured since the last deadline
+        self.writer.stop()
+        if self.error or self.writer.error:
+            self.error_signal.emit(f"{self.error or self.writer.error}: the video was stopped there.")
+        logger.info("Video recorded: %d frames, %d dropped (%s)", self.writer.nb_frames, self.dropped,
+                    self.scheduler.get_report())
+        if self.writer.nb_frames:
+            self.vid_signal.emit(self.writer.path, (self.directory, self.codec))
         else:
+            shutil.rmtree(os.path.join("recovery", self.directory), ignore_errors=True)
             raise Exception("No frames to create a video")
         self.threads.remove(self)
 
-    @Slot()
-    def get_frame(self):  # add current camera feed frame to video frames
-        self.frames.append(self.source.frame)
+    def get_frame(self):  # send every camera feed frame captured since the last call to the video encoder
+        if self.source.buffer is not self.buffer:
+            if self.buffer is None:  # camera started after the recording
+                self.buffer = self.source.buffer
+            else:  # new ring: the resolution changed, its frames cannot be written in the file
+                self.error = "Camera resolution changed during the recording"
+        if self.error or self.writer.error:  # nothing more can be recorded in the file
+            self.scheduler.stop()
+            return
+        while self.buffer:
+            item = self.buffer.next_after(self.last_seq)
+            if item is None:
+                break
+            seq, _, frame = item
+            self.dropped += seq - self.last_seq - 1 if self.last_seq >= 0 else 0
+            if not self.writer.add_frame(frame.copy(), timeout=1):
+                self.dropped += 1
+            self.last_seq = seq
 
-    @Slot()
-    def stop_timer(self):
-        self.timer.stop()
+    def generate_recovery_directory(self):  # generate a directory containing the video file and a config file
+        try:
+            location = os.path.join("recovery", self.directory)
+            os.mkdir(location)
+            config = ConfigParser()
+            config['VIDEO'] = {
+                'name': self.directory,
+                'file': self.filename,
+                'codec': self.codec,
+            }
+            with open(f'{location}/CONFIG.INI', 'w') as configfile:
+                config.write(configfile)
+        except FileExistsError or FileNotFoundError as e:
+            print(e)
 
     def stop(self):
-        self.running = False
-        self.timer.stop()
+        self.scheduler.stop()
         self.wait()
@@ -0,0 +1,57 @@
+import logging
+import queue
+
+import cv2
+from PySide6.QtCore import QThread
+
+from config import VIDEO_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class VideoWriterThread(QThread):  # thread encoding the frames of a recording to a video file as they arrive
+    def __init__(self, path, fourcc, fps, threads):
+        super().__init__()
+        self.path = path
+        self.fourcc = fourcc
+        self.fps = fps
+        self.threads = threads
+        self.queue = queue.Queue(maxsize=VIDEO_QUEUE_SIZE)  # bounded so memory stays flat whatever the duration
+        self.nb_frames = 0
+        self.error = None  # reason the encoding stopped before the end of the recording
+
+    def run(self):
+        self.threads.append(self)
+        output, size = None, None
+        while True:
+            frame = self.queue.get()
+            if frame is None:  # end of the recording
+                break
+            if self.error:  # frames still queued are dropped so the recording can end
+                continue
+            if output is None:  # frame size is only known with the first frame
+                size = (frame.shape[1], frame.shape[0])
+                output = cv2.VideoWriter(self.path, cv2.VideoWriter.fourcc(*self.fourcc), self.fps, size)
+            elif (frame.shape[1], frame.shape[0]) != size:  # the file can only hold frames of its size
+                self.error = (f"Camera resolution changed from {size[0]} × {size[1]} to "
+                              f"{frame.shape[1]} × {frame.shape[0]} during the recording")
+                logger.error("%s", self.error)
+                continue
+            output.write(frame)
+            self.nb_frames += 1
+        if output is not None:
+            output.release()
+        self.threads.remove(self)
+
+    def add_frame(self, frame, timeout=None):  # queue a frame to encode, return False if the encoder stayed late
+        if self.error:
+            return False
+        try:
+            self.queue.put(frame, timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def stop(self):  # encode the frames left in the queue and close the file
+        self.queue.put(None)
+        self.wait()
@@ -0,0 +1,60 @@
+import numpy as np
+
+from core.models.FrameBuffer import FrameBuffer
+
+
+def make_frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_commit_numbers_frames_in_order():
+    buffer = FrameBuffer((4, 6, 3), capacity=4)
+    assert buffer.latest() is None
+    assert [buffer.commit(float(i), make_frame(i)) for i in range(3)] == [0, 1, 2]
+    seq, timestamp, frame = buffer.latest()
+    assert (seq, timestamp, frame[0, 0, 0]) == (2, 2.0, 2)
+
+
+def test_next_after_returns_the_following_frame():
+    buffer = FrameBuffer((4, 6, 3), capacity=4)
+    for i in range(3):
+        buffer.commit(float(i), make_frame(i))
+    seq, _, frame = buffer.next_after(0)
+    assert (seq, frame[0, 0, 0]) == (1, 1)
+    assert buffer.next_after(2) is None
+
+
+def test_next_after_skips_overwritten_frames():
+    buffer = FrameBuffer((4, 6, 3), capacity=4)
+    for i in range(10):
+        buffer.commit(float(i), make_frame(i))
+    seq, _, frame = buffer.next_after(0)  # frames 1 to 6 overwritten, one slot kept free for the writer
+    assert (seq, frame[0, 0, 0]) == (7, 7)
+
+
+def test_is_valid_until_the_slot_can_be_overwritten():
+    buffer = FrameBuffer((4, 6, 3), capacity=4)
+    for i in range(5):
+        buffer.commit(float(i), make_frame(i))
+    assert not buffer.is_valid(-1)
+    assert not buffer.is_valid(1)  # next slot written
+    assert buffer.is_valid(2)
+    assert buffer.is_valid(4)
+
+
+def test_commit_keeps_frames_decoded_in_place():
+    buffer = FrameBuffer((4, 6, 3), capacity=4)
+    slot = buffer.next_slot()
+    slot[:] = 7
+    buffer.commit(0.0, slot)
+    assert buffer.latest()[2][0, 0, 0] == 7
+    buffer.commit(1.0, make_frame(9))  # frame decoded elsewhere: copied into the slot
+    assert buffer.latest()[2][0, 0, 0] == 9
+
+
+def test_fits_checks_shape_and_type():
+    buffer = FrameBuffer((4, 6, 3))
+    assert buffer.fits(make_frame(0))
+    assert not buffer.fits(np.zeros((4, 6), dtype=np.uint8))
+    assert not buffer.fits(np.zeros((4, 6, 3), dtype=np.uint16))
+    assert not buffer.fits(None)
@@ -0,0 +1,83 @@
+import os
+
+import numpy as np
+import pytest
+
+from config import FRAME_CACHE_SIZE
+from core.models.FrameStore import FrameStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # frames file created in the working folder
+    frames = FrameStore((4, 6, 3))
+    yield frames
+    frames.release()
+
+
+def make_frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def test_append_grows_the_file(store):
+    for i in range(40):
+        store.append(make_frame(i))
+    assert len(store) == 40
+    assert store.reserved >= 40
+    assert [frame[0, 0, 0] for frame in store] == list(range(40))
+
+
+def test_negative_indexes_count_from_the_end(store):
+    for i in range(3):
+        store.append(make_frame(i))
+    assert store[-1][0, 0, 0] == 2
+    store[-1] = make_frame(8)
+    assert store[2][0, 0, 0] == 8
+    with pytest.raises(IndexError):
+        store[3]
+    with pytest.raises(IndexError):
+        store[-4] = make_frame(0)
+
+
+def test_frames_read_are_copies_kept_in_a_bounded_cache(store):
+    for i in range(FRAME_CACHE_SIZE + 8):
+        store.append(make_frame(i))
+    frame = store[0]
+    assert not np.may_share_memory(frame, store.memmap)
+    assert store[0] is frame  # second read from the cache
+    for i in range(len(store)):
+        store[i]
+    assert len(store.cache.frames) == FRAME_CACHE_SIZE
+
+
+def test_replaced_frame_is_read_back(store):
+    store.append(make_frame(1))
+    store[0]
+    store[0] = make_frame(5)
+    assert store[0][0, 0, 0] == 5
+    assert store.read_frame(0)[0, 0, 0] == 5
+
+
+def test_clear_keeps_the_file(store):
+    for i in range(20):
+        store.append(make_frame(i))
+    reserved = store.reserved
+    store.clear()
+    store.append(make_frame(3))
+    assert len(store) == 1
+    assert store.reserved == reserved
+    assert store[0][0, 0, 0] == 3
+
+
+def test_fits_checks_shape_and_type(store):
+    assert store.fits(make_frame(0))
+    assert not store.fits(np.zeros((8, 6, 3), dtype=np.uint8))
+
+
+def test_release_deletes_the_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = FrameStore((4, 6, 3), nb_frames=2)
+    assert os.path.exists(store.path)
+    store.release()
+    assert not os.path.exists(store.path)
+    assert store.memmap is None
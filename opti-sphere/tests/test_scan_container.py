@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+
+from core.models.ScanContainer import ScanContainer
+
+INFO = {
+    'name': "scan",
+    'nb_frames': 6,
+    'method': "Frame by Frame",
+    'axis': "Roll",
+    'delta_angle': 72.0,
+    'format': "Raw",
+    'shape': (4, 6, 3),
+    'dtype': "|u1",
+}
+
+
+def make_frame(value):
+    return np.full((4, 6, 3), value, dtype=np.uint8)
+
+
+def write_scan(path, numbers, close=True):  # save the frames in a new scan file, return the file size
+    container = ScanContainer(path, INFO)
+    for number in numbers:
+        container.append(number, make_frame(number).tobytes(), 72.0 * number, 72.0 * number + 0.5, 100.0 + number)
+    container.add_chunk(b"TIME", b"STEP,MOVE\n0,1.0\n")
+    if close:
+        container.close()
+    else:
+        container.file.close()  # scan interrupted: no index
+    return os.path.getsize(path)
+
+
+def test_closed_scan_is_read_from_its_index(tmp_path):
+    path = str(tmp_path / ("scan" + ScanContainer.EXTENSION))
+    write_scan(path, [1, 0, 2, 4, 3])
+    container = ScanContainer(path)
+    assert len(container) == 5
+    assert [frame[0, 0, 0] for frame in container] == [0, 1, 2, 3, 4]
+    assert container.get_metadata(4) == (288.0, 288.5, 104.0, "A")
+    assert container.get_chunk(b"TIME") == b"STEP,MOVE\n0,1.0\n"
+    container.release()
+
+
+def test_interrupted_scan_is_indexed_again(tmp_path):
+    path = str(tmp_path / ("scan" + ScanContainer.EXTENSION))
+    write_scan(path, [0, 1, 2], close=False)
+    container = ScanContainer(path)
+    assert len(container) == 3
+    assert container[2][0, 0, 0] == 2
+    assert container.get_chunk(b"TIME") is not None
+    container.release()
+
+
+@pytest.mark.parametrize("cut", [1, 20, 60])
+def test_truncated_scan_keeps_the_frames_before_the_cut(tmp_path, cut):
+    path = str(tmp_path / ("scan" + ScanContainer.EXTENSION))
+    container = ScanContainer(path, INFO)
+    for number in range(4):
+        container.append(number, make_frame(number).tobytes())
+    size = os.path.getsize(path)
+    container.file.close()
+    with open(path, 'r+b') as file:  # last frame cut by a crash
+        file.truncate(size - cut)
+    container = ScanContainer(path)
+    assert len(container) == 3
+    assert [frame[0, 0, 0] for frame in container] == [0, 1, 2]
+    container.release()
+
+
+def test_gap_in_the_frames_ends_the_scan(tmp_path):
+    path = str(tmp_path / ("scan" + ScanContainer.EXTENSION))
+    write_scan(path, [0, 1, 3])  # frame 2 never saved
+    container = ScanContainer(path)
+    assert len(container) == 2
+    container.release()
+
+
+def test_info_and_first_frame_are_read_without_the_index(tmp_path):
+    path = str(tmp_path / ("scan" + ScanContainer.EXTENSION))
+    write_scan(path, [1, 0], close=False)
+    assert ScanContainer.is_container(path)
+    assert ScanContainer.read_info(path)['name'] == "scan"
+    assert ScanContainer.read_first_frame(path)[0, 0, 0] == 0
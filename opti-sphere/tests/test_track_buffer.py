@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+
+from core.models.TrackBuffer import TrackBuffer
+
+START = datetime.datetime(2024, 1, 1)
+
+
+def make_track(thetas, phis):
+    track = TrackBuffer(capacity=2)
+    for i, (theta, phi) in enumerate(zip(thetas, phis)):
+        track.append(1.0, theta, phi, START + datetime.timedelta(seconds=i))
+    return track
+
+
+def test_short_tracks_keep_all_their_points():
+    assert list(make_track([0.1, 0.2], [1.0, 1.0]).get_simplified(0.01)) == [0, 1]
+
+
+def test_points_on_a_great_circle_are_dropped():
+    thetas = np.linspace(0, 1, 50)
+    track = make_track(thetas, np.full(50, np.pi / 2))  # along the equator
+    assert list(track.get_simplified(1e-6)) == [0, 49]
+
+
+def test_corner_is_kept():
+    thetas = np.concatenate((np.linspace(0, 0.5, 20), np.full(20, 0.5)))
+    phis = np.concatenate((np.full(20, np.pi / 2), np.linspace(np.pi / 2, np.pi / 2 - 0.5, 20)))
+    track = make_track(thetas, phis)
+    assert list(track.get_simplified(1e-3)) == [0, 19, 39]
+
+
+def test_simplified_path_stays_within_tolerance():
+    rng = np.random.default_rng(0)
+    thetas = np.cumsum(rng.normal(0, 0.01, 500))
+    phis = np.pi / 2 + np.cumsum(rng.normal(0, 0.01, 500))
+    track = make_track(thetas, phis)
+    tolerance = 0.005
+    kept = track.get_simplified(tolerance)
+    assert kept[0] == 0 and kept[-1] == 499
+    assert np.all(np.diff(kept) > 0)
+    assert len(kept) < 500
+    points = np.stack((np.sin(phis) * np.cos(thetas), np.sin(phis) * np.sin(thetas), np.cos(phis)))
+    for start, end in zip(kept[:-1], kept[1:]):  # every dropped point is close to the arc replacing it
+        inner = np.arange(start + 1, end)
+        if len(inner):
+            distances = TrackBuffer.get_arc_distances(points[:, inner], np.zeros(len(inner), dtype=int),
+                                                      points[:, [start]], points[:, [end]])
+            assert distances.max() <= tolerance
+
+
+def test_stop_ignores_the_points_appended_later():
+    thetas = np.linspace(0, 1, 30)
+    track = make_track(thetas, np.full(30, np.pi / 2))
+    assert list(track.get_simplified(1e-6, stop=10)) == [0, 9]
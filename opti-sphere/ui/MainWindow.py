@@ -1,24 +1,29 @@
-import csv
-import datetime
 import os
 import shutil
 from configparser import ConfigParser
+from functools import partial
 
 import cv2
 import serial
-from PySide6.QtCore import Slot
+from PySide6.QtCore import Slot, QTimer
 
 from PySide6.QtGui import QScreen, QActionGroup, QAction
 from PySide6.QtMultimedia import QMediaDevices
 from PySide6.QtWidgets import (QMainWindow, QApplication, QWidget, QHBoxLayout,
                                QTabWidget, QTabBar, QMessageBox, QInputDialog, QDialog, QFileDialog, QMenu)
 
-from config import WINDOW_WIDTH, WINDOW_HEIGHT
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, FRAMES_DIRECTORY
 
-from core.models.TrackingData import TrackingData
+from core.models.FrameStore import FrameStore
+from core.models.ScanContainer import ScanContainer
 from core.models.SerialCom import SerialCom
+from core.models.VideoReader import VideoReader
 from core.models.Sphere import Sphere
+from core.models.TrackBuffer import TrackBuffer
+from core.threads.FrameLoaderThread import FrameLoaderThread
+from core.threads.ThumbnailThread import ThumbnailThread
 from ui.dialogs.CheckListDialog import CheckListDialog
+from ui.tabs.PlaceholderTab import PlaceholderTab
 from ui.tabs.ScanTab import ScanTab
 from ui.tabs.SnapshotTab import SnapshotTab
 from ui.tabs.TrackTab import TrackTab
@@ -43,6 +48,7 @@ class MainWindow(QMainWindow):
         self.fps = 30
         self.sphere = Sphere()
         self.threads = []
+        shutil.rmtree(FRAMES_DIRECTORY, ignore_errors=True)  # frames left by a previous session
 
         # tabs
         self.tabs = QTabWidget()
@@ -75,6 +81,7 @@ class MainWindow(QMainWindow):
         self.show()
 
         # serial connection
+        self.simulator = None  # simulated RPi, started from the tools menu
         self.ser = SerialCom(wnd=self)
         self.setup_serial_connection()
 
@@ -82,6 +89,7 @@ class MainWindow(QMainWindow):
         self.terminal = SerialTerminal(self)
 
         # recovery
+        self.thumbnail_th = None  # previews of the recovered captures
         self.fetch_recovery()
 
     def close_tab(self, index):  # close triggered tab
@@ -94,8 +102,11 @@ class MainWindow(QMainWindow):
                                            QMessageBox.StandardButton.Cancel)
             if confirm == QMessageBox.StandardButton.Yes:
                 tab = self.tabs.widget(index)
-                if tab.__class__.__name__ in ["ScanTab", "TrackTab"]:  # remove recovery folder if tab is closed
-                    shutil.rmtree(os.path.join("recovery"), tab.info[0])
+                tab.release()  # close the files of the tab before removing them
+                if isinstance(tab, PlaceholderTab):  # recovered capture never opened
+                    self.remove_recovery(tab.location)
+                elif tab.__class__.__name__ in ["ScanTab", "TrackTab", "VideoTab"] and tab.info:
+                    self.remove_recovery(os.path.join("recovery", tab.info[0]))  # remove recovery data
                     if not os.path.exists("recovery"):
                         os.makedirs("recovery")
                 self.tabs.removeTab(index)
@@ -113,6 +124,8 @@ class MainWindow(QMainWindow):
                 window.close()
             for th in reversed(self.threads):  # make sure all threads close properly before quitting
                 th.stop()
+            for index in range(self.tabs.count()):
+                self.tabs.widget(index).release()
             event.accept()
         else:
             event.ignore()
@@ -133,6 +146,7 @@ class MainWindow(QMainWindow):
         self.tools_menu.addAction('Connect to serial', self.open_serial_setup)
         self.tools_menu.addAction('Serial Terminal', self.open_serial_terminal)
         self.tools_menu.addAction('Calibrate System', self.main_tab.start_calibration)
+        self.tools_menu.addAction('Connect to Simulator', self.start_simulator)
         scale_menu = QMenu("Scale Bar")
         toggle_scale_action = QAction("Show/Hide Scale Bar", scale_menu, checkable=True)
         toggle_scale_action.triggered.connect(
@@ -154,8 +168,10 @@ class MainWindow(QMainWindow):
             self.cam_devices_group.addAction(cam_device_action)
             self.cam_menu.addAction(cam_device_action)
 
-    def tab_changed(self, index):  # allow export tool if current tab is not the MainTab
-        if self.tabs.widget(index).__class__.__name__ == "MainTab":
+    def tab_changed(self, index):  # allow export tool if current tab is not the MainTab, load recovered captures
+        if isinstance(self.tabs.widget(index), PlaceholderTab):  # loaded once the tab change is over
+            QTimer.singleShot(0, partial(self.open_placeholder, self.tabs.widget(index)))
+        if self.tabs.widget(index).__class__.__name__ in ["MainTab", "PlaceholderTab"]:
             try:
                 self.file_menu.actions()[1].setEnabled(False)
             except AttributeError:
@@ -191,7 +207,10 @@ class MainWindow(QMainWindow):
                 port = None
         if port:
             try:
+                self.ser.close()  # release the previous port and its worker
                 self.ser = SerialCom(wnd=self, port=port)
+                if hasattr(self, "terminal"):
+                    self.ser.signal_holder.print_signal.connect(self.terminal.handle_print_signal)
             except serial.SerialException:
                 self.raise_()
                 print(f"Error: Failed to communicate with {port}")
@@ -201,11 +220,26 @@ class MainWindow(QMainWindow):
             print("Error: Could not find any device for serial communication")
             QMessageBox(self).critical(self, "Error", f"Could not find any device for serial communication")
 
-    def fetch_recovery(self):  # recover Scans and Tracks from recovery folder
+    def start_simulator(self):  # connect to a simulated RPi to use the app without hardware
+        if not self.simulator:
+            try:
+                from core.threads.SimulatorThread import SimulatorThread  # needs pseudo-terminals (Linux, macOS)
+                self.simulator = SimulatorThread(self.threads)
+            except (ImportError, AttributeError, OSError) as e:
+                print(f"Error: Could not start the simulator ({e})")
+                QMessageBox(self).critical(self, "Error", "The simulator is not available on this system")
+                return
+            self.simulator.start()
+        print(f"Simulator on {self.simulator.port}")
+        self.setup_serial_connection(self.simulator.port)
+
+    def fetch_recovery(self):  # show the captures of the recovery folder as tabs loaded when first activated
         if not os.path.exists("recovery"):
             os.makedirs("recovery")
             return
-        directories = next(os.walk('recovery'))[1]
+        directories = next(os.walk('recovery'))[1] + [  # scans are single files
+            filename for filename in os.listdir('recovery') if filename.endswith(ScanContainer.EXTENSION)
+        ]
         if not directories:
             print("Nothing in recovery folder")
             return
@@ -215,68 +249,189 @@ class MainWindow(QMainWindow):
             recovery_list = dialog.choices
         for directory in directories:
             if not (directory in recovery_list):
-                shutil.rmtree(os.path.join("recovery", directory))
-        for directory in recovery_list:
-            try:
-                location = os.path.join("recovery", directory)
-                config = ConfigParser()
-                config.read(os.path.join(location, "CONFIG.INI"))
-                if config.sections()[0] == "SCAN":
-                    nb_frames = int(config['SCAN']['nb_frames'])
-                    frames = []
-                    frames_files = []
-                    for filename in os.listdir(os.path.join(location, "frames")):
-                        f = os.path.join(os.path.join(location, "frames"), filename)
-                        if os.path.isfile(f):
-                            frames_files.append(f)
+                self.remove_recovery(os.path.join("recovery", directory))
+        placeholders = []
+        for directory in recovery_list:  # only the information of the captures is read here
+            placeholder = self.create_placeholder(os.path.join("recovery", directory))
+            if placeholder:
+                placeholder.open_signal.connect(self.open_placeholder)
+                self.tabs.addTab(placeholder, placeholder.title)
+                placeholders.append(placeholder)
+        if placeholders:  # previews read in the background while the app is already usable
+            self.thumbnail_th = ThumbnailThread([placeholder.location for placeholder in placeholders], self.threads)
+            self.thumbnail_th.thumbnail_signal.connect(self.set_placeholder_thumbnail)
+            self.thumbnail_th.start()
+
+    def remove_recovery(self, location):  # delete the recovery data of a capture (scan file or folder)
+        for path in (location, location + ScanContainer.EXTENSION):
+            if self.thumbnail_th:  # its preview may be read at the same time
+                self.thumbnail_th.discard(path)
+            if os.path.isfile(path):
+                os.remove(path)
+            elif os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def create_placeholder(location):  # return a tab showing the information of a recovered capture, None if unreadable
+        if location.endswith(ScanContainer.EXTENSION):
+            info = ScanContainer.read_info(location)
+            if info is None:
+                print(f"Could not read the scan file {location}")
+                return None
+            return PlaceholderTab("Scan", location, info['name'],
+                                  f"{info['method']} · {info['axis']} Axis · {info['nb_frames']} Frames")
+        config = ConfigParser()
+        config.read(os.path.join(location, "CONFIG.INI"))
+        try:
+            if config.has_section("SCAN"):
+                return PlaceholderTab("Scan", location, config['SCAN']['name'],
+                                      f"{config['SCAN']['method']} · {config['SCAN']['axis']} Axis · "
+                                      f"{config['SCAN']['nb_frames']} Frames")
+            elif config.has_section("TRACK"):
+                return PlaceholderTab("Track", location, config['TRACK']['name'],
+                                      f"{config['TRACK']['mode']} · {config['TRACK']['nb_points']} Points")
+            elif config.has_section("VIDEO"):
+                return PlaceholderTab("Video", location, config['VIDEO']['name'], config['VIDEO']['codec'])
+        except KeyError as e:
+            print(f"Cannot read Configuration file of {location}: {e}")
+            return None
+        print(f"Nothing to recover in {location}")
+        return None
 
-                    if len(frames_files) == nb_frames and nb_frames != 0:
-                        frames_files.sort()
-                        for file in frames_files:
-                            frames.append(cv2.imread(file))
-                        info = (
-                            config['SCAN']['name'],
-                            config['SCAN']['method'],
-                            config['SCAN']['axis'],
-                            float(config['SCAN']['delta_angle']),
-                            False
-                        )
-                        scan_tab = ScanTab(frames, info[0], info)
-                        scan_tab.scan_widget.update_signal.connect(self.update_name)
-                        self.tabs.addTab(scan_tab, info[0])
-                        self.tabs.setCurrentWidget(scan_tab)
-                elif config.sections()[0] == "TRACK":
-                    track = []
-                    with open(f'{location}/data.csv', 'r') as file:
-                        reader = csv.reader(file)
-                        next(reader)
-                        for row in reader:
-
-                            track.append(TrackingData(
-                                tuple([float(i) for i in row[:3]]),
-                                datetime.datetime.strptime(row[3], '%Y-%m-%d %H:%M:%S.%f'))
-                            )
-                    if int(config['TRACK']["nb_points"]) != len(track):
-                        print("Error when loading data: Incorrect number of track points")
-                        return
+    @Slot()
+    def set_placeholder_thumbnail(self, location, frame):  # show the preview of a recovered capture
+        for index in range(self.tabs.count()):
+            tab = self.tabs.widget(index)
+            if isinstance(tab, PlaceholderTab) and tab.location == location:
+                tab.set_thumbnail(frame)
+
+    @Slot()
+    def open_placeholder(self, placeholder):  # replace a recovered capture's placeholder by the loaded tab
+        index = self.tabs.indexOf(placeholder)
+        if index == -1:  # already opened
+            return
+        tab = self.load_recovery(placeholder.location)
+        if tab is None:
+            return
+        self.tabs.insertTab(index, tab, self.tabs.tabText(index))
+        self.tabs.setCurrentIndex(index)
+        self.tabs.removeTab(index + 1)  # not the current tab anymore: no other placeholder gets activated
+        placeholder.deleteLater()
+
+    def load_recovery(self, location):  # return the tab of a recovered capture, None if it cannot be loaded
+        try:
+            if location.endswith(ScanContainer.EXTENSION):
+                return self.load_container(location)
+            config = ConfigParser()
+            config.read(os.path.join(location, "CONFIG.INI"))
+            if config.sections()[0] == "SCAN":
+                nb_frames = int(config['SCAN']['nb_frames'])
+                frames_files = []
+                for filename in os.listdir(os.path.join(location, "frames")):
+                    if filename.startswith("."):  # frame still being saved when the software stopped
+                        continue
+                    f = os.path.join(os.path.join(location, "frames"), filename)
+                    if os.path.isfile(f):
+                        frames_files.append(f)
+
+                if len(frames_files) == nb_frames and nb_frames != 0:
+                    frames_files.sort()
                     info = (
-                        config['TRACK']['name'],
-                        config['TRACK']['mode'],
-                        config['TRACK']['description']
+                        config['SCAN']['name'],
+                        config['SCAN']['method'],
+                        config['SCAN']['axis'],
+                        float(config['SCAN']['delta_angle']),
+                        False
                     )
-                    track_tab = TrackTab(track, info[0], info)
-                    track_tab.track_widget.update_signal.connect(self.update_name)
-                    self.tabs.addTab(track_tab, info[0])
-                    self.tabs.setCurrentWidget(track_tab)
+                    return self.load_scan(frames_files, info)
+                print("Error when loading data: Incorrect number of frames")
+                QMessageBox(self).critical(self, "Error", "Error when loading data: Incorrect number of frames")
+            elif config.sections()[0] == "TRACK":
+                track = TrackBuffer.load_csv(f'{location}/data.csv')
+                if int(config['TRACK']["nb_points"]) != len(track):
+                    print("Error when loading data: Incorrect number of track points")
+                    return None
+                info = (
+                    config['TRACK']['name'],
+                    config['TRACK']['mode'],
+                    config['TRACK']['description']
+                )
+                track_tab = TrackTab(track, info[0], info)
+                track_tab.track_widget.update_signal.connect(self.update_name)
+                return track_tab
+            elif config.sections()[0] == "VIDEO":
+                frames = VideoReader(os.path.join(location, config['VIDEO']['file']))
+                if not len(frames):
+                    print("Error when loading data: Video file is empty")
+                    return None
+                info = (
+                    config['VIDEO']['name'],
+                    config['VIDEO']['codec']
+                )
+                video_tab = VideoTab(frames, info[0], frames.fps, self.threads, info)
+                video_tab.vid_widget.update_signal.connect(self.update_name)
+                return video_tab
 
-            except FileExistsError or FileNotFoundError as e:
-                print(e)
+        except FileExistsError or FileNotFoundError as e:
+            print(e)
+        return None
+
+    def add_tab(self, tab):  # show a new tab, if it could be created
+        if tab is None:
+            return
+        self.tabs.addTab(tab, tab.title)
+        self.tabs.setCurrentWidget(tab)
+
+    def open_container(self, path):  # open a scan tab reading the frames from the scan file as they are viewed
+        self.add_tab(self.load_container(path))
+
+    def load_container(self, path):  # return a scan tab reading the scan file, None if it cannot be read
+        try:
+            frames = ScanContainer(path)
+        except (OSError, ValueError) as e:
+            print(e)
+            QMessageBox(self).critical(self, "Error", f"Could not read the scan file {os.path.basename(path)}")
+            return None
+        if not len(frames):
+            frames.release()
+            print("Error when loading data: No frames in the scan file")
+            QMessageBox(self).critical(self, "Error", "Error when loading data: No frames in the scan file")
+            return None
+        if len(frames) != frames.info['nb_frames']:
+            print(f"Scan {frames.info['name']} incomplete: {len(frames)}/{frames.info['nb_frames']} frames")
+        info = (
+            frames.info['name'],
+            frames.info['method'],
+            frames.info['axis'],
+            float(frames.info['delta_angle']),
+            False
+        )
+        scan_tab = ScanTab(frames, info[0], info, self.threads)
+        scan_tab.scan_widget.update_signal.connect(self.update_name)
+        return scan_tab
+
+    def open_scan(self, frames_files, info):  # open a scan tab showing its first frame while the others load
+        self.add_tab(self.load_scan(frames_files, info))
+
+    def load_scan(self, frames_files, info):  # return a scan tab loading the frames files, None if they cannot be read
+        frame = cv2.imread(frames_files[0])
+        if frame is None:
+            print("Could not read the frames of the scan")
+            QMessageBox(self).critical(self, "Error", f"Could not read the frames of the scan {info[0]}")
+            return None
+        frames = FrameStore.from_frame(frame, len(frames_files))
+        frames[0] = frame
+        loader = FrameLoaderThread(frames_files, frames, self.threads) if len(frames_files) > 1 else None
+        scan_tab = ScanTab(frames, info[0], info, self.threads, loader)
+        scan_tab.scan_widget.update_signal.connect(self.update_name)
+        return scan_tab
 
     def import_data(self):  # import data to software (image, video, scan, track)
         files = QFileDialog.getOpenFileNames(self,
                                              "Select one or more files to open",
                                              "/",
-                                             "Images (*.png *.tiff *.jpg);;Videos (*.mp4 *.avi);;Config Files (*.INI)")
+                                             "Images (*.png *.tiff *.jpg *.webp);;Videos (*.mp4 *.avi);;Scans (*.osc);;"
+                                             "Config Files (*.INI)")
         for data in files[0]:
             if files[1].startswith("Images"):
                 img = cv2.imread(data)
@@ -287,17 +442,17 @@ class MainWindow(QMainWindow):
                 self.tabs.setCurrentWidget(snapshot_tab)
             elif files[1].startswith("Videos"):
                 title = os.path.splitext(os.path.basename(data))[0]
-                vid = cv2.VideoCapture(data)
-                frames = []
-                ret = 1
-                while ret:
-                    ret, frame = vid.read()
-                    if ret:
-                        frames.append(frame)
-                video_tab = VideoTab(frames, title, self.fps)
+                frames = VideoReader(data)  # frames decoded on demand
+                if not len(frames):
+                    print("Could not read the video")
+                    QMessageBox(self).critical(self, "Error", f"Could not read the video {data}")
+                    continue
+                video_tab = VideoTab(frames, title, frames.fps, self.threads)
                 video_tab.vid_widget.update_signal.connect(self.update_name)
                 self.tabs.addTab(video_tab, title)
                 self.tabs.setCurrentWidget(video_tab)
+            elif files[1].startswith("Scans"):
+                self.open_container(data)
             elif files[1].startswith("Config Files"):
                 config = ConfigParser()
                 config.read(data)
@@ -314,7 +469,6 @@ class MainWindow(QMainWindow):
                             QMessageBox(self).critical(self, "Error", "Cannot read Configuration file")
                             return
                     nb_frames = int(config['SCAN']['nb_frames'])
-                    frames = []
                     frames_files = []
                     for filename in os.listdir(frame_folder):
                         if filename.startswith("."):
@@ -329,8 +483,6 @@ class MainWindow(QMainWindow):
                         QMessageBox(self).critical(self, "Error", "Error when loading data: Incorrect number of frames")
                         return
                     frames_files.sort()
-                    for file in frames_files:
-                        frames.append(cv2.imread(file))
                     info = (
                         config['SCAN']['name'],
                         config['SCAN']['method'],
@@ -338,25 +490,14 @@ class MainWindow(QMainWindow):
                         float(config['SCAN']['delta_angle']),
                         False
                     )
-                    scan_tab = ScanTab(frames, info[0], info)
-                    scan_tab.scan_widget.update_signal.connect(self.update_name)
-                    self.tabs.addTab(scan_tab, info[0])
-                    self.tabs.setCurrentWidget(scan_tab)
+                    self.open_scan(frames_files, info)
                 elif config.sections()[0] == "TRACK":
-                    track = []
                     data_CSV = os.path.join(os.path.dirname(data), "data.csv")
                     if not os.path.exists(data_CSV):
                         print("CSV file not found")
                         QMessageBox(self).critical(self, "Error", "CSV file containing data not found")
                         return
-                    with open(data_CSV, 'r') as file:
-                        reader = csv.reader(file)
-                        next(reader)
-                        for row in reader:
-                            track.append(TrackingData(
-                                tuple([float(i) for i in row[:3]]),
-                                datetime.datetime.strptime(row[3], '%Y-%m-%d %H:%M:%S.%f'))
-                            )
+                    track = TrackBuffer.load_csv(data_CSV)
                     options = ["name", "nb_points", "mode", "description"]
                     for option in options:
                         if not config.has_option('TRACK', option):
@@ -6,6 +6,7 @@ from PySide6.QtSvgWidgets import QSvgWidget
 from PySide6.QtWidgets import QTabWidget, QWidget, QVBoxLayout, QLabel, QPushButton, QHBoxLayout, QDialog
 
 from core.threads.CameraThread import CameraThread
+from core.threads.TrackingThread import TrackingThread
 from ui.dialogs.CalibrationDialog import CalibrationDialog
 from ui.dialogs.SetupScaleDialog import SetupScaleDialog
 from ui.tabs.RotationTab import RotationTab
@@ -18,7 +19,7 @@ from ui.widgets.CaptureWidget import CaptureWidget
 
 
 class MainTab(Tab):
-    box_signal = Signal(tuple)
+    box_signal = Signal(tuple, float)  # box found by the tracker and capture time of its frame
 
     def __init__(self, wnd):
         super().__init__()
@@ -72,35 +73,59 @@ class MainTab(Tab):
         self.th.start()
 
         self.is_tracking_on = False
-        self.tracker = None
+        self.tracking_th = None
+        self.tracking_box = None  # last box found by the tracking thread
         self.selection_origin, self.selection_destination, self.selection, self.is_selecting = None, None, None, False
         QShortcut(Qt.Key.Key_Escape, self, self.release_tracking)
 
     @Slot()
     def select_camera_source(self):  # update camera feed to selected camera source
         device_index = self.wnd.cam_devices_group.checkedAction().data()
+        self.release_tracking()  # the target is not in the other camera's frames: the track ends here
         self.th.stop()
         self.th = CameraThread(device_index, self.wnd.threads)
         self.th.cam_signal.connect(self.handle_camera_feed)
         self.th.start()
 
     @Slot()
-    def handle_camera_feed(self, frame):  # set current frame to camera feed widget with or without tracking box
-        if self.is_tracking_on:  # if tracking is activated --> draw tracking box on top of frame
-            ok, box = self.tracker.update(self.th.get_monochrome())
-            if ok:
-                self.box_signal.emit(box)
-                cv2.rectangle(
-                    frame,
-                    (int(box[0]), int(box[1])),
-                    (int(box[0] + box[2]), int(box[1] + box[3])),
-                    (255, 255, 0),
-                    8,
-                    2
-                )
+    def handle_camera_feed(self):  # set newest frame to camera feed widget with or without tracking box
+        frame = self.th.take_frame()
+        if frame is None:
+            return
+        if self.is_tracking_on and self.tracking_box:  # if tracking is activated --> draw last tracking box
+            box = self.tracking_box
+            frame = frame.copy()  # do not draw on the camera ring
+            cv2.rectangle(
+                frame,
+                (int(box[0]), int(box[1])),
+                (int(box[0] + box[2]), int(box[1] + box[3])),
+                (255, 255, 0),
+                8,
+                2
+            )
 
         self.camera_feed.gv.set_image(frame)
 
+    def start_tracking(self, tracker, box, color=False):  # run the tracker on the camera feed in its own thread
+        self.tracking_box = None
+        self.tracking_th = TrackingThread(self.th, tracker, box, self.wnd.threads, color)
+        self.tracking_th.box_signal.connect(self.handle_tracking_box)
+        self.is_tracking_on = True
+        self.tracking_th.start()
+
+    def stop_tracking(self):  # stop the tracking thread
+        self.is_tracking_on = False
+        self.tracking_box = None
+        if self.tracking_th:
+            self.tracking_th.stop()
+            self.tracking_th = None
+
+    @Slot()
+    def handle_tracking_box(self, box, timestamp):  # keep the box for the display and forward it to the controller
+        if self.is_tracking_on:
+            self.tracking_box = box
+            self.box_signal.emit(box, timestamp)
+
     def release_tracking(self):  # stop tracking
         if self.is_tracking_on:
             self.tracking.init_tracking()
@@ -0,0 +1,52 @@
+from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton
+
+from ui.tabs.Tab import Tab
+from ui.widgets.ImageViewer import ImageViewer
+
+
+class PlaceholderTab(Tab):  # tab standing for a recovered capture until it is opened
+    open_signal = Signal(object)
+
+    def __init__(self, kind, location, title, details):
+        super().__init__()
+        self.kind = kind  # Scan, Track or Video
+        self.location = location  # file or folder of the capture in the recovery folder
+        self.title = title
+        self.info = None
+
+        self.preview = ImageViewer()
+        self.no_preview = QLabel(text="Loading preview..." if kind != "Track" else "No preview", objectName="legend")
+        self.no_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview.setHidden(True)
+
+        sidebar = QWidget(objectName="widget-container")
+        sidebar.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)
+        sidebar_layout = QVBoxLayout()
+        sidebar_layout.setSpacing(20)
+        sidebar_layout.setContentsMargins(20, 15, 20, 15)
+        header = QLabel(text=f"Recovered {kind}", objectName="header")
+        header.setAlignment(Qt.Alignment.AlignCenter)
+        name = QLabel(text=title, objectName="legend")
+        name.setAlignment(Qt.Alignment.AlignCenter)
+        details_label = QLabel(text=details)
+        details_label.setAlignment(Qt.Alignment.AlignCenter)
+        details_label.setWordWrap(True)
+        open_btn = QPushButton(text="Open", objectName="accept-btn")
+        open_btn.clicked.connect(lambda: self.open_signal.emit(self))
+        sidebar_layout.addWidget(header)
+        sidebar_layout.addWidget(name)
+        sidebar_layout.addWidget(details_label)
+        sidebar_layout.addWidget(open_btn)
+        sidebar_layout.setAlignment(Qt.AlignTop)
+        sidebar.setLayout(sidebar_layout)
+
+        self.scene_layout.addWidget(self.preview)
+        self.scene_layout.addWidget(self.no_preview)
+        self.sidebar_layout.addWidget(sidebar)
+
+    @Slot()
+    def set_thumbnail(self, frame):  # show the preview of the first frame
+        self.preview.gv.set_image(frame)
+        self.preview.setHidden(False)
+        self.no_preview.setHidden(True)
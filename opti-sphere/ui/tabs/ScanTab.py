@@ -2,32 +2,38 @@ import os
 import shutil
 
 from PySide6.QtCore import Qt, Slot
-from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QSlider, QFileDialog
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLabel, QSlider, QFileDialog, QMessageBox
 
+from core.models.ScanContainer import ScanContainer
 from ui.dialogs.SetupScaleDialog import SetupScaleDialog
 from ui.tabs.Tab import Tab
 from ui.widgets.ImageViewer import ImageViewer
+from ui.widgets.ProgressWidget import ProgressWidget
 from ui.widgets.ScanWidget import ScanWidget
 
 
 class ScanTab(Tab):
-    def __init__(self, frames, title, info):
-        super().__init__()
+    def __init__(self, frames, title, info, threads, loader=None):
+        super().__init__(threads)
         self.layout().setAlignment(Qt.Alignment.AlignCenter)
         self.frames = frames
         self.title = title
         self.info = info
+        self.loader = loader  # thread still decoding the frames, if any
+        self.failed_frames = set()  # frames which could not be read, shown black
 
         self.current_frame = 0
 
         self.scan = ImageViewer()
         self.scan.gv.set_image(self.frames[self.current_frame])
+        self.scan.gv.detail_signal.connect(self.show_full_frame)
 
         scan_control = QWidget(objectName="widget-container")
         scan_control_layout = QHBoxLayout()
         self.index = QLabel(text="Frame 0", objectName='timestamp')
         self.slider = QSlider(Qt.Orientation.Horizontal)
         self.slider.valueChanged.connect(self.set_frame)
+        self.slider.sliderReleased.connect(self.show_full_frame)
         self.slider.setRange(0, len(self.frames) - 1)
         scan_control_layout.addWidget(self.index)
         scan_control_layout.addWidget(self.slider)
@@ -39,11 +45,48 @@ class ScanTab(Tab):
         self.scene_layout.addWidget(scan_control)
         self.sidebar_layout.addWidget(self.scan_widget)
 
+        if self.loader:  # only the frames loaded so far can be browsed
+            self.slider.setRange(0, self.loader.start_index - 1)
+            self.load_progress = ProgressWidget()
+            self.sidebar_layout.addWidget(self.load_progress)
+            self.loader.loaded_signal.connect(self.update_loaded)
+            self.loader.failed_signal.connect(self.add_failed_frame)
+            self.loader.finished.connect(self.report_failed_frames)
+            self.loader.progress_signal.connect(self.load_progress.update_progress)
+            self.loader.finished.connect(self.load_progress.deleteLater)
+            self.loader.finished.connect(self.start_previews)  # previews of loaded frames only
+            self.loader.start()
+        else:
+            self.start_previews()
+
     @Slot()
     def set_frame(self, value):  # update displayed frame according to slider value
         self.current_frame = value
-        self.scan.gv.set_image(self.frames[self.current_frame])
-        self.index.setText(f"Frame {self.current_frame}")
+        self.show_frame(self.scan, self.current_frame, self.slider.isSliderDown())  # preview while dragging
+        self.index.setText(f"Frame {self.current_frame}" + (" (unreadable)" if value in self.failed_frames else ""))
+
+    @Slot()
+    def show_full_frame(self):  # replace the preview by the full resolution frame
+        self.show_frame(self.scan, self.current_frame)
+
+    @Slot()
+    def update_loaded(self, nb_frames):  # extend the slider to the frames loaded in order so far
+        self.slider.setRange(0, nb_frames - 1)
+
+    @Slot()
+    def add_failed_frame(self, index):  # flag a frame which could not be read
+        self.failed_frames.add(index)
+        if index == self.current_frame:
+            self.set_frame(index)
+
+    @Slot()
+    def report_failed_frames(self):  # tell the user which frames could not be read once the loading is over
+        if not self.failed_frames or not self.loader.running:  # nothing to report or loading canceled
+            return
+        frames = sorted(self.failed_frames)
+        listed = ", ".join(str(i) for i in frames[:10]) + (", ..." if len(frames) > 10 else "")
+        QMessageBox.warning(self, "Error", f"{len(frames)} frames of {self.title} could not be read "
+                                           f"and are shown black: {listed}")
 
     def get_dimensions(self):  # return frame's dimensions
         vid_height, vid_width, _ = self.frames[0].shape
@@ -52,6 +95,13 @@ class ScanTab(Tab):
 
     def export(self):  # export scan to chosen location
         location = QFileDialog.getExistingDirectory(None, "Choose Location")
+        if not location:
+            return
+        scan_file = self.frames.path if isinstance(self.frames, ScanContainer) else \
+            os.path.join("recovery", self.info[0] + ScanContainer.EXTENSION)
+        if os.path.exists(scan_file):  # single file scan
+            shutil.copyfile(scan_file, os.path.join(location, self.title + ScanContainer.EXTENSION))
+            return
         new_directory = os.path.join(location, self.title)
         old_directory = os.path.join("recovery", self.info[0])
         shutil.copytree(old_directory, new_directory)
@@ -61,3 +111,9 @@ class ScanTab(Tab):
         if dlg.exec():
             self.scan.pix2mm = dlg.get_ratio()
             ImageViewer.is_scale_bar_visible = True
+
+    def release(self):  # stop loading the frames and delete the frames stored on disk
+        super().release()  # previews stopped before the frames are released
+        if self.loader and self.loader.isRunning():
+            self.loader.stop()
+        self.frames.release()
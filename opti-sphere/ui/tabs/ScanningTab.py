@@ -1,7 +1,9 @@
 from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QDoubleSpinBox, \
-    QCheckBox
+    QCheckBox, QMessageBox
 
+from config import SCAN_FORMAT
+from core.models.FrameWriter import FrameWriter
 from core.threads.ScanningThread import ScanningThread
 from ui.tabs.ScanTab import ScanTab
 from ui.widgets.ProgressWidget import ProgressWidget
@@ -21,7 +23,7 @@ class ScanningTab(QWidget):
         method_legend.setFixedWidth(60)
         self.method = QComboBox()
         self.method.view().parentWidget().setStyleSheet('background-color: #151415; border-radius: 5px; padding: 1px;')
-        self.method.addItems(["Frame by Frame"])
+        self.method.addItems(["Frame by Frame", "Continuous"])
         self.method.activated.connect(self.change_method)
         method_layout.addWidget(method_legend)
         method_layout.addWidget(self.method)
@@ -36,14 +38,14 @@ class ScanningTab(QWidget):
         self.angle.setRange(0.0, 90.0)
         self.angle.setValue(5.0)
         self.angle.setSuffix("°")
-        auto_legend = QLabel(text="Auto Mode", objectName="legend")
-        auto_legend.setFixedWidth(80)
+        self.auto_legend = QLabel(text="Auto Mode", objectName="legend")
+        self.auto_legend.setFixedWidth(80)
         self.is_auto = QCheckBox(objectName="switch")
         self.is_auto.setChecked(True)
         frame_method_layout.addWidget(angle_legend)
         frame_method_layout.addWidget(self.angle)
         frame_method_layout.addStretch()
-        frame_method_layout.addWidget(auto_legend)
+        frame_method_layout.addWidget(self.auto_legend)
         frame_method_layout.addWidget(self.is_auto)
         self.frame_method.setLayout(frame_method_layout)
 
@@ -59,6 +61,17 @@ class ScanningTab(QWidget):
         axis_layout.addWidget(axis_legend)
         axis_layout.addWidget(self.axis)
 
+        format_layout = QHBoxLayout()
+        format_legend = QLabel(text='Format', objectName='legend')
+        format_legend.setFixedWidth(60)
+        self.image_format = QComboBox()
+        self.image_format.view().parentWidget().setStyleSheet(
+            'background-color: #151415; border-radius: 5px; padding: 1px 0px;')
+        self.image_format.addItems(list(FrameWriter.formats))
+        self.image_format.setCurrentText(SCAN_FORMAT)
+        format_layout.addWidget(format_legend)
+        format_layout.addWidget(self.image_format)
+
         self.scan_btn = QPushButton("Start Scanning", objectName="action-btn")
         self.scan_btn.clicked.connect(self.scan)
 
@@ -83,6 +96,7 @@ class ScanningTab(QWidget):
         layout.addLayout(method_layout)
         layout.addWidget(self.frame_method)
         layout.addLayout(axis_layout)
+        layout.addLayout(format_layout)
         layout.addWidget(self.scan_btn)
         layout.addWidget(self.scan_progress)
         layout.addWidget(self.scan_widget)
@@ -95,23 +109,27 @@ class ScanningTab(QWidget):
         self.scan_btn.setEnabled(False)
         self.scan_progress.setHidden(False)
         self.scan_widget.setHidden(False)
-        self.capture_btn.setHidden(self.is_auto.isChecked())
-        self.switch_auto_btn.setHidden(self.is_auto.isChecked())
+        is_auto = self.is_auto.isChecked() or self.method.currentText() == "Continuous"  # no stop to capture
+        self.capture_btn.setHidden(is_auto)
+        self.switch_auto_btn.setHidden(is_auto)
         self.scan_th = ScanningThread(self.wnd,
                                       self.scan_progress,
                                       self.method.currentText(),
                                       self.axis.currentText(),
                                       self.angle.value(),
-                                      self.is_auto.isChecked())
+                                      is_auto,
+                                      self.image_format.currentText())
         self.scan_th.scan_signal.connect(self.add_scan_tab)
         self.scan_th.progress_signal.connect(self.scan_progress.update_progress)
+        self.scan_th.error_signal.connect(self.show_error)
         self.scan_th.start()
         self.scan_th.moveToThread(self.thread())
-        self.scan_th.finished.connect(lambda: self.scan_btn.setEnabled(True))
+        self.scan_th.finished.connect(self.end_scan)
 
     @Slot()
     def change_method(self):  # show/hide additional parameters according to current method
-        self.frame_method.setHidden(self.method.currentIndex() != 0)
+        self.auto_legend.setHidden(self.method.currentText() == "Continuous")  # the sphere never stops
+        self.is_auto.setHidden(self.method.currentText() == "Continuous")
 
     @Slot()
     def add_scan_tab(self, frames, info):  # create new ScanTab to show result of scan
@@ -120,7 +138,7 @@ class ScanningTab(QWidget):
         self.scan_widget.setHidden(True)
         self.scan_progress.reset()
         title = f"scan{self.scan_counter}"
-        scan_tab = ScanTab(frames, title, info)
+        scan_tab = ScanTab(frames, title, info, self.wnd.threads)
         scan_tab.scan_widget.update_signal.connect(self.wnd.update_name)
         self.wnd.tabs.addTab(scan_tab, title)
         self.wnd.tabs.setCurrentWidget(scan_tab)
@@ -128,18 +146,28 @@ class ScanningTab(QWidget):
 
     @Slot()
     def set_ready_for_frame(self):  # frame ready to be captured [manual mode only]
-        self.scan_th.ready_for_frame = True
+        self.scan_th.request_frame()
 
     @Slot()
     def switch_auto_mode(self):  # finish current manual scan in automatic
-        self.scan_th.is_auto = True
+        self.scan_th.switch_auto()
         self.capture_btn.setHidden(True)
         self.switch_auto_btn.setHidden(True)
 
+    @Slot()
+    def end_scan(self):  # allow a new scan, and reset the scanning widgets if the scan did not complete
+        self.scan_btn.setEnabled(True)
+        if self.scan_th.is_canceled:
+            self.cancel_scan()
+
+    @Slot()
+    def show_error(self, message):  # tell the user why the scan stopped by itself
+        print(message)
+        QMessageBox.warning(self, "Error", message)
+
     @Slot()
     def cancel_scan(self):  # cancel scan properly
-        self.scan_th.is_canceled = True
-        self.scan_th.running = False
+        self.scan_th.cancel()
         self.scan_progress.setHidden(True)
         self.scan_progress.reset()
         self.scan_widget.setHidden(True)
@@ -1,9 +1,14 @@
+from PySide6.QtCore import Slot
 from PySide6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout
 
+from core.models.PreviewPyramid import PreviewPyramid
+from core.threads.PreviewThread import PreviewThread
+
 
 class Tab(QWidget):  # parent tab class
-    def __init__(self):
+    def __init__(self, threads=None):
         super().__init__()
+        self.threads = threads  # threads of the window, the background work of the tab included
 
         self.scene_layout = QVBoxLayout()
         self.sidebar_layout = QVBoxLayout()
@@ -17,5 +22,40 @@ class Tab(QWidget):  # parent tab class
         layout.addLayout(self.sidebar_layout, 3)
         self.setLayout(layout)
 
+        self.frames = None
+        self.previews = None  # downscaled frames shown while the slider is dragged
+        self.preview_th = None
+
     def setup_scale_bar(self):
-        pass
\ No newline at end of file
+        pass
+
+    @Slot()
+    def start_previews(self):  # build the previews of the frames around the one displayed in the background
+        self.previews = PreviewPyramid()
+        self.preview_th = PreviewThread(self.frames, self.previews, self.threads)
+        self.preview_th.start()
+        self.preview_th.prefetch(0)
+
+    def show_frame(self, viewer, index, preview=False):  # display the frame at index, or its preview when scrubbing
+        if self.preview_th:  # previews of the frames the slider may reach next
+            self.preview_th.prefetch(index)
+        if preview and self.previews:
+            width, height = viewer.gv.im_dim  # size of the full frames
+            frame = self.previews.get(index, width * viewer.gv.get_display_ratio(width, height))
+            if frame is not None:
+                viewer.gv.set_image(frame, (width, height))
+                return
+        try:
+            frame = self.frames[index]
+        except IndexError as e:  # past the end of a video: the slider is shortened by the length signal
+            print(e)
+            return
+        viewer.gv.set_image(frame)
+        if self.previews and index not in self.previews:  # cheap next to decoding the frame
+            self.previews.put(index, frame)
+
+    def release(self):  # free the resources held by the tab when it is closed
+        if self.preview_th and self.preview_th.isRunning():
+            self.preview_th.stop()
+        if self.previews:
+            self.previews.clear()
\ No newline at end of file
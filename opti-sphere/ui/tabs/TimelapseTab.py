@@ -11,8 +11,8 @@ from ui.widgets.TimelapseWidget import TimelapseWidget
 
 
 class TimelapseTab(Tab):
-    def __init__(self, frames, title):
-        super().__init__()
+    def __init__(self, frames, title, threads):
+        super().__init__(threads)
         self.layout().setAlignment(Qt.Alignment.AlignCenter)
         self.frames = frames
         self.title = title
@@ -23,6 +23,7 @@ class TimelapseTab(Tab):
 
         self.timelapse = ImageViewer()
         self.timelapse.gv.set_image(self.frames[self.current_frame])
+        self.timelapse.gv.detail_signal.connect(self.show_full_frame)
 
         timelapse_player = QWidget(objectName="widget-container")
         timelapse_control = QHBoxLayout()
@@ -32,6 +33,7 @@ class TimelapseTab(Tab):
         self.timestamp = QLabel(text="00:00", objectName='timestamp')
         self.slider = QSlider(Qt.Orientation.Horizontal)
         self.slider.valueChanged.connect(self.set_frame)
+        self.slider.sliderReleased.connect(self.show_full_frame)
         self.slider.setRange(0, len(self.frames)-1)
         timelapse_control.addWidget(self.play_btn)
         timelapse_control.addWidget(self.timestamp)
@@ -48,6 +50,7 @@ class TimelapseTab(Tab):
         self.timer.timeout.connect(self.update_timelapse)
         self.timer.setInterval(1000/self.fps)
         self.timer.start()
+        self.start_previews()
 
     @Slot()
     def toggle_play_pause(self):  # play or pause the timelapse video
@@ -85,10 +88,14 @@ class TimelapseTab(Tab):
     @Slot()
     def set_frame(self, value):  # update displayed frame and timestamp according to slider position
         self.current_frame = value
-        self.timelapse.gv.set_image(self.frames[self.current_frame])
+        self.show_frame(self.timelapse, self.current_frame, self.slider.isSliderDown())  # preview while dragging
         self.timestamp.setText(self.get_timestamp())
         self.slider.setSliderPosition(self.current_frame)
 
+    @Slot()
+    def show_full_frame(self):  # replace the preview by the full resolution frame
+        self.show_frame(self.timelapse, self.current_frame)
+
     def get_dimensions(self):  # return frame's dimensions
         vid_height, vid_width, _ = self.frames[0].shape
         dim = f"{vid_width} × {vid_height}"
@@ -123,3 +130,7 @@ class TimelapseTab(Tab):
         if dlg.exec():
             self.timelapse.pix2mm = dlg.get_ratio()
             ImageViewer.is_scale_bar_visible = True
+
+    def release(self):  # delete the frames stored on disk
+        super().release()  # previews stopped before the frames are released
+        self.frames.release()
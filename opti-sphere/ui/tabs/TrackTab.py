@@ -23,6 +23,10 @@ class TrackTab(Tab):
         self.scene_layout.addWidget(self.spatial_tracking)
         self.sidebar_layout.addWidget(self.track_widget)
 
+    def release(self):  # stop the background work of the 3D render
+        super().release()
+        self.spatial_tracking.release()
+
     def export(self):  # export scan to chosen location
         location = QFileDialog.getExistingDirectory(None, "Choose Location")
         new_directory = os.path.join(location, self.title)
@@ -1,15 +1,16 @@
-import csv
 import datetime
 import os
+import time
 from configparser import ConfigParser
 
-import cv2
 import numpy as np
-from PySide6.QtCore import Slot
+from PySide6.QtCore import Slot, QTimer
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QPushButton, QHBoxLayout, QLabel, QComboBox, QTextEdit
 
 
-from core.models.TrackingData import TrackingData
+from core.models.TrackBuffer import TrackBuffer
+from core.models.TrackerRegistry import TrackerRegistry
+from core.models.TrackingController import TrackingController
 from ui.tabs.TrackTab import TrackTab
 
 
@@ -30,7 +31,8 @@ class TrackingTab(QWidget):
             'background-color: #151415; border-radius: 5px; padding: 1px 0px;')
         self.mode.update()
 
-        self.mode.addItems(["Surface Mode"])
+        self.mode.addItems(TrackerRegistry.names())
+        self.mode.currentTextChanged.connect(self.show_latency)
         mode_layout.addWidget(mode_legend)
         mode_layout.addWidget(self.mode)
 
@@ -40,19 +42,24 @@ class TrackingTab(QWidget):
         self.tracking_btn = QPushButton("Start Tracking", objectName="action-btn")
         self.tracking_btn.clicked.connect(self.init_tracking)
 
+        self.stats = QLabel(text="", objectName="legend")  # tracker and display rates while tracking
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(500)
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.displayed_frames = (0, time.monotonic())  # frames delivered to the display at the last update
+
         layout.addWidget(self.roi_btn)
         layout.addLayout(mode_layout)
         layout.addWidget(self.desc)
         layout.addWidget(self.tracking_btn)
+        layout.addWidget(self.stats)
         layout.addStretch()
         self.setLayout(layout)
 
         self.box = None
-        self.dimension = (-1, -1)
-        self.tracking_offset = 350
-        self.pix_deg_ratio = 100
-        self.track = []
-        self.can_rotate = True
+        self.tracker_name = None  # tracker backend of the current tracking
+        self.controller = None  # rotations of the sphere following the target
+        self.track = TrackBuffer()
         self.track_counter = 1
         self.directory = "empty"
 
@@ -76,7 +83,13 @@ class TrackingTab(QWidget):
     @Slot()
     def init_tracking(self):  # initialize or stop tracking
         if self.wnd.main_tab.is_tracking_on:  # stop tracking
-            self.wnd.main_tab.is_tracking_on = False
+            latency = self.wnd.main_tab.tracking_th.get_stats()[1]
+            if latency:
+                TrackerRegistry.publish_latency(self.tracker_name, latency)
+            self.wnd.main_tab.stop_tracking()
+            self.wnd.main_tab.box_signal.disconnect(self.handle_tracking)
+            self.stats_timer.stop()
+            self.show_latency(self.mode.currentText())
             self.wnd.main_tab.set_action("none")
             self.tracking_btn.setText("Start Tracking")
             self.roi_btn.setEnabled(True)
@@ -94,52 +107,50 @@ class TrackingTab(QWidget):
         else:  # initialize new tracking
             if self.box:  # Tracking needs a ROI to be selected before starting
                 self.roi_selection()
-                self.wnd.main_tab.tracker = cv2.TrackerCSRT_create()  # set OpenCV Tracking algorithm
-                self.wnd.main_tab.tracker.init(self.wnd.main_tab.th.get_monochrome(), self.box)  # init algorithm
-                self.wnd.main_tab.is_tracking_on = True
+                dimension = (self.wnd.main_tab.th.frame.shape[1], self.wnd.main_tab.th.frame.shape[0])
+                self.controller = TrackingController(self.wnd.sphere, self.wnd.ser, dimension)
+                self.wnd.main_tab.box_signal.connect(self.handle_tracking)
+                # set OpenCV Tracking algorithm, initialized on the newest frame by the tracking thread
+                self.tracker_name = self.mode.currentText()
+                self.wnd.main_tab.start_tracking(TrackerRegistry.create(self.tracker_name), self.box,
+                                                 TrackerRegistry.is_color(self.tracker_name))
                 self.wnd.main_tab.set_action("tracking")
                 self.tracking_btn.setText("Stop Tracking")
                 self.roi_btn.setEnabled(False)
-                self.wnd.main_tab.box_signal.connect(self.handle_tracking)
-                self.dimension = (self.wnd.main_tab.th.frame.shape[1], self.wnd.main_tab.th.frame.shape[0])
-                self.tracking_offset = int(self.dimension[1] * 2 / 6)
-                self.track = [  # add first TrackData with coordinates and time for spatiotemporal representation
-                    TrackingData(
-                        (
-                            2,
-                            np.deg2rad(self.wnd.sphere.get_rotation()[0]),
-                            np.deg2rad(self.wnd.sphere.get_rotation()[1])),
-                        datetime.datetime.now()
-                    )
-                ]
+                self.displayed_frames = (self.wnd.main_tab.th.get_delivery_stats()[0], time.monotonic())
+                self.stats_timer.start()
+                self.track = TrackBuffer()  # add first point with coordinates and time for spatiotemporal representation
+                self.track.append(
+                    2,
+                    np.deg2rad(self.wnd.sphere.get_rotation()[0]),
+                    np.deg2rad(self.wnd.sphere.get_rotation()[1]),
+                    datetime.datetime.now()
+                )
 
             else:
                 print("No ROI selected")
 
     @Slot()
-    def handle_tracking(self, box):  # calculate new rotation to center ROI in frame
-        x = int(box[0] + box[2] / 2)  # box's center x coordinate
-        y = int(box[1] + box[3] / 2)  # box's center y coordinate
-        distance = (x - self.dimension[0] / 2, self.dimension[1] / 2 - y)  # distance between box and middle of frame
-        if (self.can_rotate and
-                (abs(distance[0]) > (self.tracking_offset * self.dimension[0]/self.dimension[1]) or
-                 abs(distance[1]) > self.tracking_offset)):  # box too much off the frame
-            rot = self.wnd.sphere.get_rotation()
-            new_rot = (  # change sphere rotation to center target in frame
-                round(rot[0] + (distance[0] / self.pix_deg_ratio), 1),
-                round(rot[1] + (distance[1] / self.pix_deg_ratio), 1),
-                rot[2]
-            )
-            self.can_rotate = False
-            self.wnd.ser.send_instruction(self.wnd.ser.ROT, *new_rot)  # send new rotation to RPi
-            self.wnd.sphere.set_rotation(new_rot)  # update rotation of sphere model instance (Sphere.py)
-
-            self.track.append(  # add new TrackData with coordinates and time for spatiotemporal representation
-                TrackingData((2, np.deg2rad(new_rot[0]), np.deg2rad(new_rot[1])),datetime.datetime.now())
-            )
-        elif not self.can_rotate and abs(distance[0]) <= self.tracking_offset and abs(
-                distance[1]) <= self.tracking_offset:  # wait for ROI to be back at the center before trying to rotate
-            self.can_rotate = True
+    def show_latency(self, name):  # show the latency last measured with the selected tracker
+        latency = TrackerRegistry.get_latency(name)
+        self.stats.setText(f"Last measured: {latency:.1f} ms per frame" if latency is not None else "")
+
+    @Slot()
+    def update_stats(self):  # show tracker rate and latency next to the display rate
+        fps, latency = self.wnd.main_tab.tracking_th.get_stats()
+        delivered, now = self.wnd.main_tab.th.get_delivery_stats()[0], time.monotonic()
+        display_fps = (delivered - self.displayed_frames[0]) / (now - self.displayed_frames[1])
+        self.displayed_frames = (delivered, now)
+        self.stats.setText(f"Tracker: {fps:.0f} FPS, {latency:.1f} ms  |  Display: {display_fps:.0f} FPS")
+
+    @Slot()
+    def handle_tracking(self, box, timestamp):  # rotate the sphere to center ROI in frame and record the rotations
+        new_rot = self.controller.update(box)
+        if new_rot:
+            # capture time of the frame the box was found in, rather than the time it reached the GUI
+            time_found = datetime.datetime.now() - datetime.timedelta(seconds=time.monotonic() - timestamp)
+            # add new point with coordinates and time for spatiotemporal representation
+            self.track.append(2, np.deg2rad(new_rot[0]), np.deg2rad(new_rot[1]), time_found)
 
     def generate_recovery_directory(self):  # create recovery folder with config file, and CSV file with track data
         self.directory = "track_" + datetime.datetime.now().strftime("%Y%m%d_%H-%M-%S")
@@ -156,12 +167,6 @@ class TrackingTab(QWidget):
             with open(f'{location}/CONFIG.INI', 'w') as configfile:
                 config.write(configfile)
 
-            row_list = [["R", "THETA", "PHI", "TIME"]]
-            for point in self.track:
-                row_list.append([*point.coords, datetime.datetime.strftime(point.time, '%Y-%m-%d %H:%M:%S.%f')])
-
-            with open(f'{location}/data.csv', 'w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerows(row_list)
+            self.track.save_csv(f'{location}/data.csv')
         except FileExistsError or FileNotFoundError as e:
             print(e)
@@ -1,8 +1,12 @@
+import os
+import shutil
+
 import cv2
 from PySide6.QtCore import QTimer, Slot, Qt
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QHBoxLayout, QPushButton, QLabel, QSlider, QFileDialog, QWidget
 
+from core.models.VideoReader import VideoReader
 from ui.dialogs.SetupScaleDialog import SetupScaleDialog
 from ui.tabs.Tab import Tab
 from ui.widgets.ImageViewer import ImageViewer
@@ -10,18 +14,20 @@ from ui.widgets.VideoWidget import VideoWidget
 
 
 class VideoTab(Tab):
-    def __init__(self, frames, title, fps):
-        super().__init__()
+    def __init__(self, frames, title, fps, threads, info=None):
+        super().__init__(threads)
         self.layout().setAlignment(Qt.Alignment.AlignCenter)
-        self.frames = frames
+        self.frames = frames  # list of frames or VideoReader of a video file
         self.title = title
         self.fps = fps
+        self.info = info  # recovery information of a recorded video
 
         self.current_frame = 0
         self.is_running = False
 
         self.video = ImageViewer()
         self.video.gv.set_image(self.frames[self.current_frame])
+        self.video.gv.detail_signal.connect(self.show_full_frame)
 
         video_player = QWidget(objectName="widget-container")
         video_control = QHBoxLayout()
@@ -31,6 +37,7 @@ class VideoTab(Tab):
         self.timestamp = QLabel(text="00:00", objectName='timestamp')
         self.slider = QSlider(Qt.Orientation.Horizontal)
         self.slider.valueChanged.connect(self.set_frame)
+        self.slider.sliderReleased.connect(self.show_full_frame)
         self.slider.setRange(0, len(self.frames)-1)
         video_control.addWidget(self.play_btn)
         video_control.addWidget(self.timestamp)
@@ -47,6 +54,13 @@ class VideoTab(Tab):
         self.timer.timeout.connect(self.update_video)
         self.timer.setInterval(1000/self.fps)
 
+        if isinstance(self.frames, VideoReader):
+            self.frames.signal_holder.length_signal.connect(self.update_length)  # end found before estimated count
+            if self.frames.index_th:  # exact frame count not known yet
+                self.frames.index_th.index_signal.connect(self.update_length)
+                self.frames.index_th.start()
+        self.start_previews()
+
     @Slot()
     def toggle_play_pause(self):  # play or pause the video
         if self.is_running:
@@ -65,7 +79,11 @@ class VideoTab(Tab):
     def update_video(self):  # update displayed frame and other widgets according to current frame index
         if self.is_running:
             if self.current_frame < len(self.frames):
-                self.video.gv.set_image(self.frames[self.current_frame])
+                try:
+                    self.video.gv.set_image(self.frames[self.current_frame])
+                except IndexError as e:  # end of the video reached before its estimated frame count
+                    print(e)
+                    return
                 self.slider.setSliderPosition(self.current_frame)
                 self.timestamp.setText(self.get_timestamp())
                 self.current_frame += 1
@@ -81,10 +99,19 @@ class VideoTab(Tab):
     @Slot()
     def set_frame(self, value):  # update displayed frame and timestamp according to slider position
         self.current_frame = value
-        self.video.gv.set_image(self.frames[self.current_frame])
+        self.show_frame(self.video, self.current_frame, self.slider.isSliderDown())  # preview while dragging
         self.timestamp.setText(self.get_timestamp())
         self.slider.setSliderPosition(self.current_frame)
 
+    @Slot()
+    def show_full_frame(self):  # replace the preview by the full resolution frame
+        self.show_frame(self.video, self.current_frame)
+
+    @Slot()
+    def update_length(self, nb_frames):  # update slider range and duration once the video is indexed
+        self.slider.setRange(0, max(nb_frames - 1, 0))
+        self.vid_widget.duration.setText(self.get_duration())
+
     def get_dimensions(self):  # return frame's dimensions
         vid_height, vid_width, _ = self.frames[0].shape
         dim = f"{vid_width} × {vid_height}"
@@ -99,6 +126,9 @@ class VideoTab(Tab):
         filename = QFileDialog.getSaveFileName(None, "Export Video", self.title, "All files (*.*);Video files(*.*)")
         if filename[0] == '':
             return
+        if isinstance(self.frames, VideoReader):  # video already encoded in a file
+            shutil.copyfile(self.frames.path, filename[0] + os.path.splitext(self.frames.path)[1])
+            return
         vid_height, vid_width, channel = self.frames[0].shape
         size = (vid_width, vid_height)
         output = cv2.VideoWriter(f"{filename[0]}.avi", cv2.VideoWriter.fourcc('M', 'J', 'P', 'G'), self.fps, size)
@@ -114,3 +144,7 @@ class VideoTab(Tab):
         if dlg.exec():
             self.video.pix2mm = dlg.get_ratio()
             ImageViewer.is_scale_bar_visible = True
+
+    def release(self):  # delete the frames stored on disk or close the video file
+        super().release()  # previews stopped before the frames are released
+        self.frames.release()
@@ -1,6 +1,7 @@
 from PySide6.QtCore import Qt, Slot, QTimer
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QDialog
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QDialog, QMessageBox
 
+from core.models.VideoReader import VideoReader
 from core.threads.SnapshotThread import SnapshotThread
 from core.threads.TimelapseThread import TimelapseThread
 from core.threads.VideoThread import VideoThread
@@ -101,6 +102,7 @@ class CaptureWidget(QWidget):
             self.vid_btn.setEnabled(True)
             self.vid_th = VideoThread(self.wnd.main_tab.th, self.wnd.threads)
             self.vid_th.vid_signal.connect(self.add_vid_tab)
+            self.vid_th.error_signal.connect(self.stop_vid)
             self.vid_th.start()
         else:
             self.vid_th.stop()
@@ -109,6 +111,13 @@ class CaptureWidget(QWidget):
             self.vid_btn.setStyleSheet('border-color: #CCCCCC;')
             self.vid_btn.setEnabled(True)
 
+    @Slot()
+    def stop_vid(self, message):  # reset the video button when the recording stopped by itself
+        print(message)
+        if self.vid_btn.objectName() == "stop":
+            self.capture_vid()
+        QMessageBox.warning(self, "Error", message)
+
     @Slot()
     def capture_tl(self):  # toggle capture timelapse
         self.tl_btn.setEnabled(False)
@@ -123,6 +132,7 @@ class CaptureWidget(QWidget):
                 self.tl_btn.setStyleSheet('border-color: #f61027;')
                 self.tl_th = TimelapseThread(self.wnd.main_tab.th, self.tl_delta_time, self.wnd.threads)
                 self.tl_th.tl_signal.connect(self.add_tl_tab)
+                self.tl_th.error_signal.connect(self.stop_tl)
                 self.tl_cooldown = QTimer(self)
                 self.tl_cooldown.timeout.connect(self.capture_tl)
                 self.tl_th.start()
@@ -136,6 +146,13 @@ class CaptureWidget(QWidget):
             self.tl_btn.setStyleSheet('border-color: #CCCCCC;')
             self.tl_btn.setEnabled(True)
 
+    @Slot()
+    def stop_tl(self, message):  # reset the timelapse button when the timelapse stopped by itself
+        print(message)
+        if self.tl_btn.objectName() == "stop":
+            self.capture_tl()
+        QMessageBox.warning(self, "Error", message)
+
     @Slot()
     def add_ss_tab(self, frame):  # open new tab with captured snapshot
         title = f"snapshot{self.ss_counter}"
@@ -146,9 +163,10 @@ class CaptureWidget(QWidget):
         self.ss_counter += 1
 
     @Slot()
-    def add_vid_tab(self, frames):  # open new tab with captured video
+    def add_vid_tab(self, path, info):  # open new tab with captured video
         title = f"video{self.vid_counter}"
-        video_tab = VideoTab(frames, title, self.wnd.fps)
+        frames = VideoReader(path)
+        video_tab = VideoTab(frames, title, frames.fps, self.wnd.threads, info)
         video_tab.vid_widget.update_signal.connect(self.wnd.update_name)
         self.wnd.tabs.addTab(video_tab, title)
         self.wnd.tabs.setCurrentWidget(video_tab)
@@ -157,7 +175,7 @@ class CaptureWidget(QWidget):
     @Slot()
     def add_tl_tab(self, frames):  # open new tab with captured timelapse
         title = f"timelapse{self.tl_counter}"
-        tl_tab = TimelapseTab(frames, title)
+        tl_tab = TimelapseTab(frames, title, self.wnd.threads)
         tl_tab.tl_widget.update_signal.connect(self.wnd.update_name)
         self.wnd.tabs.addTab(tl_tab, title)
         self.wnd.tabs.setCurrentWidget(tl_tab)
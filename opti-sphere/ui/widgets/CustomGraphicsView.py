@@ -1,10 +1,13 @@
 import cv2
-from PySide6.QtCore import Qt, Slot, QRect, QSize
+import numpy as np
+from PySide6.QtCore import Qt, Slot, QRect, QSize, Signal
 from PySide6.QtGui import QWheelEvent, QImage, QPixmap
 from PySide6.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsPixmapItem, QFrame, QRubberBand
 
 
 class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and pan on it
+    detail_signal = Signal()  # zoomed in on a preview: the full resolution frame is needed
+
     def __init__(self, iv):
         super().__init__()
         self.iv = iv
@@ -13,6 +16,8 @@ class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and
         self.scene = QGraphicsScene(self)
         self.setContentsMargins(0, 0, 0, 0)
         self.im_dim = (1, 1)
+        self.frame = None  # last frame set, uploaded again when the displayed size changes
+        self.full_size = None  # (width, height) of the full frame when the frame set is a preview
         self.image = QGraphicsPixmapItem()
         self.image.setTransformationMode(Qt.TransformationMode.SmoothTransformation)
         self.scene.addItem(self.image)
@@ -34,23 +39,43 @@ class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and
         new_zoom = min(self.max_zoom, max(1, self.zoom + zoom_factor))  # zoom between [1, 5]
         scale_factor = new_zoom / self.zoom
         self.scale(scale_factor, scale_factor)
+        was_fitted = self.zoom == 1.0
         self.zoom = new_zoom
         if self.zoom == 1.0:  # disable dragging when zoom is 1.0 (default)
             self.setDragMode(QGraphicsView.DragMode.NoDrag)
-            self.fitInView(self.image.boundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+            self.fitInView(self.image.sceneBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
         else:
             self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        if self.full_size and self.zoom > 1.0:  # preview not detailed enough anymore
+            self.detail_signal.emit()
+        elif was_fitted != (self.zoom == 1.0) and self.frame is not None:  # switch between downscaled and full image
+            self.set_image(self.frame, self.full_size)
 
     @Slot()
-    def set_image(self, frame):  # update image with frame
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # reverse colors order BGR --> RGB
-        image = QImage(frame.tostring(),  # frame
+    def set_image(self, frame, full_size=None):  # update image with frame, or with a preview of a full_size frame
+        self.frame = frame
+        self.full_size = full_size
+        width, height = full_size or (frame.shape[1], frame.shape[0])
+        if self.zoom == 1.0:  # only the on-screen pixels are visible --> halve the image while it is twice larger
+            ratio = self.get_display_ratio(frame.shape[1], frame.shape[0])
+            while ratio <= 0.5:
+                frame = cv2.resize(frame, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+                ratio *= 2
+        if not frame.flags['C_CONTIGUOUS']:
+            frame = np.ascontiguousarray(frame)
+        image = QImage(frame,  # BGR buffer wrapped without copy
                        frame.shape[1],  # width
                        frame.shape[0],  # height
-                       frame.shape[2] * frame.shape[1],  # bytes per line
-                       QImage.Format.Format_RGB888)  # image format
-        self.image.setPixmap(QPixmap.fromImage(image))  # update image
-        self.im_dim = (frame.shape[1], frame.shape[0])  # update image dimensions
+                       frame.strides[0],  # bytes per line
+                       QImage.Format.Format_BGR888 if frame.ndim == 3 else QImage.Format.Format_Grayscale8)
+        self.image.setPixmap(QPixmap.fromImage(image))  # update image (only copy, done by Qt)
+        if self.image.scale() != width / frame.shape[1]:  # image keeps its full resolution size in the scene
+            self.image.setScale(width / frame.shape[1])
+        self.im_dim = (width, height)  # update image dimensions
+
+    def get_display_ratio(self, width, height):  # return the ratio between on-screen pixels and image pixels
+        ratio = self.viewport().devicePixelRatioF()
+        return min(self.viewport().width() * ratio / width, self.viewport().height() * ratio / height)
 
     def mousePressEvent(self, event):  # triggered when clicking on image
         if self.selection_mode:  # when selecting tracking ROI, draw selection on image
@@ -63,8 +88,8 @@ class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and
             self.selection.show()
         else:
             super().mousePressEvent(event)
-            print(f"Coordinates: "
-                  f"({int(event.x()/(self.image.scale()*self.zoom))}, {int(event.y()/(self.image.scale()*self.zoom))})")
+            pos = self.mapToScene(event.pos())
+            print(f"Coordinates: ({int(pos.x())}, {int(pos.y())})")
 
     def mouseMoveEvent(self, event):  # triggered when mouse moves on image
         if self.selection_mode and self.is_selecting and self.selection:
@@ -76,10 +101,10 @@ class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and
     def mouseReleaseEvent(self, event):  # triggered when mouse release click on image
         if self.selection_mode and self.is_selecting and self.selection:
             self.is_selecting = False
-            x1 = self.mapToScene(self.selection_origin).x() / self.image.scale()
-            y1 = self.mapToScene(self.selection_origin).y() / self.image.scale()
-            x2 = self.mapToScene(self.selection_destination).x() / self.image.scale()
-            y2 = self.mapToScene(self.selection_destination).y() / self.image.scale()
+            x1 = self.mapToScene(self.selection_origin).x()  # scene coordinates are the frame's pixels
+            y1 = self.mapToScene(self.selection_origin).y()
+            x2 = self.mapToScene(self.selection_destination).x()
+            y2 = self.mapToScene(self.selection_destination).y()
 
             box = (  # create tracking box with mouse-selected area
                 int(min(x1, x2)),
@@ -95,7 +120,9 @@ class CustomGraphicsView(QGraphicsView):  # widget to display an image, zoom and
             super().mouseReleaseEvent(event)
 
     def resizeEvent(self, event):  # update the image dimensions to fit the view when resizing the window
-        self.fitInView(self.image.boundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
         self.zoom = 1
+        if self.frame is not None:  # upload again at the new on-screen size
+            self.set_image(self.frame, self.full_size)
+        self.fitInView(self.image.sceneBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
         self.update()
 
@@ -9,6 +9,10 @@ from PySide6.QtGui import QWheelEvent
 from PySide6.QtOpenGLWidgets import QOpenGLWidget
 from pyquaternion import Quaternion
 
+from config import TRACK_LOD_TOLERANCE, TRACK_LOD_PREVIEW
+from core.models.TrackBuffer import TrackBuffer
+from core.threads.LodThread import LodThread
+
 
 class Rotation3DRender(QOpenGLWidget):  # 3D render of a sphere for intuitive manipulation
     update_rot = Signal(int, int, int)
@@ -27,10 +31,26 @@ class Rotation3DRender(QOpenGLWidget):  # 3D render of a sphere for intuitive ma
         self.quaternion = Quaternion()
 
         self.speed = 0.02
-        self.tracking_path = []
+        self.tracking_path = TrackBuffer()
         self.zoom = 0
 
-        self.sel_points = []
+        self.sel_points = np.empty(0, dtype=int)  # indexes of the points selected in the track table
+
+        # GPU buffers of tracking mode, filled in paintGL
+        self.sphere_buffers = None  # vertices, normals and triangles of the sphere mesh, built once
+        self.path_buffer = None  # vertices of all the points of the track
+        self.selection_buffer = None  # indexes of the selected points
+        self.lod_buffers = None  # vertices and colors of the simplified track path drawn as a line
+        self.sphere_size = 0  # number of indexes of the sphere triangles
+        self.path_capacity = 0  # number of points the path buffer can hold
+        self.uploaded_path, self.uploaded_points = None, 0  # track and number of its points in the path buffer
+        self.uploaded_selection = None
+        self.lod_cache = {}  # level of detail -> (number of points simplified, indexes of the points kept)
+        self.lod_preview = None  # (number of points, indexes of evenly spaced points) drawn before any level is ready
+        self.lod_th = None  # simplification of the current level running in the background
+        self.lod_state = None  # (simplified indexes, selection, number of points) of the line in the LOD buffers
+        self.lod_size = 0  # number of vertices of the line
+        self.lod_capacity = 0  # number of vertices the LOD buffers can hold
 
     def initializeGL(self) -> None:  # initialize OpenGL scene render properties
         glEnable(GL_DEPTH_TEST)  # for proper 3D rendering and avoid plan overlapping
@@ -40,6 +60,150 @@ class Rotation3DRender(QOpenGLWidget):  # 3D render of a sphere for intuitive ma
         glEnable(GL_LIGHT0)
         glEnable(GL_POINT_SMOOTH)
         glEnable(GL_LINE_SMOOTH)
+        if self.tracking_mode:
+            self.sphere_buffers = glGenBuffers(3)
+            self.path_buffer = glGenBuffers(1)
+            self.selection_buffer = glGenBuffers(1)
+            self.lod_buffers = glGenBuffers(2)
+            self.path_capacity, self.uploaded_path, self.uploaded_points = 0, None, 0
+            self.uploaded_selection, self.lod_state, self.lod_capacity = None, None, 0
+            self.upload_sphere(1.99, 50, 50)
+            self.context().aboutToBeDestroyed.connect(self.cleanup_gl)
+
+    def cleanup_gl(self):  # release the GPU buffers with the OpenGL context
+        self.makeCurrent()
+        glDeleteBuffers(3, self.sphere_buffers)
+        glDeleteBuffers(2, [self.path_buffer, self.selection_buffer])
+        glDeleteBuffers(2, self.lod_buffers)
+        self.sphere_buffers, self.path_buffer, self.selection_buffer, self.lod_buffers = None, None, None, None
+        self.doneCurrent()
+
+    @staticmethod
+    def build_sphere(radius, slices, stacks):  # return vertices, normals and triangles indexes of a sphere mesh
+        theta, phi = np.meshgrid(np.linspace(0, np.pi, stacks + 1), np.linspace(0, 2 * np.pi, slices + 1),
+                                 indexing='ij')  # one row of vertices per stack, from the north pole
+        normals = np.stack((np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)), axis=-1)
+        normals = normals.reshape(-1, 3).astype(np.float32)
+        grid = np.arange((stacks + 1) * (slices + 1), dtype=np.uint32).reshape(stacks + 1, slices + 1)
+        a, b, c, d = grid[:-1, :-1], grid[1:, :-1], grid[1:, 1:], grid[:-1, 1:]  # corners of each quad
+        triangles = np.stack((a, b, c, a, c, d), axis=-1).reshape(-1)  # counterclockwise seen from outside
+        return normals * radius, normals, triangles
+
+    def upload_sphere(self, radius, slices, stacks):  # fill the sphere buffers with the mesh of a sphere
+        vertices, normals, triangles = self.build_sphere(radius, slices, stacks)
+        glBindBuffer(GL_ARRAY_BUFFER, self.sphere_buffers[0])
+        glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, self.sphere_buffers[1])
+        glBufferData(GL_ARRAY_BUFFER, normals.nbytes, normals, GL_STATIC_DRAW)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.sphere_buffers[2])
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, triangles.nbytes, triangles, GL_STATIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.sphere_size = len(triangles)
+
+    def upload_path(self):  # copy the points of the track not uploaded yet to the path buffer
+        nb_points = len(self.tracking_path)
+        start = self.uploaded_points
+        if self.tracking_path is not self.uploaded_path or nb_points < start:  # new track: upload it all
+            self.uploaded_path, start = self.tracking_path, 0
+            self.lod_cache, self.lod_state, self.lod_preview = {}, None, None
+        if nb_points == start:
+            return
+        glBindBuffer(GL_ARRAY_BUFFER, self.path_buffer)
+        if nb_points > self.path_capacity:  # grow buffer by doubling: appending stays amortized constant
+            self.path_capacity = max(1024, 2 ** int(np.ceil(np.log2(nb_points))))
+            glBufferData(GL_ARRAY_BUFFER, self.path_capacity * 12, None, GL_DYNAMIC_DRAW)
+            start = 0
+        vertices = self.tracking_path.get_cartesian(start).astype(np.float32)
+        glBufferSubData(GL_ARRAY_BUFFER, start * 12, vertices.nbytes, vertices)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.uploaded_points = nb_points
+
+    def get_lod_level(self):  # return the level of detail of the current zoom: path followed within 2 ** level radians
+        # the front of the sphere (radius 2) is 4 - zoom away from the camera, with a vertical field of view of 45°
+        pixel = 2 * (4 - self.zoom) * np.tan(np.deg2rad(45 / 2)) / max(1, self.height() * self.devicePixelRatioF())
+        return int(np.floor(np.log2(TRACK_LOD_TOLERANCE * pixel / 2)))
+
+    def get_lod(self, level):  # return the number of points simplified and the indexes kept to draw a level of detail
+        nb_points = len(self.tracking_path)
+        entry = self.lod_cache.get(level)
+        if entry is None or nb_points > 2 * entry[0]:  # simplify again each time the track doubles
+            self.request_lod(level)
+        if entry is None and self.lod_cache:  # nearest level ready drawn until this one is
+            entry = self.lod_cache[min(self.lod_cache, key=lambda cached: abs(cached - level))]
+        return entry or self.get_lod_preview()
+
+    def get_lod_preview(self):  # return evenly spaced points of the track, drawn until a level of detail is ready
+        nb_points = len(self.tracking_path)
+        if self.lod_preview is None or nb_points > 2 * self.lod_preview[0]:
+            step = max(1, nb_points // TRACK_LOD_PREVIEW)
+            self.lod_preview = (nb_points, np.union1d(np.arange(0, nb_points, step), np.arange(nb_points)[-1:]))
+        return self.lod_preview
+
+    def request_lod(self, level):  # simplify the track for a level in the background, one level at a time
+        if self.lod_th and self.lod_th.isRunning():  # level requested again at the repaint following the result
+            return
+        self.lod_th = LodThread(self.tracking_path, level)
+        self.lod_th.lod_signal.connect(self.set_lod)
+        self.lod_th.start()
+
+    def set_lod(self, track, level, nb_points, kept):  # store a simplified level and draw it
+        if track is not self.tracking_path:  # track replaced during the simplification
+            return
+        self.lod_cache[level] = (nb_points, kept)
+        self.update()
+
+    def upload_lod(self):  # fill the LOD buffers with the track path simplified for the current zoom
+        nb_points = len(self.tracking_path)
+        simplified, kept = self.get_lod(self.get_lod_level())
+        if self.lod_state and self.lod_state[0] is kept and self.lod_state[1] is self.sel_points:
+            start = self.lod_state[2]
+            if start == nb_points:
+                return
+            if 0 < start < nb_points and self.lod_size + nb_points - start <= self.lod_capacity:
+                self.append_lod(start)
+                self.lod_state = (kept, self.sel_points, nb_points)
+                return
+        # points added since the simplification drawn as they are, selected points always kept
+        indexes = np.union1d(np.concatenate((kept, np.arange(simplified, nb_points))), self.sel_points).astype(np.intp)
+        vertices = self.tracking_path.get_cartesian()[indexes].astype(np.float32)
+        alpha = np.ones(nb_points)  # green of the color of each segment (i - 1, i), the first point ends no segment
+        alpha[1:] = self.tracking_path.get_colors()[:, 1]
+        if nb_points:  # a simplified segment takes the color of the fastest segment it replaces
+            alpha = np.minimum.reduceat(alpha, np.concatenate(([0], indexes[:-1] + 1)))
+        colors = np.column_stack((np.ones_like(alpha), alpha, np.zeros_like(alpha))).astype(np.float32)
+        self.lod_capacity = max(1024, 2 ** int(np.ceil(np.log2(max(1, len(indexes))))))  # room to append points
+        for buffer, data in zip(self.lod_buffers, (vertices, colors)):
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            glBufferData(GL_ARRAY_BUFFER, self.lod_capacity * 12, None, GL_DYNAMIC_DRAW)
+            if len(data):
+                glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.lod_size = len(indexes)
+        self.lod_state = (kept, self.sel_points, nb_points)
+
+    def append_lod(self, start):  # append the points of the track from start to the line, each ending its own segment
+        vertices = self.tracking_path.get_cartesian(start).astype(np.float32)
+        alpha = self.tracking_path.get_colors(start)[:, 1]
+        colors = np.column_stack((np.ones_like(alpha), alpha, np.zeros_like(alpha))).astype(np.float32)
+        for buffer, data in zip(self.lod_buffers, (vertices, colors)):
+            glBindBuffer(GL_ARRAY_BUFFER, buffer)
+            glBufferSubData(GL_ARRAY_BUFFER, self.lod_size * 12, data.nbytes, data)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        self.lod_size += len(vertices)
+
+    def release(self):  # stop the simplification running in the background
+        if self.lod_th and self.lod_th.isRunning():
+            self.lod_th.stop()
+
+    def upload_selection(self):  # copy the indexes of the selected points to the selection buffer
+        if self.sel_points is self.uploaded_selection:
+            return
+        indexes = np.asarray(self.sel_points, dtype=np.uint32)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.selection_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, indexes.nbytes, indexes if len(indexes) else None, GL_DYNAMIC_DRAW)
+        glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+        self.uploaded_selection = self.sel_points
 
     def paintGL(self) -> None:  # render scene
         # clear scene
@@ -62,28 +226,45 @@ class Rotation3DRender(QOpenGLWidget):  # 3D render of a sphere for intuitive ma
         # Render the sphere
         if self.tracking_mode:
             glColor3f(.65, .65, .65)
-            glutSolidSphere(1.99, 50, 50)
+            glEnableClientState(GL_VERTEX_ARRAY)
+            glEnableClientState(GL_NORMAL_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, self.sphere_buffers[0])
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ARRAY_BUFFER, self.sphere_buffers[1])
+            glNormalPointer(GL_FLOAT, 0, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.sphere_buffers[2])
+            glDrawElements(GL_TRIANGLES, self.sphere_size, GL_UNSIGNED_INT, None)
+            glDisableClientState(GL_NORMAL_ARRAY)
 
             glDisable(GL_LIGHTING)
             glDisable(GL_LIGHT0)
+            self.upload_path()
+            self.upload_selection()
+            self.upload_lod()
+            nb_points = len(self.tracking_path)
+            glBindBuffer(GL_ARRAY_BUFFER, self.lod_buffers[0])
+            glVertexPointer(3, GL_FLOAT, 0, None)
+            glBindBuffer(GL_ARRAY_BUFFER, self.lod_buffers[1])
+            glColorPointer(3, GL_FLOAT, 0, None)
+            glEnableClientState(GL_COLOR_ARRAY)
             glLineWidth(15)
-            for i in range(1, len(self.tracking_path)):
-                glBegin(GL_LINES)
-                glColor3f(*self.tracking_path[i].get_color(self.tracking_path[i - 1]))
-                glVertex3f(*self.tracking_path[i - 1].get_cartesian())
-                glVertex3f(*self.tracking_path[i].get_cartesian())
-                glEnd()
+            glShadeModel(GL_FLAT)  # a segment takes the color of its last vertex, the one of its speed
+            glDrawArrays(GL_LINE_STRIP, 0, self.lod_size)
+            glShadeModel(GL_SMOOTH)
+            glDisableClientState(GL_COLOR_ARRAY)
+            glBindBuffer(GL_ARRAY_BUFFER, self.path_buffer)  # points drawn from the full resolution path
+            glVertexPointer(3, GL_FLOAT, 0, None)
             glPointSize(20)
-            glBegin(GL_POINTS)
-            glColor3d(0, 0, 1)
-            glVertex3d(*self.tracking_path[0].get_cartesian())
-            glVertex3d(*self.tracking_path[-1].get_cartesian())
-            glEnd()
-            for i in self.sel_points:
-                glBegin(GL_POINTS)
-                glColor3d(1, 0, 0)
-                glVertex3d(*self.tracking_path[i].get_cartesian())
-                glEnd()
+            if nb_points:
+                glColor3d(0, 0, 1)
+                glDrawArrays(GL_POINTS, 0, 1)
+                glDrawArrays(GL_POINTS, nb_points - 1, 1)
+            glColor3d(1, 0, 0)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.selection_buffer)
+            glDrawElements(GL_POINTS, len(self.sel_points), GL_UNSIGNED_INT, None)
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, 0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+            glDisableClientState(GL_VERTEX_ARRAY)
             glEnable(GL_LIGHTING)
             glEnable(GL_LIGHT0)
 
@@ -38,11 +38,11 @@ class SerialTerminal(QWidget):
         QShortcut(Qt.Key_Down, self, self.down)
 
     def return_input(self, command):  # triggered when 'Enter' key is pressed
-        if command == "stop":  # stop the current serial thread
-            self.wnd.ser.th.stop()
+        if command == "stop":  # stop waiting for the replies of the commands sent
+            self.wnd.ser.th.cancel()
             self.input.clear()
             return
-        if command == "" or (self.wnd.ser.th and self.wnd.ser.th.isRunning()):  # empty data not sent
+        if command == "":  # empty data not sent
             return
         self.input.clear()
         self.console.setTextColor("#3C7BFF")
@@ -62,7 +62,8 @@ class SerialTerminal(QWidget):
     def handle_print_signal(self, category, response):  # change text color according to data received from RPi
         if category == self.wnd.ser.ALL_DONE:
             self.console.setTextColor("#7A7A7A")
-            self.console.append("[Done]")
+            round_trip = self.wnd.ser.th.get_round_trip()
+            self.console.append(f"[Done in {round_trip[0]:.0f} ms]" if round_trip else "[Done]")
         else:
             self.console.setTextColor("white" if category == self.wnd.ser.RESPONSE else "#FF4E4E")
             self.console.append(response.decode('utf-8'))
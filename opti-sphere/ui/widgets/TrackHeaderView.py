@@ -0,0 +1,67 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QCursor
+from PySide6.QtWidgets import QHeaderView, QStyle, QStyleOptionHeader
+
+
+class TrackHeaderView(QHeaderView):  # columns header of the track table, sharing the table's selection
+    # QHeaderView asks the selection model row by row if a column is selected, for each section painted (seconds for
+    # long tracks): the sections are highlighted from the selected ranges instead
+
+    def __init__(self, parent=None):
+        super().__init__(Qt.Orientation.Horizontal, parent)
+        self.setSectionsClickable(True)  # a click on a section selects its column
+        self.setHighlightSections(True)
+
+    def get_selected_columns(self):  # return the columns with selected cells and the columns with all cells selected
+        rows = {}  # column -> (top, bottom) rows of the ranges selected in it
+        for selection_range in self.selectionModel().selection() if self.selectionModel() else []:
+            for column in range(selection_range.left(), selection_range.right() + 1):
+                rows.setdefault(column, []).append((selection_range.top(), selection_range.bottom()))
+        full, nb_rows = set(), self.model().rowCount() if self.model() else 0
+        for column, ranges in rows.items():
+            covered = 0  # rows from the first one covered by the ranges
+            for top, bottom in sorted(ranges):
+                if top > covered:
+                    break
+                covered = max(covered, bottom + 1)
+            if covered >= nb_rows:
+                full.add(column)
+        return set(rows), full
+
+    def initStyleOptionForIndex(self, option, logical_index):  # same options as QHeaderView, selection from ranges
+        intersecting, full = self.get_selected_columns() if self.highlightSections() else (set(), set())
+        if self.window().isActiveWindow():
+            option.state |= QStyle.StateFlag.State_Active
+        if self.sectionsClickable():
+            if self.underMouse() and self.logicalIndexAt(self.mapFromGlobal(QCursor.pos())) == logical_index:
+                option.state |= QStyle.StateFlag.State_MouseOver
+            if logical_index in intersecting:
+                option.state |= QStyle.StateFlag.State_On
+            if logical_index in full:
+                option.state |= QStyle.StateFlag.State_Sunken
+        option.section = logical_index
+        alignment = self.model().headerData(logical_index, self.orientation(), Qt.ItemDataRole.TextAlignmentRole)
+        option.textAlignment = Qt.AlignmentFlag(alignment) if alignment is not None else self.defaultAlignment()
+        option.iconAlignment = Qt.AlignmentFlag.AlignVCenter
+        option.text = str(self.model().headerData(logical_index, self.orientation()) or "")
+        option.orientation = self.orientation()
+
+        visual = self.visualIndex(logical_index)
+        if self.count() == 1:
+            option.position = QStyleOptionHeader.SectionPosition.OnlyOneSection
+        elif visual == 0:
+            option.position = QStyleOptionHeader.SectionPosition.Beginning
+        elif visual == self.count() - 1:
+            option.position = QStyleOptionHeader.SectionPosition.End
+        else:
+            option.position = QStyleOptionHeader.SectionPosition.Middle
+        previous_selected = self.logicalIndex(visual - 1) in full
+        next_selected = self.logicalIndex(visual + 1) in full
+        if previous_selected and next_selected:
+            option.selectedPosition = QStyleOptionHeader.SelectedPosition.NextAndPreviousAreSelected
+        elif previous_selected:
+            option.selectedPosition = QStyleOptionHeader.SelectedPosition.PreviousIsSelected
+        elif next_selected:
+            option.selectedPosition = QStyleOptionHeader.SelectedPosition.NextIsSelected
+        else:
+            option.selectedPosition = QStyleOptionHeader.SelectedPosition.NotAdjacent
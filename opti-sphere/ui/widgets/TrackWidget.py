@@ -1,6 +1,10 @@
+import numpy as np
 from PySide6.QtCore import Qt, Signal, Slot
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel, QHBoxLayout, QLineEdit, QTextEdit, \
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QComboBox
+    QTableView, QAbstractItemView, QComboBox, QHeaderView
+
+from core.models.TrackTableModel import TrackTableModel
+from ui.widgets.TrackHeaderView import TrackHeaderView
 
 
 class TrackWidget(QWidget):
@@ -68,12 +72,13 @@ class TrackWidget(QWidget):
         self.data_format.currentTextChanged.connect(self.update_format)
         data_layout.addWidget(table_legend)
         data_layout.addWidget(self.data_format)
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["R (cm)", "θ (deg)", "φ (deg)", "Time"])
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)  # no per-row height to compute
+        self.table.setHorizontalHeader(TrackHeaderView(self.table))  # columns highlighted without checking every row
+        self.model = TrackTableModel(self.track.track)
+        self.table.setModel(self.model)
         self.table.selectionModel().selectionChanged.connect(self.select_cells)
-        self.load_data(self.track.track, spherical_format=True)
         table_layout.addLayout(data_layout)
         table_layout.addWidget(self.table)
 
@@ -92,32 +97,15 @@ class TrackWidget(QWidget):
         self.name.clearFocus()
 
     def calculate_dist(self):  # return the total distance traveled by the target
-        dist = 0
-        for i in range(1, len(self.track.track)):
-            dist += self.track.track[i].get_distance(self.track.track[i-1])
-        return "%0.2f cm" % dist
-
-    def load_data(self, track, spherical_format=True):  # load the data measured in a table
-        self.table.setRowCount(len(track))
-        for i, data in enumerate(track):
-            a, b, c = data.coords if spherical_format else data.get_cartesian()
-            d = data.time
-            self.table.setItem(i, 0, QTableWidgetItem("{:0.1f}".format(a)))
-            self.table.setItem(i, 1, QTableWidgetItem("{:0.3f}".format(b)))
-            self.table.setItem(i, 2, QTableWidgetItem("{:0.3f}".format(c)))
-            self.table.setItem(i, 3, QTableWidgetItem(str(d)))
+        return "%0.2f cm" % self.track.track.get_distance()
 
     @Slot()
     def select_cells(self):  # show selected path point (or cell) on the 3D render
-        self.track.spatial_tracking.sel_points = set([i.row() for i in self.table.selectedItems()])
+        ranges = self.table.selectionModel().selection()  # rectangles of cells: no per-cell index listed
+        rows = [np.arange(r.top(), r.bottom() + 1) for r in ranges]
+        self.track.spatial_tracking.sel_points = np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=int)
         self.track.spatial_tracking.update()
 
     @Slot()
     def update_format(self):  # update table according to data format (Euler or Spherical coordinates)
-        if self.data_format.currentIndex() == 0:
-            self.table.setHorizontalHeaderLabels(["R (cm)", "θ (deg)", "φ (deg)", "Time"])
-            self.load_data(self.track.track, spherical_format=True)
-        else:
-            self.table.setHorizontalHeaderLabels(["x (cm)", "y (cm)", "z (cm)", "Time"])
-            self.load_data(self.track.track, spherical_format=False)
-
+        self.model.set_format(self.data_format.currentIndex() == 0)
@@ -39,10 +39,10 @@ class VideoWidget(QWidget):
         details_layout.setContentsMargins(10, 3, 10, 3)
         dimensions = QLabel(self.video.get_dimensions())
         fps = QLabel(f"{self.video.fps} FPS")
-        duration = QLabel(self.video.get_duration())
+        self.duration = QLabel(self.video.get_duration())
         details_layout.addWidget(dimensions)
         details_layout.addWidget(fps)
-        details_layout.addWidget(duration)
+        details_layout.addWidget(self.duration)
         details_widget.setLayout(details_layout)
 
         layout.addWidget(header)